@@ -0,0 +1,62 @@
+"""Benchmark: output-path resolution cost as the download directory grows
+
+Compares the old glob-based lookup (title glob, then newest *.mp4 by mtime)
+with resolving the path yt-dlp reports. Run with: python bench_output_resolution.py
+"""
+
+import tempfile
+import time
+from functools import partial
+from pathlib import Path
+
+from src.tools.youtube_tool import YouTubeDownloadTool
+
+DIRECTORY_SIZES = [100, 1000, 5000]
+REPEAT = 20
+
+
+def legacy_glob_resolve(download_path: Path, title: str) -> list[Path]:
+    """The lookup `_run` used before the path came from yt-dlp"""
+    downloaded_files = list(download_path.glob(f"*{title[:50]}*.mp4"))
+    if not downloaded_files:
+        downloaded_files = sorted(
+            download_path.glob("*.mp4"), key=lambda p: p.stat().st_mtime, reverse=True
+        )[:1]
+    return downloaded_files
+
+
+def time_ms(fn, repeat: int = REPEAT) -> float:
+    """Average wall time of fn() in milliseconds"""
+    start = time.perf_counter()
+    for _ in range(repeat):
+        fn()
+    return (time.perf_counter() - start) / repeat * 1000
+
+
+def main():
+    print("=" * 60)
+    print("Output Path Resolution Benchmark")
+    print("=" * 60)
+    print(f"{'files':>8} {'glob (ms)':>12} {'glob miss (ms)':>16} {'reported (ms)':>15}")
+
+    for size in DIRECTORY_SIZES:
+        with tempfile.TemporaryDirectory() as temp_dir:
+            download_path = Path(temp_dir)
+            for i in range(size):
+                (download_path / f"Some other video {i}.mp4").touch()
+            target = download_path / "Me at the zoo.mp4"
+            target.touch()
+
+            tool = YouTubeDownloadTool(download_dir=temp_dir)
+            info = {"filepath": str(target)}
+
+            glob_hit = time_ms(partial(legacy_glob_resolve, download_path, "Me at the zoo"))
+            # Titles with characters yt-dlp sanitizes miss the first glob
+            glob_miss = time_ms(partial(legacy_glob_resolve, download_path, "Me at the zoo?"))
+            reported = time_ms(partial(tool._resolve_output_path, info))
+
+            print(f"{size:>8} {glob_hit:>12.3f} {glob_miss:>16.3f} {reported:>15.4f}")
+
+
+if __name__ == "__main__":
+    main()
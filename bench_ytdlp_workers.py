@@ -0,0 +1,79 @@
+"""Benchmark: yt-dlp job startup, fresh subprocess vs pre-warmed worker
+
+Runs the same offline jobs through `subprocess.run` (what every call paid
+before) and through YtDlpWorkerPool. `--version` is pure startup; the local
+file probe also goes through option parsing, extractor lookup and --print,
+like `get_video_info`. Needs the yt-dlp executable and Python module.
+Run with: python bench_ytdlp_workers.py
+"""
+
+import statistics
+import subprocess
+import tempfile
+import time
+from pathlib import Path
+
+from src.tools.ytdlp_pool import YtDlpWorkerPool
+
+REPEAT = 10
+
+
+def time_subprocess(args: list[str]) -> list[float]:
+    """Wall times in milliseconds of fresh yt-dlp processes"""
+    times = []
+    for _ in range(REPEAT):
+        start = time.perf_counter()
+        result = subprocess.run(
+            ["yt-dlp", *args], capture_output=True, text=True, timeout=60, check=False
+        )
+        times.append((time.perf_counter() - start) * 1000)
+        # A job that fails fast would look like a speed-up
+        assert result.returncode == 0, result.stderr
+    return times
+
+
+def time_pool(pool: YtDlpWorkerPool, args: list[str]) -> list[float]:
+    """Wall times in milliseconds of jobs in a warm worker"""
+    times = []
+    for _ in range(REPEAT):
+        start = time.perf_counter()
+        lines: list[str] = []
+        returncode = pool.run(args, lines.append, timeout=60)
+        times.append((time.perf_counter() - start) * 1000)
+        assert returncode == 0, "\n".join(lines[-5:])
+    return times
+
+
+def main():
+    with tempfile.TemporaryDirectory() as temp_dir:
+        video = Path(temp_dir) / "clip.mp4"
+        video.write_bytes(b"\0" * 1024)
+        jobs = {
+            "--version": ["--version"],
+            "local probe": [
+                "--enable-file-urls", "--simulate", "--no-warnings",
+                "--print", "%(id)s", video.as_uri(),
+            ],
+        }
+
+        pool = YtDlpWorkerPool(size=1, max_jobs=REPEAT * len(jobs) + 2)
+        start = time.perf_counter()
+        pool.run(["--version"], lambda line: None, timeout=60)
+        warm_up = (time.perf_counter() - start) * 1000
+
+        print("=" * 60)
+        print("yt-dlp Job Startup Benchmark")
+        print("=" * 60)
+        print(f"Worker start-up (paid once per worker): {warm_up:.0f} ms")
+        print(f"{'job':>12} {'subprocess p50 (ms)':>21} {'worker p50 (ms)':>17} {'speed-up':>9}")
+        try:
+            for name, args in jobs.items():
+                fresh = statistics.median(time_subprocess(args))
+                warm = statistics.median(time_pool(pool, args))
+                print(f"{name:>12} {fresh:>21.1f} {warm:>17.1f} {fresh / warm:>8.0f}x")
+        finally:
+            pool.stop()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,73 @@
+"""Slack status message edited in place with throttled updates"""
+
+import asyncio
+import inspect
+import logging
+import threading
+import time
+from typing import Any, Callable, Optional
+
+logger = logging.getLogger(__name__)
+
+
+class ThrottledStatus:
+    """
+    Pushes status text to one message, at most once per interval
+
+    Updates arriving faster than `interval` are dropped, except forced ones
+    (the final state of a job), so a download emitting several progress
+    lines per second costs one chat.update every few seconds. If `update`
+    is a coroutine function, the update is scheduled on the running loop.
+    """
+
+    def __init__(self, update: Callable[[str], Any], interval: float = 3.0):
+        """
+        Initialize the status
+
+        Args:
+            update: Replaces the message text (e.g. a chat.update call)
+            interval: Minimum seconds between two updates
+        """
+        self._update = update
+        self.interval = interval
+        self._lock = threading.Lock()
+        self._last_sent = 0.0
+        self._last_text: Optional[str] = None
+        self.sent = 0
+        self.dropped = 0
+
+    def update(self, text: str, force: bool = False) -> bool:
+        """
+        Show new status text if the throttle allows it
+
+        Args:
+            text: New message text
+            force: Send even if the interval hasn't passed
+
+        Returns:
+            Whether the message was updated
+        """
+        now = time.monotonic()
+        with self._lock:
+            if text == self._last_text:
+                return False
+            if not force and now - self._last_sent < self.interval:
+                self.dropped += 1
+                return False
+            self._last_sent = now
+            self._last_text = text
+            self.sent += 1
+
+        try:
+            result = self._update(text)
+            if inspect.isawaitable(result):
+                asyncio.ensure_future(result).add_done_callback(self._log_failure)
+        except Exception as e:
+            logger.warning(f"Failed to update status message: {e}")
+        return True
+
+    @staticmethod
+    def _log_failure(task: "asyncio.Future") -> None:
+        """Log a failed async update"""
+        if not task.cancelled() and task.exception() is not None:
+            logger.warning(f"Failed to update status message: {task.exception()}")
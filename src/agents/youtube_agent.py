@@ -1,18 +1,63 @@
 """YouTube Download Agent for orchestrating the download workflow"""
 
+import asyncio
+import inspect
+import json
 import logging
+import threading
+from concurrent.futures import Future
+from pathlib import Path
 from typing import Any, Callable, Optional
 
 from langchain.agents import AgentExecutor, create_react_agent
-from langchain_ollama import ChatOllama
 from langchain_core.prompts import PromptTemplate
 
-from ..chains import URLExtractionChain
-from ..tools import get_youtube_tools
+from ..chains import (
+    CircuitBreaker,
+    ConfidentIntentClassifier,
+    ExtractionCache,
+    IntentClassifier,
+    URLExtractionChain,
+)
+from ..tools import (
+    JOB_DONE,
+    JOB_FAILED,
+    JOB_INTERRUPTED,
+    JOB_RUNNING,
+    LANE_NORMAL,
+    DiskQuota,
+    DownloadIndex,
+    JobJournal,
+    JournalEntry,
+    ProgressEvent,
+    SingleFlight,
+    YtDlpWorkerPool,
+    classify_lane,
+    extract_video_id,
+    get_download_scheduler,
+    get_youtube_tools,
+)
 from ..config import Settings
+from ..llm import (
+    LLMLatencyTracker,
+    OllamaRouter,
+    create_ollama_llm,
+    parse_keep_alive,
+    warm_up_model,
+)
+from .status_message import ThrottledStatus
 
 logger = logging.getLogger(__name__)
 
+# Reply for downloads stopped by a shutdown; the journal resumes them
+INTERRUPTED_MESSAGE = "Interrupted by a restart, it will resume automatically"
+
+# Finished jobs are kept in the journal this long
+JOURNAL_RETENTION = 7 * 86400
+
+# Bytes per GiB, for the quota settings
+GIB = 1024 ** 3
+
 
 class YouTubeDownloadAgent:
     """
@@ -28,7 +73,8 @@ class YouTubeDownloadAgent:
     def __init__(
         self,
         settings: Settings,
-        feedback_callback: Optional[Callable] = None
+        feedback_callback: Optional[Callable] = None,
+        update_callback: Optional[Callable] = None,
     ):
         """
         Initialize the YouTube agent
@@ -36,22 +82,100 @@ class YouTubeDownloadAgent:
         Args:
             settings: Application settings
             feedback_callback: Optional callback for sending feedback (channel_id, message, thread_ts)
+            update_callback: Optional callback for editing a sent message
+                (channel_id, message_ts, message), used for download progress
         """
         self.settings = settings
         self.feedback_callback = feedback_callback
+        self.update_callback = update_callback
         
-        # Initialize LLM
-        self.llm = ChatOllama(
+        # Initialize LLM; one shared instance (per Ollama host) means one
+        # pooled HTTP client, and several hosts are load-balanced by a router
+        self.llm_latency = LLMLatencyTracker(budget_seconds=settings.llm_latency_budget)
+        self.llm = create_ollama_llm(
             model=settings.ollama_model,
-            base_url=settings.ollama_host,
+            hosts=settings.ollama_hosts,
             temperature=0.1,
+            num_predict=settings.llm_max_output_tokens,
+            keep_alive=parse_keep_alive(settings.ollama_keep_alive),
+            max_connections=settings.ollama_max_connections,
+            callbacks=[self.llm_latency],
+            health_check_interval=settings.ollama_health_check_interval,
+            num_ctx=settings.ollama_num_ctx,
+            call_deadline=settings.llm_call_deadline,
         )
         
         # Initialize URL extraction chain
-        self.url_chain = URLExtractionChain(self.llm)
+        self.url_chain = URLExtractionChain(
+            self.llm,
+            mode=settings.url_extraction_mode,
+            cache=ExtractionCache(
+                max_size=settings.extraction_cache_size,
+                ttl=settings.extraction_cache_ttl,
+                path=settings.extraction_cache_path or None,
+            ),
+            batch_window=settings.llm_batch_window_ms / 1000,
+            batch_max_size=settings.llm_batch_max_size,
+            classifier=self._load_intent_classifier(),
+            decision_log_path=settings.intent_decision_log or None,
+            streaming=settings.llm_streaming,
+            max_output_tokens=settings.llm_max_output_tokens,
+            include_reasoning=settings.llm_include_reasoning,
+            breaker=CircuitBreaker(
+                deadline=settings.llm_call_deadline,
+                latency_budget=settings.llm_latency_budget,
+                error_threshold=settings.llm_breaker_error_threshold,
+                window=settings.llm_breaker_window,
+                cooldown=settings.llm_breaker_cooldown,
+                max_workers=settings.ollama_max_connections,
+            ),
+            max_message_chars=settings.llm_max_message_chars,
+        )
+        if settings.ollama_warm_up:
+            # Load the model in the background so startup isn't blocked
+            threading.Thread(target=self._warm_up, name="ollama-warm-up", daemon=True).start()
         
+        # Index of finished downloads, reconciled with the download directory once
+        self.download_index = DownloadIndex(settings.download_index_path)
+        self.download_index.rebuild(settings.download_dir)
+
+        # Downloads must fit on disk and in the quota; old ones are evicted first
+        self.disk_quota = DiskQuota(
+            settings.download_dir,
+            self.download_index,
+            quota_bytes=int(settings.download_quota_gb * GIB),
+            min_free_bytes=int(settings.download_min_free_gb * GIB),
+            scratch_dir=settings.download_scratch_dir or None,
+        )
+
+        # yt-dlp jobs run in pre-warmed workers when configured
+        self.worker_pool: Optional[YtDlpWorkerPool] = None
+        if settings.ytdlp_workers:
+            self.worker_pool = YtDlpWorkerPool(
+                size=settings.ytdlp_workers,
+                max_jobs=settings.ytdlp_worker_max_jobs,
+                max_memory_mb=settings.ytdlp_worker_max_memory_mb,
+            )
+            self.worker_pool.start()
+
         # Initialize tools
-        self.tools = get_youtube_tools(settings.download_dir)
+        self.tools = get_youtube_tools(
+            settings.download_dir,
+            index=self.download_index,
+            scratch_dir=settings.download_scratch_dir or None,
+            quota=self.disk_quota,
+            worker_pool=self.worker_pool,
+        )
+
+        # Downloads from all messages share one process-wide scheduler
+        self.scheduler = get_download_scheduler(settings)
+        self.single_flight = SingleFlight()
+
+        # Every started download is journaled so a restart can resume it
+        self.journal = JobJournal(settings.job_journal_path)
+        self.journal.prune(JOURNAL_RETENTION)
+        self._stopping = threading.Event()
+        self._resume_tasks: set[asyncio.Task] = set()
         
         # For future: This will enable Agent with tools
         # Currently we use a simpler workflow
@@ -59,6 +183,35 @@ class YouTubeDownloadAgent:
         
         logger.info("YouTubeDownloadAgent initialized")
 
+    def _warm_up(self) -> None:
+        """Load the model, then cache the fixed prompt prefix with one request"""
+        if warm_up_model(self.llm) is not None:
+            self.url_chain.prime_prompt_prefix()
+
+    def _load_intent_classifier(self) -> Optional[ConfidentIntentClassifier]:
+        """
+        Load the local intent classifier when the extraction mode uses it
+
+        Returns:
+            ConfidentIntentClassifier or None if not used or not trained yet
+        """
+        if self.settings.url_extraction_mode != "classifier":
+            return None
+        if not Path(self.settings.intent_model_path).exists():
+            logger.warning(
+                f"Intent model {self.settings.intent_model_path} not found, "
+                "ambiguous messages will go to the LLM"
+            )
+            return None
+
+        model = IntentClassifier.load(self.settings.intent_model_path)
+        logger.info(f"Loaded intent classifier from {self.settings.intent_model_path}")
+        return ConfidentIntentClassifier(
+            model,
+            high_threshold=self.settings.intent_high_threshold,
+            low_threshold=self.settings.intent_low_threshold,
+        )
+
     def _create_agent(self) -> AgentExecutor:
         """
         Create LangChain ReAct agent (for future use)
@@ -103,13 +256,194 @@ Thought: {agent_scratchpad}
         
         return agent_executor
 
-    def _send_feedback(self, channel_id: str, message: str, thread_ts: str) -> None:
-        """Send feedback via callback if available"""
+    def stats(self) -> dict[str, dict]:
+        """
+        Get statistics of the agent's components
+
+        Returns:
+            Dictionary mapping component name to its statistics
+        """
+        stats = {
+            "Download": self.scheduler.stats(),
+            "Extraction tier": self.url_chain.tier_stats(),
+            "LLM latency": self.llm_latency.stats(),
+        }
+        stats["Disk"] = self.disk_quota.stats()
+        if self.worker_pool is not None:
+            stats["yt-dlp workers"] = self.worker_pool.stats()
+        publish_stats = self.tools[0].publish_stats()
+        if publish_stats is not None:
+            stats["Publish"] = publish_stats
+        if isinstance(self.llm, OllamaRouter):
+            stats["Ollama backends"] = self.llm.stats()
+        if self.url_chain.breaker is not None:
+            stats["LLM circuit breaker"] = self.url_chain.breaker.stats()
+        if self.url_chain.batcher is not None:
+            stats["LLM batching"] = self.url_chain.batcher.stats()
+        if self.url_chain.cache is not None:
+            stats["Extraction cache"] = self.url_chain.cache.stats()
+        return stats
+
+    def shutdown(self, timeout: float = 0.0) -> None:
+        """
+        Checkpoint downloads and persist caches
+
+        Queued downloads are cancelled and stay queued in the journal.
+        Running ones get `timeout` seconds to finish, then they are
+        interrupted and resume from their `.part` files on the next start.
+
+        Args:
+            timeout: Seconds running downloads may take to finish
+        """
+        self._stopping.set()
+        self.scheduler.shutdown(wait=False)
+        if self.scheduler.drain(timeout) > 0:
+            interrupted = self.tools[0].interrupt_downloads()
+            logger.warning(
+                f"Interrupted {interrupted} running download(s), they resume on the next start"
+            )
+            self.scheduler.drain(5)
+        if self.worker_pool is not None:
+            self.worker_pool.stop()
+        if self.url_chain.batcher is not None:
+            self.url_chain.batcher.shutdown()
+        if self.url_chain.breaker is not None:
+            self.url_chain.breaker.shutdown()
+        if isinstance(self.llm, OllamaRouter):
+            self.llm.stop_health_checks()
+        if self.url_chain.cache is not None:
+            self.url_chain.cache.save()
+
+    def resume_jobs(self) -> int:
+        """
+        Restart the downloads that did not finish before the last shutdown
+
+        Returns:
+            Number of downloads resumed
+        """
+        jobs = self._jobs_to_resume()
+        for job in jobs:
+            self._send_feedback(
+                job.channel_id, f"🔄 Resuming download after a restart\n{job.url}", job.thread_ts
+            )
+            self._download_video(
+                job.channel_id, job.url, job.thread_ts, job.user_id, job_id=job.job_id
+            )
+        return len(jobs)
+
+    async def aresume_jobs(self) -> int:
+        """
+        Async variant of resume_jobs; the downloads run as background tasks
+
+        Returns:
+            Number of downloads resumed
+        """
+        jobs = self._jobs_to_resume()
+        for job in jobs:
+            await self._asend_feedback(
+                job.channel_id, f"🔄 Resuming download after a restart\n{job.url}", job.thread_ts
+            )
+            task = asyncio.create_task(
+                self._adownload_video(
+                    job.channel_id, job.url, job.thread_ts, job.user_id, job_id=job.job_id
+                )
+            )
+            self._resume_tasks.add(task)
+            task.add_done_callback(self._resume_tasks.discard)
+        return len(jobs)
+
+    def _jobs_to_resume(self) -> list[JournalEntry]:
+        """Unfinished journal jobs that haven't used up their attempts"""
+        jobs = []
+        for job in self.journal.unfinished():
+            if job.attempts >= self.settings.job_max_attempts:
+                logger.warning(f"Giving up on {job.url} after {job.attempts} attempt(s)")
+                self.journal.update(job.job_id, JOB_FAILED, "Too many attempts")
+                continue
+            jobs.append(job)
+        if jobs:
+            logger.info(f"Resuming {len(jobs)} unfinished download(s)")
+        return jobs
+
+    def _journaled(self, job_id: int, fn: Callable[[], dict[str, Any]]) -> Callable[[], dict]:
+        """Wrap a download so its state transitions are written to the journal"""
+
+        def run() -> dict[str, Any]:
+            self.journal.update(job_id, JOB_RUNNING)
+            try:
+                result = fn()
+            except Exception as e:
+                self._settle_job(job_id, {"success": False, "message": str(e)})
+                raise
+            self._settle_job(job_id, result)
+            return result
+
+        return run
+
+    def _settle_job(self, job_id: int, result: dict[str, Any]) -> None:
+        """Record how a journaled download ended"""
+        if result.get("success"):
+            self.journal.update(job_id, JOB_DONE)
+        elif self._stopping.is_set():
+            self.journal.update(job_id, JOB_INTERRUPTED, result.get("message"))
+        else:
+            self.journal.update(job_id, JOB_FAILED, result.get("message"))
+
+    def _send_feedback(self, channel_id: str, message: str, thread_ts: str) -> Optional[Any]:
+        """
+        Send feedback via callback if available
+
+        Returns:
+            Reference to the sent message for update_callback: its timestamp,
+            or the handle of a message still queued for sending
+        """
         if self.feedback_callback:
             try:
-                self.feedback_callback(channel_id, message, thread_ts)
+                response = self.feedback_callback(channel_id, message, thread_ts)
             except Exception as e:
                 logger.error(f"Failed to send feedback: {e}")
+                return None
+            return self._message_ref(response)
+        return None
+
+    @staticmethod
+    def _message_ref(response: Any) -> Optional[Any]:
+        """Pick the message reference out of a feedback callback's return value"""
+        if response is None:
+            return None
+        get = getattr(response, "get", None)
+        return get("ts") if callable(get) else response
+
+    async def _asend_feedback(
+        self, channel_id: str, message: str, thread_ts: str
+    ) -> Optional[str]:
+        """
+        Send feedback via callback if available, awaiting an async callback
+
+        Returns:
+            Timestamp of the sent message, if the callback reported one
+        """
+        if self.feedback_callback:
+            try:
+                response = self.feedback_callback(channel_id, message, thread_ts)
+                if inspect.isawaitable(response):
+                    response = await response
+            except Exception as e:
+                logger.error(f"Failed to send feedback: {e}")
+                return None
+            return self._message_ref(response)
+        return None
+
+    def _create_status(
+        self, channel_id: str, message_ts: Optional[Any]
+    ) -> Optional[ThrottledStatus]:
+        """Create a throttled status for a sent message, if it can be edited"""
+        if not message_ts or not self.update_callback:
+            return None
+        return ThrottledStatus(
+            lambda text: self.update_callback(channel_id, message_ts, text),
+            interval=self.settings.slack_progress_interval,
+        )
 
     def process_message(
         self,
@@ -135,49 +469,24 @@ Thought: {agent_scratchpad}
         try:
             # Step 1: Extract URLs and check intent
             extraction_result = self.url_chain.extract(message)
-            urls = extraction_result["urls"]
-            download_intent = extraction_result["download_intent"]
+            urls, skipped = self._select_urls(message, extraction_result)
+            if skipped is not None:
+                return skipped
             
-            if not urls:
-                logger.debug("No YouTube URLs found")
-                return {
-                    "success": True,
-                    "action": "none",
-                    "message": "No YouTube URLs found"
-                }
-            
-            logger.info(
-                f"Found {len(urls)} URL(s), download intent: {download_intent}"
-            )
-            
-            # If no explicit download intent, check if it's just a URL
-            if not download_intent and len(message.split()) <= 3:
-                download_intent = True
-                logger.info("Assuming download intent from standalone URL")
-            
-            if not download_intent:
-                logger.info("No download intent detected")
-                return {
-                    "success": True,
-                    "action": "none",
-                    "message": "URLs found but no download intent"
-                }
-            
-            # Step 2: Download each URL
+            # Step 2: Submit every URL to the scheduler, then wait for all of them
+            futures = [
+                (url, self._download_video(channel_id, url, thread_ts, user_id))
+                for url in urls
+            ]
             results = []
-            for url in urls:
-                result = self._download_video(channel_id, url, thread_ts)
-                results.append(result)
+            for url, future in futures:
+                try:
+                    results.append(future.result())
+                except Exception as e:
+                    logger.error(f"Download job failed: {e}", exc_info=True)
+                    results.append({"success": False, "url": url, "error": str(e)})
             
-            success_count = sum(1 for r in results if r.get("success"))
-            
-            return {
-                "success": True,
-                "action": "download",
-                "total": len(urls),
-                "successful": success_count,
-                "results": results
-            }
+            return self._summarize(urls, results)
             
         except Exception as e:
             logger.error(f"Error processing message: {e}", exc_info=True)
@@ -191,86 +500,468 @@ Thought: {agent_scratchpad}
                 "error": str(e)
             }
 
-    def _download_video(
+    async def aprocess_message(
         self,
         channel_id: str,
-        url: str,
+        user_id: str,
+        message: str,
         thread_ts: str
     ) -> dict[str, Any]:
         """
-        Download a single video using the tool
+        Process a Slack message on the event loop (async runtime mode)
+
+        Same workflow as process_message; the LLM call and the yt-dlp
+        subprocesses are awaited instead of blocking a thread.
+
+        Args:
+            channel_id: Slack channel ID
+            user_id: User who sent the message
+            message: Message text
+            thread_ts: Thread timestamp for responses
+
+        Returns:
+            Dictionary with processing results
+        """
+        logger.info(f"Processing message from {user_id} in {channel_id}")
+
+        try:
+            extraction_result = await self.url_chain.aextract(message)
+            urls, skipped = self._select_urls(message, extraction_result)
+            if skipped is not None:
+                return skipped
+
+            outcomes = await asyncio.gather(
+                *(self._adownload_video(channel_id, url, thread_ts, user_id) for url in urls),
+                return_exceptions=True,
+            )
+            results = []
+            for url, outcome in zip(urls, outcomes):
+                if isinstance(outcome, BaseException):
+                    if isinstance(outcome, asyncio.CancelledError):
+                        raise outcome
+                    logger.error(f"Download job failed: {outcome}", exc_info=outcome)
+                    outcome = {"success": False, "url": url, "error": str(outcome)}
+                results.append(outcome)
+
+            return self._summarize(urls, results)
+
+        except Exception as e:
+            logger.error(f"Error processing message: {e}", exc_info=True)
+            await self._asend_feedback(channel_id, f"❌ An error occurred: {str(e)}", thread_ts)
+            return {
+                "success": False,
+                "error": str(e)
+            }
+
+    def _select_urls(
+        self, message: str, extraction_result: dict[str, Any]
+    ) -> tuple[list[str], Optional[dict[str, Any]]]:
+        """
+        Decide which extracted URLs to download
+
+        Returns:
+            (urls, None) when there is something to download, otherwise
+            ([], result) with the processing result to return
+        """
+        urls = extraction_result["urls"]
+        download_intent = extraction_result["download_intent"]
+
+        if not urls:
+            logger.debug("No YouTube URLs found")
+            return [], {
+                "success": True,
+                "action": "none",
+                "message": "No YouTube URLs found"
+            }
+
+        logger.info(
+            f"Found {len(urls)} URL(s), download intent: {download_intent} "
+            f"(tier: {extraction_result.get('tier')})"
+        )
+
+        # If no explicit download intent, check if it's just a URL
+        if not download_intent and len(message.split()) <= 3:
+            download_intent = True
+            logger.info("Assuming download intent from standalone URL")
+
+        if not download_intent:
+            logger.info("No download intent detected")
+            return [], {
+                "success": True,
+                "action": "none",
+                "message": "URLs found but no download intent"
+            }
+        return urls, None
+
+    @staticmethod
+    def _summarize(urls: list[str], results: list[dict[str, Any]]) -> dict[str, Any]:
+        """Build the processing result for a message's downloads"""
+        return {
+            "success": True,
+            "action": "download",
+            "total": len(urls),
+            "successful": sum(1 for r in results if r.get("success")),
+            "results": results
+        }
+
+    def _download_video(
+        self,
+        channel_id: str,
+        url: str,
+        thread_ts: str,
+        user_id: str = "",
+        job_id: Optional[int] = None,
+    ) -> Future:
+        """
+        Submit a single video download to the scheduler
         
         Args:
             channel_id: Slack channel for feedback
             url: YouTube URL
             thread_ts: Thread timestamp
+            user_id: User who requested the download (for the per-user cap)
+            job_id: Journal job being resumed, if any
             
+        Returns:
+            Future resolved with the download result dictionary
+        """
+        # Already-downloaded videos are answered from the index, without a slot
+        existing = self.tools[0].find_existing(url)
+        if existing is not None:
+            if job_id is not None:
+                self.journal.update(job_id, JOB_DONE)
+            future: Future = Future()
+            future.set_result(
+                self._handle_result(channel_id, url, thread_ts, existing.model_dump())
+            )
+            return future
+
+        # Concurrent requests for the same video share one scheduled download
+        video_id = extract_video_id(url)
+        # The lane is picked in the start function, so only the first caller probes
+        shared, attached = self.single_flight.do(
+            video_id or url,
+            lambda: self.scheduler.submit(
+                self._journaled(
+                    self._journal_job(job_id, url, channel_id, thread_ts, user_id),
+                    lambda: self._execute_download(channel_id, url, thread_ts),
+                ),
+                user_id=user_id,
+                lane=self._pick_lane(url, user_id),
+                label=url,
+            ),
+        )
+
+        if attached:
+            self._send_feedback(
+                channel_id,
+                f"🔗 This video is already being downloaded, I'll reply here when it's done\n{url}",
+                thread_ts
+            )
+        elif not shared.running() and not shared.done():
+            self._send_feedback(
+                channel_id,
+                f"🕒 Queued, waiting for a free download slot...\n{url}",
+                thread_ts
+            )
+
+        # Every requester gets its own reply in its own thread
+        future: Future = Future()
+
+        def deliver(done: Future) -> None:
+            result = self._shared_result(done)
+            if attached and job_id is not None:
+                self._settle_job(job_id, result)
+            future.set_result(self._handle_result(channel_id, url, thread_ts, result))
+
+        shared.add_done_callback(deliver)
+        return future
+
+    async def _adownload_video(
+        self,
+        channel_id: str,
+        url: str,
+        thread_ts: str,
+        user_id: str = "",
+        job_id: Optional[int] = None,
+    ) -> dict[str, Any]:
+        """
+        Download a single video from the event loop
+
+        The scheduler still decides when the download may start (slots,
+        lanes, per-user cap), but the download itself runs on the loop;
+        the scheduler slot just waits for it.
+
+        Args:
+            channel_id: Slack channel for feedback
+            url: YouTube URL
+            thread_ts: Thread timestamp
+            user_id: User who requested the download (for the per-user cap)
+            job_id: Journal job being resumed, if any
+
         Returns:
             Download result dictionary
         """
+        existing = self.tools[0].find_existing(url)
+        if existing is not None:
+            if job_id is not None:
+                self.journal.update(job_id, JOB_DONE)
+            return await self._ahandle_result(channel_id, url, thread_ts, existing.model_dump())
+
+        loop = asyncio.get_running_loop()
+        video_id = extract_video_id(url)
+        # Off the loop: the first caller may probe the duration to pick the lane
+        shared, attached = await loop.run_in_executor(
+            None,
+            self.single_flight.do,
+            video_id or url,
+            lambda: self.scheduler.submit(
+                self._journaled(
+                    self._journal_job(job_id, url, channel_id, thread_ts, user_id),
+                    lambda: asyncio.run_coroutine_threadsafe(
+                        self._aexecute_download(channel_id, url, thread_ts), loop
+                    ).result(),
+                ),
+                user_id=user_id,
+                lane=self._pick_lane(url, user_id),
+                label=url,
+            ),
+        )
+
+        if attached:
+            await self._asend_feedback(
+                channel_id,
+                f"🔗 This video is already being downloaded, I'll reply here when it's done\n{url}",
+                thread_ts
+            )
+        elif not shared.running() and not shared.done():
+            await self._asend_feedback(
+                channel_id,
+                f"🕒 Queued, waiting for a free download slot...\n{url}",
+                thread_ts
+            )
+
+        try:
+            # Shielded: other requesters may be waiting on the same download
+            await asyncio.shield(asyncio.wrap_future(shared))
+        except asyncio.CancelledError:
+            # A cancelled download (shutdown) is a result; a cancelled waiter is not
+            if not shared.cancelled():
+                raise
+        except Exception:
+            pass
+        result = self._shared_result(shared)
+        if attached and job_id is not None:
+            self._settle_job(job_id, result)
+        return await self._ahandle_result(channel_id, url, thread_ts, result)
+
+    def _pick_lane(self, url: str, user_id: str) -> str:
+        """
+        Pick the scheduler lane of a download
+
+        The duration is probed only when the download has to wait for a slot,
+        since only then does its lane matter.
+
+        Args:
+            url: YouTube URL
+            user_id: User who requested the download
+
+        Returns:
+            Lane name
+        """
+        lane = classify_lane(url)
+        if lane != LANE_NORMAL or self.scheduler.would_start(user_id):
+            return lane
+        info = self.tools[0].get_video_info(url)
+        return classify_lane(url, duration=info.get("duration") if info else None)
+
+    def _journal_job(
+        self, job_id: Optional[int], url: str, channel_id: str, thread_ts: str, user_id: str
+    ) -> int:
+        """The resumed journal job, or a new one for a fresh download"""
+        if job_id is not None:
+            return job_id
+        return self.journal.add(url, channel_id, thread_ts, user_id)
+
+    def _shared_result(self, done: Future) -> dict[str, Any]:
+        """Result of a finished shared download, also when it failed or was cancelled"""
+        if done.cancelled():
+            return {"success": False, "message": INTERRUPTED_MESSAGE}
+        try:
+            return done.result()
+        except Exception as e:
+            return {"success": False, "message": str(e)}
+
+    def _execute_download(
+        self,
+        channel_id: str,
+        url: str,
+        thread_ts: str
+    ) -> dict[str, Any]:
+        """
+        Download a single video using the tool (runs in a scheduler slot)
+        
+        Args:
+            channel_id: Slack channel of the request that started the download
+            url: YouTube URL
+            thread_ts: Thread timestamp
+            
+        Returns:
+            Parsed tool output (YouTubeDownloadOutput fields)
+        """
         logger.info(f"Downloading: {url}")
         
-        # Send starting feedback
-        self._send_feedback(
+        # Send starting feedback; this message is then edited with progress
+        status_ts = self._send_feedback(
             channel_id,
             f"⏳ Downloading video...\n{url}",
             thread_ts
         )
-        
+        status = self._create_status(channel_id, status_ts)
+
+        def on_progress(event: ProgressEvent) -> None:
+            status.update(f"⏳ Downloading video... {event.describe()}\n{url}")
+
         # Use the YouTube download tool
         download_tool = self.tools[0]  # YouTubeDownloadTool
         
         try:
-            import json
-            result_json = download_tool.run(url)
+            result_json = download_tool.download(
+                url, on_progress=on_progress if status is not None else None
+            )
             result = json.loads(result_json)
-            
-            if result.get("success"):
-                # Send success feedback
-                title = result.get("title", "Unknown")
-                file_path = result.get("file_path", "")
-                file_name = file_path.split("/")[-1] if file_path else "Unknown"
-                
-                self._send_feedback(
-                    channel_id,
-                    f"✅ Download complete!\n*{title}*\n📁 `{file_name}`",
-                    thread_ts
-                )
-                
-                return {
-                    "success": True,
-                    "url": url,
-                    "title": title,
-                    "file_path": file_path
-                }
-            else:
-                # Send failure feedback
-                error_msg = result.get("message", "Unknown error")
-                self._send_feedback(
-                    channel_id,
-                    f"❌ Download failed: {error_msg}\n{url}",
-                    thread_ts
-                )
-                
-                return {
-                    "success": False,
-                    "url": url,
-                    "error": error_msg
-                }
                 
         except Exception as e:
-            error_msg = str(e)
-            logger.error(f"Download failed: {error_msg}", exc_info=True)
-            
-            self._send_feedback(
-                channel_id,
-                f"❌ Download failed: {error_msg}\n{url}",
-                thread_ts
+            logger.error(f"Download failed: {e}", exc_info=True)
+            result = {"success": False, "message": str(e)}
+
+        if not result.get("success") and self._stopping.is_set():
+            result["message"] = INTERRUPTED_MESSAGE
+        if status is not None:
+            final = "⬇️ Download finished" if result.get("success") else "⚠️ Download stopped"
+            status.update(f"{final}\n{url}", force=True)
+        return result
+
+    async def _aexecute_download(
+        self,
+        channel_id: str,
+        url: str,
+        thread_ts: str
+    ) -> dict[str, Any]:
+        """
+        Download a single video with the tool's async subprocess path
+
+        Args:
+            channel_id: Slack channel of the request that started the download
+            url: YouTube URL
+            thread_ts: Thread timestamp
+
+        Returns:
+            Parsed tool output (YouTubeDownloadOutput fields)
+        """
+        logger.info(f"Downloading: {url}")
+
+        status_ts = await self._asend_feedback(
+            channel_id,
+            f"⏳ Downloading video...\n{url}",
+            thread_ts
+        )
+        status = self._create_status(channel_id, status_ts)
+
+        def on_progress(event: ProgressEvent) -> None:
+            status.update(f"⏳ Downloading video... {event.describe()}\n{url}")
+
+        try:
+            result_json = await self.tools[0].adownload(
+                url, on_progress=on_progress if status is not None else None
             )
+            result = json.loads(result_json)
+        except Exception as e:
+            logger.error(f"Download failed: {e}", exc_info=True)
+            result = {"success": False, "message": str(e)}
+
+        if not result.get("success") and self._stopping.is_set():
+            result["message"] = INTERRUPTED_MESSAGE
+        if status is not None:
+            final = "⬇️ Download finished" if result.get("success") else "⚠️ Download stopped"
+            status.update(f"{final}\n{url}", force=True)
+        return result
+
+    def _handle_result(
+        self,
+        channel_id: str,
+        url: str,
+        thread_ts: str,
+        result: dict[str, Any]
+    ) -> dict[str, Any]:
+        """
+        Send feedback for a tool result and convert it to a download result
+        
+        Args:
+            channel_id: Slack channel for feedback
+            url: YouTube URL
+            thread_ts: Thread timestamp
+            result: Parsed YouTubeDownloadOutput
             
-            return {
-                "success": False,
+        Returns:
+            Download result dictionary
+        """
+        feedback, download_result = self._describe_result(url, result)
+        self._send_feedback(channel_id, feedback, thread_ts)
+        return download_result
+
+    async def _ahandle_result(
+        self,
+        channel_id: str,
+        url: str,
+        thread_ts: str,
+        result: dict[str, Any]
+    ) -> dict[str, Any]:
+        """Async variant of _handle_result"""
+        feedback, download_result = self._describe_result(url, result)
+        await self._asend_feedback(channel_id, feedback, thread_ts)
+        return download_result
+
+    @staticmethod
+    def _describe_result(url: str, result: dict[str, Any]) -> tuple[str, dict[str, Any]]:
+        """
+        Convert a tool result to a feedback message and a download result
+
+        Args:
+            url: YouTube URL
+            result: Parsed YouTubeDownloadOutput
+
+        Returns:
+            (feedback message, download result dictionary)
+        """
+        if result.get("success"):
+            title = result.get("title") or "Unknown"
+            file_path = result.get("file_path") or ""
+            file_name = file_path.split("/")[-1] if file_path else "Unknown"
+
+            if result.get("already_downloaded"):
+                feedback = f"♻️ Already downloaded\n*{title}*\n📁 `{file_name}`"
+            else:
+                feedback = f"✅ Download complete!\n*{title}*\n📁 `{file_name}`"
+
+            return feedback, {
+                "success": True,
                 "url": url,
-                "error": error_msg
+                "title": title,
+                "file_path": file_path,
+                "file_size": result.get("file_size"),
+                "already_downloaded": result.get("already_downloaded", False),
             }
 
+        error_msg = result.get("message", "Unknown error")
+        if error_msg == INTERRUPTED_MESSAGE:
+            feedback = f"⏸️ {INTERRUPTED_MESSAGE}\n{url}"
+        elif result.get("rejected"):
+            feedback = f"💾 Can't download this one: {error_msg}\n{url}"
+        else:
+            feedback = f"❌ Download failed: {error_msg}\n{url}"
+        return feedback, {
+            "success": False,
+            "url": url,
+            "error": error_msg
+        }
@@ -0,0 +1,314 @@
+"""Asyncio Slack Socket Mode handler (the "async" runtime mode)"""
+
+import asyncio
+import logging
+import time
+from typing import Any, Awaitable, Callable, Optional, Union
+
+from slack_sdk import WebClient
+from slack_sdk.socket_mode.request import SocketModeRequest
+from slack_sdk.socket_mode.response import SocketModeResponse
+from slack_sdk.web.async_client import AsyncWebClient
+
+from .backfill import Backfiller, ChannelCursors
+from .config import Settings
+from .event_dedup import EventDeduplicator, event_keys
+from .slack_dispatcher import AsyncSlackDispatcher, PendingMessage
+from .slack_events import parse_message_event
+from .slack_handler import BUSY_MESSAGE
+
+logger = logging.getLogger(__name__)
+
+
+class AsyncSlackHandler:
+    """
+    Handles Slack Socket Mode connections and message events on one event loop
+
+    Messages go into a bounded asyncio queue served by `worker_count` tasks,
+    so a burst is limited the same way as in the threaded runtime, but a
+    waiting conversation costs a task instead of a thread.
+    """
+
+    def __init__(self, settings: Settings):
+        """
+        Initialize the Slack handler (connects in start())
+
+        Args:
+            settings: Application settings containing Slack tokens
+        """
+        self.settings = settings
+        self.web_client = AsyncWebClient(token=settings.slack_bot_token)
+        self.socket_client = None
+        self.message_callback: Optional[Callable[..., Awaitable[Any]]] = None
+        self.bot_user_id: Optional[str] = None
+        self.dedup = EventDeduplicator(
+            window=settings.event_dedup_window,
+            max_size=settings.event_dedup_max_size,
+            path=settings.event_dedup_path or None,
+        )
+        self.cursors = ChannelCursors(settings.channel_cursor_path or None)
+        self.download_index = None
+        self.dispatcher = AsyncSlackDispatcher(
+            self.web_client,
+            rate=settings.slack_send_rate,
+            burst=settings.slack_send_burst,
+        )
+        self._backfill_task: Optional[asyncio.Future] = None
+        self._queue: Optional[asyncio.Queue] = None
+        self._workers: list[asyncio.Task] = []
+        self._wait_times: list[float] = []
+        self._processed = 0
+        self._failed = 0
+        self._rejected = 0
+
+    async def _get_bot_user_id(self) -> None:
+        """Get the bot's user ID to filter out its own messages"""
+        try:
+            response = await self.web_client.auth_test()
+            self.bot_user_id = response["user_id"]
+            logger.info(f"Bot User ID: {self.bot_user_id}")
+        except Exception as e:
+            logger.error(f"Failed to get bot user ID: {e}")
+            raise
+
+    def set_message_callback(self, callback: Callable[..., Awaitable[Any]]) -> None:
+        """
+        Set the coroutine function for processing messages
+
+        Args:
+            callback: Coroutine function taking (channel_id, user_id, text, ts)
+        """
+        self.message_callback = callback
+
+    def set_download_index(self, index) -> None:
+        """
+        Set the download index the backfill checks before replaying a message
+
+        Args:
+            index: DownloadIndex of the agent
+        """
+        self.download_index = index
+
+    async def _handle_socket_message(
+        self, client: Any, message: dict, raw_message: Optional[str]
+    ) -> None:
+        """Start a backfill on every (re)connect; Slack greets each connection with hello"""
+        if message.get("type") == "hello":
+            self._start_backfill()
+
+    def _start_backfill(self) -> None:
+        """Catch up on missed messages in an executor thread (one run at a time)"""
+        if not self.settings.backfill_enabled or not self.settings.monitored_channels:
+            return
+        if self._backfill_task is not None and not self._backfill_task.done():
+            return
+
+        loop = asyncio.get_running_loop()
+        backfiller = Backfiller(
+            # The pager is synchronous; it runs off the loop with its own client
+            WebClient(token=self.settings.slack_bot_token),
+            self.cursors,
+            self.settings.monitored_channels,
+            submit=lambda *message: asyncio.run_coroutine_threadsafe(
+                self._enqueue(message), loop
+            ).result(),
+            bot_user_id=self.bot_user_id,
+            dedup=self.dedup,
+            index=self.download_index,
+            max_age=self.settings.backfill_max_age,
+        )
+        self._backfill_task = loop.run_in_executor(None, backfiller.run)
+        self._backfill_task.add_done_callback(self._log_backfill_failure)
+
+    @staticmethod
+    def _log_backfill_failure(task: asyncio.Future) -> None:
+        if not task.cancelled() and task.exception() is not None:
+            logger.error(f"Backfill failed: {task.exception()}")
+
+    async def _enqueue(self, message: tuple) -> bool:
+        """
+        Queue a message, waiting at most queue_put_timeout for a free slot
+
+        Returns:
+            False if the queue stayed full
+        """
+        try:
+            await asyncio.wait_for(
+                self._queue.put((message, time.monotonic())),
+                self.settings.queue_put_timeout,
+            )
+            return True
+        except asyncio.TimeoutError:
+            self._rejected += 1
+            logger.warning(f"Message queue full ({self._queue.maxsize}), rejecting message")
+            return False
+
+    async def _handle_request(self, client: Any, req: SocketModeRequest) -> None:
+        """
+        Handle incoming Socket Mode requests
+
+        Args:
+            client: Async socket mode client
+            req: Socket mode request containing the event
+        """
+        # Acknowledge the request immediately
+        await client.send_socket_mode_response(SocketModeResponse(envelope_id=req.envelope_id))
+
+        if req.type != "events_api":
+            return
+        message = parse_message_event(
+            req.payload, self.bot_user_id, self.settings.monitored_channels
+        )
+        if message is None or not self.message_callback:
+            return
+        if self.dedup.is_duplicate(event_keys(req.envelope_id, req.payload)):
+            logger.info(f"Dropping redelivered event (retry {req.retry_attempt})")
+            return
+
+        channel_id, _, _, ts = message
+        self.cursors.start(channel_id, ts)
+        if not await self._enqueue(message):
+            # The user is told to retry, so the backfill mustn't replay it
+            self.cursors.finish(channel_id, ts)
+            await self.send_message(channel_id, BUSY_MESSAGE, thread_ts=ts)
+
+    async def _worker(self) -> None:
+        """Process queued messages one at a time"""
+        while True:
+            message, enqueued = await self._queue.get()
+            self._wait_times.append(time.monotonic() - enqueued)
+            del self._wait_times[:-1000]
+            try:
+                try:
+                    await self.message_callback(*message)
+                    self._processed += 1
+                except Exception as e:
+                    self._failed += 1
+                    logger.error(f"Message handler failed: {e}", exc_info=True)
+                # Not reached when cancelled at shutdown: the message stays pending
+                self.cursors.finish(message[0], message[3])
+            finally:
+                self._queue.task_done()
+
+    def queue_stats(self) -> dict:
+        """Get statistics for the message queue"""
+        waits = sorted(self._wait_times)
+        return {
+            "depth": self._queue.qsize() if self._queue is not None else 0,
+            "max_size": self.settings.queue_max_size,
+            "workers": len(self._workers),
+            "processed": self._processed,
+            "failed": self._failed,
+            "rejected": self._rejected,
+            "wait_ms_p95": (
+                waits[min(len(waits) - 1, int(len(waits) * 0.95))] * 1000 if waits else 0.0
+            ),
+        }
+
+    def outbound_stats(self) -> dict[str, Any]:
+        """Get statistics for outbound messages"""
+        return self.dispatcher.stats()
+
+    async def send_message(
+        self, channel_id: str, text: str, thread_ts: Optional[str] = None
+    ) -> PendingMessage:
+        """
+        Queue a message to a Slack channel (sent by the dispatcher task)
+
+        Args:
+            channel_id: The channel ID to send the message to
+            text: The message text
+            thread_ts: Optional thread timestamp to reply in a thread
+
+        Returns:
+            Handle for editing the message
+        """
+        return self.dispatcher.post(channel_id, text, thread_ts=thread_ts)
+
+    async def update_message(
+        self, channel_id: str, ts: Union[str, PendingMessage], text: str
+    ) -> None:
+        """
+        Queue an edit of a message the bot sent
+
+        Args:
+            channel_id: The channel ID of the message
+            ts: Timestamp of the message, or the handle returned by send_message
+            text: The new message text
+        """
+        self.dispatcher.update(channel_id, ts, text)
+
+    async def start(self) -> None:
+        """Start the workers and the Socket Mode connection"""
+        try:
+            # aiohttp is only needed by this runtime mode
+            from slack_sdk.socket_mode.aiohttp import SocketModeClient
+        except ImportError as e:
+            raise RuntimeError(
+                "The async runtime needs aiohttp. Install it with: pip install aiohttp"
+            ) from e
+
+        try:
+            await self._get_bot_user_id()
+
+            self.dispatcher.start()
+            self._queue = asyncio.Queue(maxsize=self.settings.queue_max_size)
+            self._workers = [
+                asyncio.create_task(self._worker(), name=f"message-worker-{i}")
+                for i in range(self.settings.worker_count)
+            ]
+
+            self.socket_client = SocketModeClient(
+                app_token=self.settings.slack_app_token, web_client=self.web_client
+            )
+            self.socket_client.socket_mode_request_listeners.append(self._handle_request)
+            self.socket_client.message_listeners.append(self._handle_socket_message)
+
+            logger.info("Starting Slack Socket Mode connection (async)...")
+            await self.socket_client.connect()
+
+            logger.info("✅ Successfully connected to Slack!")
+
+        except Exception as e:
+            logger.error(f"Failed to start Slack connection: {e}")
+            raise
+
+    async def disconnect(self) -> None:
+        """Close the Socket Mode connection so no new messages arrive"""
+        if self.socket_client is not None:
+            logger.info("Disconnecting from Slack...")
+            await self.socket_client.close()
+            self.socket_client = None
+            logger.info("Disconnected from Slack")
+
+    async def stop(self, timeout: float = 10.0) -> None:
+        """
+        Disconnect, let the workers finish the queued messages, then flush
+        outbound messages
+
+        Args:
+            timeout: Maximum seconds to wait for the queue to drain
+        """
+        await self.disconnect()
+
+        if self._queue is not None:
+            try:
+                await asyncio.wait_for(self._queue.join(), timeout)
+            except asyncio.TimeoutError:
+                logger.warning(f"{self._queue.qsize()} queued message(s) dropped at shutdown")
+
+        for worker in self._workers:
+            worker.cancel()
+        await asyncio.gather(*self._workers, return_exceptions=True)
+        self._workers = []
+        logger.info(f"Message queue stats: {self.queue_stats()}")
+        self.dedup.save()
+        self.cursors.save()
+
+        # Last, so replies produced while draining the queue still go out
+        await self.dispatcher.stop()
+        logger.info(f"Outbound message stats: {self.dispatcher.stats()}")
+
+    def is_connected(self) -> bool:
+        """Check if the Socket Mode client is connected"""
+        return self.socket_client is not None and self.socket_client.is_connected()
@@ -0,0 +1,335 @@
+"""Catch-up of messages posted while the agent was disconnected from Slack"""
+
+import json
+import logging
+import os
+import threading
+import time
+from pathlib import Path
+from typing import Any, Callable, Iterator, Optional
+
+from slack_sdk import WebClient
+from slack_sdk.errors import SlackApiError
+
+from .event_dedup import EventDeduplicator, event_keys
+from .slack_events import parse_message_event
+from .tools.download_index import VIDEO_ID_PATTERN, DownloadIndex
+
+logger = logging.getLogger(__name__)
+
+# conversations.history is a Tier 3 method (about 50 calls a minute)
+PAGE_SIZE = 200
+PAGE_INTERVAL = 1.2
+
+# Pause after a 429 response without a Retry-After header
+DEFAULT_RETRY_AFTER = 5.0
+
+
+class ChannelCursors:
+    """
+    Per channel, the `ts` up to which every message has been processed
+
+    Messages are marked with `start()` when they are queued and `finish()`
+    once their processing completed. A channel's cursor only moves up to
+    the newest finished message older than every message still pending, so
+    a message that was queued or running when the agent stopped stays after
+    the cursor and the next backfill replays it. Only the cursors are
+    persisted; when `path` is set, they are loaded from that JSON file on
+    startup and written back (atomically) at most every `save_interval`
+    seconds and on `save()`.
+    """
+
+    def __init__(self, path: Optional[str] = None, save_interval: float = 5):
+        """
+        Initialize the cursors
+
+        Args:
+            path: Optional JSON file for persistence across restarts
+            save_interval: Minimum seconds between automatic saves
+        """
+        self.path = path
+        self.save_interval = save_interval
+        self._lock = threading.Lock()
+        self._cursors: dict[str, str] = {}
+        # channel -> {ts: whether it is queued or running}; False once a
+        # backfill had to give it up, so the next backfill submits it again
+        self._pending: dict[str, dict[str, bool]] = {}
+        # channel -> finished ts after the cursor (waiting on older pending ones)
+        self._finished: dict[str, set[str]] = {}
+        self._dirty = False
+        self._last_save = time.monotonic()
+        if path:
+            self._load()
+
+    def get(self, channel_id: str) -> Optional[str]:
+        """Get the last processed ts of a channel"""
+        with self._lock:
+            return self._cursors.get(channel_id)
+
+    def advance(self, channel_id: str, ts: str) -> None:
+        """
+        Move a channel's cursor forward (never back), e.g. to start a new channel
+
+        Args:
+            channel_id: Slack channel ID
+            ts: Timestamp up to which nothing needs processing
+        """
+        with self._lock:
+            self._move(channel_id, ts)
+            due = self._dirty and time.monotonic() - self._last_save >= self.save_interval
+
+        if self.path and due:
+            self.save()
+
+    def start(self, channel_id: str, ts: str) -> None:
+        """Mark a message as queued; the cursor stays before it until it finishes"""
+        with self._lock:
+            self._pending.setdefault(channel_id, {})[ts] = True
+
+    def abandon(self, channel_id: str, ts: str) -> None:
+        """Mark a queued message as not queued after all; the next backfill retries it"""
+        with self._lock:
+            pending = self._pending.get(channel_id, {})
+            if ts in pending:
+                pending[ts] = False
+
+    def finish(self, channel_id: str, ts: str) -> None:
+        """
+        Mark a message as processed and move the cursor as far as that allows
+
+        Args:
+            channel_id: Slack channel ID
+            ts: Timestamp of the processed (or deliberately skipped) message
+        """
+        with self._lock:
+            self._pending.get(channel_id, {}).pop(ts, None)
+            current = self._cursors.get(channel_id)
+            if current is None or float(ts) > float(current):
+                self._finished.setdefault(channel_id, set()).add(ts)
+
+            pending = self._pending.get(channel_id)
+            finished = self._finished.get(channel_id, set())
+            oldest_pending = min(map(float, pending)) if pending else float("inf")
+            done = [done_ts for done_ts in finished if float(done_ts) < oldest_pending]
+            if done:
+                finished.difference_update(done)
+                self._move(channel_id, max(done, key=float))
+            due = self._dirty and time.monotonic() - self._last_save >= self.save_interval
+
+        if self.path and due:
+            self.save()
+
+    def is_handled(self, channel_id: str, ts: str) -> bool:
+        """Whether a message after the cursor is queued, running or finished"""
+        with self._lock:
+            return bool(self._pending.get(channel_id, {}).get(ts)) or ts in self._finished.get(
+                channel_id, set()
+            )
+
+    def _move(self, channel_id: str, ts: str) -> None:
+        """Move the cursor forward (lock held)"""
+        current = self._cursors.get(channel_id)
+        if current is not None and float(current) >= float(ts):
+            return
+        self._cursors[channel_id] = ts
+        self._dirty = True
+
+    def _load(self) -> None:
+        """Load the cursors from the persistence file"""
+        path = Path(self.path)
+        if not path.exists():
+            return
+        try:
+            self._cursors = dict(json.loads(path.read_text(encoding="utf-8")))
+        except (OSError, ValueError, TypeError) as e:
+            logger.warning(f"Ignoring unreadable channel cursor file {path}: {e}")
+
+    def save(self) -> None:
+        """Write the cursors to the persistence file if they changed"""
+        if not self.path:
+            return
+        with self._lock:
+            if not self._dirty:
+                return
+            cursors = dict(self._cursors)
+            self._dirty = False
+            self._last_save = time.monotonic()
+
+        path = Path(self.path)
+        tmp_path = path.with_suffix(path.suffix + ".tmp")
+        try:
+            tmp_path.write_text(json.dumps(cursors), encoding="utf-8")
+            os.replace(tmp_path, path)
+        except OSError as e:
+            logger.error(f"Failed to save channel cursors: {e}")
+
+
+class Backfiller:
+    """
+    Replays messages missed while disconnected through the normal pipeline
+
+    For each monitored channel, conversations.history is paged from the
+    channel's cursor onwards, oldest message first. Messages already queued
+    or processed in this run, messages without a YouTube video and messages
+    whose videos are all in the download index are skipped; the rest are
+    submitted as if they had just arrived. Receiving a message is not enough
+    to skip it: one that was received but not processed before a restart is
+    after the cursor and is submitted again.
+    """
+
+    def __init__(
+        self,
+        web_client: WebClient,
+        cursors: ChannelCursors,
+        channels: set[str],
+        submit: Callable[[str, str, str, str], bool],
+        bot_user_id: Optional[str] = None,
+        dedup: Optional[EventDeduplicator] = None,
+        index: Optional[DownloadIndex] = None,
+        max_age: float = 86400,
+        page_interval: float = PAGE_INTERVAL,
+    ):
+        """
+        Initialize the backfiller
+
+        Args:
+            web_client: Slack Web API client
+            cursors: Last processed ts per channel
+            channels: Channels to catch up on
+            submit: Queues a message (channel_id, user_id, text, ts); False if rejected
+            bot_user_id: The bot's own user ID
+            dedup: Seen-event set shared with the live handler; submitted
+                messages are added so a late redelivery is dropped
+            index: Download index; messages with only downloaded videos are skipped
+            max_age: Seconds of history to look back at most
+            page_interval: Minimum seconds between two history calls
+        """
+        self.web_client = web_client
+        self.cursors = cursors
+        self.channels = channels
+        self.submit = submit
+        self.bot_user_id = bot_user_id
+        self.dedup = dedup
+        self.index = index
+        self.max_age = max_age
+        self.page_interval = page_interval
+
+        self._last_call = 0.0
+        self.pages = 0
+        self.rate_limited = 0
+        self.submitted = 0
+        self.skipped = 0
+
+    def run(self) -> int:
+        """
+        Catch up on every channel
+
+        Returns:
+            Number of messages submitted
+        """
+        submitted = self.submitted
+        for channel_id in sorted(self.channels):
+            try:
+                if not self._backfill_channel(channel_id):
+                    break
+            except SlackApiError as e:
+                logger.error(f"Backfill of {channel_id} failed: {e}")
+        self.cursors.save()
+
+        count = self.submitted - submitted
+        logger.info(f"Backfill finished: {count} missed message(s) submitted, stats {self.stats()}")
+        return count
+
+    def _backfill_channel(self, channel_id: str) -> bool:
+        """
+        Catch up on one channel
+
+        Returns:
+            False if the queue rejected a message (stop for now, retry next time)
+        """
+        cursor = self.cursors.get(channel_id)
+        if cursor is None:
+            # First start: only messages from now on
+            self.cursors.advance(channel_id, f"{time.time():.6f}")
+            return True
+
+        oldest = max(float(cursor), time.time() - self.max_age)
+        for message in self._history(channel_id, f"{oldest:.6f}"):
+            ts = message["ts"]
+            if self.cursors.is_handled(channel_id, ts):
+                self.skipped += 1
+                continue
+            payload = {"event": {"type": "message", **message, "channel": channel_id}}
+            parsed = parse_message_event(payload, self.bot_user_id, {channel_id})
+            if parsed is None or not self._wanted(parsed[2]):
+                self.skipped += 1
+                self.cursors.finish(channel_id, ts)
+                continue
+
+            keys = event_keys(None, payload)
+            if self.dedup is not None:
+                self.dedup.is_duplicate(keys)
+            self.cursors.start(channel_id, ts)
+            if not self.submit(*parsed):
+                self.cursors.abandon(channel_id, ts)
+                if self.dedup is not None:
+                    self.dedup.forget(keys)
+                logger.warning("Message queue full, stopping the backfill until the next connect")
+                return False
+            self.submitted += 1
+        return True
+
+    def _wanted(self, text: str) -> bool:
+        """Whether a message has a YouTube video that isn't downloaded yet"""
+        video_ids = set(VIDEO_ID_PATTERN.findall(text))
+        if not video_ids:
+            return False
+        if self.index is None:
+            return True
+        return any(self.index.get(video_id) is None for video_id in video_ids)
+
+    def _history(self, channel_id: str, oldest: str) -> Iterator[dict[str, Any]]:
+        """Messages after `oldest`, oldest first"""
+        messages: list[dict[str, Any]] = []
+        page_cursor = None
+        while True:
+            response = self._call(
+                channel=channel_id, oldest=oldest, limit=PAGE_SIZE, cursor=page_cursor
+            )
+            messages.extend(response.get("messages", []))
+            page_cursor = (response.get("response_metadata") or {}).get("next_cursor")
+            if not response.get("has_more") or not page_cursor:
+                break
+        # Pages come newest first
+        messages.sort(key=lambda message: float(message["ts"]))
+        yield from messages
+
+    def _call(self, **kwargs: Any) -> Any:
+        """Call conversations.history, spacing calls and waiting out rate limits"""
+        while True:
+            wait = self._last_call + self.page_interval - time.monotonic()
+            if wait > 0:
+                time.sleep(wait)
+            self._last_call = time.monotonic()
+            try:
+                response = self.web_client.conversations_history(**kwargs)
+                self.pages += 1
+                return response
+            except SlackApiError as e:
+                if e.response.status_code != 429:
+                    raise
+                self.rate_limited += 1
+                headers = e.response.headers or {}
+                retry_after = headers.get("Retry-After") or headers.get("retry-after")
+                delay = float(retry_after) if retry_after else DEFAULT_RETRY_AFTER
+                logger.warning(f"conversations.history rate limited, retrying in {delay:.0f}s")
+                time.sleep(delay)
+
+    def stats(self) -> dict[str, int]:
+        """Get page, rate-limit and message counters"""
+        return {
+            "pages": self.pages,
+            "rate_limited": self.rate_limited,
+            "submitted": self.submitted,
+            "skipped": self.skipped,
+        }
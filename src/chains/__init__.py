@@ -1,6 +1,22 @@
 """LangChain chains for URL extraction and processing"""
 
-from .url_extraction import URLExtractionChain, create_url_extraction_chain
+from .circuit_breaker import CircuitBreaker, CircuitOpenError
+from .extraction_cache import ExtractionCache
+from .intent_classifier import ConfidentIntentClassifier, IntentClassifier
+from .url_extraction import (
+    EXTRACTION_MODES,
+    URLExtractionChain,
+    create_url_extraction_chain,
+)
 
-__all__ = ["URLExtractionChain", "create_url_extraction_chain"]
+__all__ = [
+    "CircuitBreaker",
+    "CircuitOpenError",
+    "ConfidentIntentClassifier",
+    "EXTRACTION_MODES",
+    "ExtractionCache",
+    "IntentClassifier",
+    "URLExtractionChain",
+    "create_url_extraction_chain",
+]
 
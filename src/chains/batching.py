@@ -0,0 +1,162 @@
+"""Micro-batching of concurrent LLM requests"""
+
+import logging
+import queue
+import threading
+import time
+from concurrent.futures import Future, ThreadPoolExecutor
+from typing import Any, Callable, Optional
+
+logger = logging.getLogger(__name__)
+
+
+class MicroBatcher:
+    """
+    Collects concurrent requests into small batches
+
+    The first request opens a window of `window` seconds; everything that
+    arrives before it closes (up to `max_batch_size` items) is handed to
+    `process_batch` in one call, and each caller gets its own result back.
+    Batches are processed on a small executor so the next window can fill
+    while the previous batch is still running.
+    """
+
+    def __init__(
+        self,
+        process_batch: Callable[[list[Any]], list[Any]],
+        window: float = 0.05,
+        max_batch_size: int = 8,
+        max_parallel_batches: int = 2,
+        name: str = "batcher",
+        max_wait: Optional[float] = None,
+    ):
+        """
+        Initialize the batcher
+
+        Args:
+            process_batch: Function mapping a list of inputs to a list of results
+                (same length and order); a result that is an Exception is raised
+                in the caller that submitted the matching input
+            window: Seconds to wait for more requests after the first one
+            max_batch_size: Maximum number of requests in one batch
+            max_parallel_batches: Batches that may be processed at the same time
+            name: Name of the collector thread
+            max_wait: Default maximum seconds submit() waits for a result
+        """
+        self.process_batch = process_batch
+        self.window = window
+        self.max_batch_size = max(1, max_batch_size)
+        self.max_wait = max_wait
+
+        self._queue: queue.Queue[tuple[Any, Future]] = queue.Queue()
+        self._executor = ThreadPoolExecutor(
+            max_workers=max(1, max_parallel_batches), thread_name_prefix=name
+        )
+        self._stats_lock = threading.Lock()
+        self._batches = 0
+        self._items = 0
+        self._batch_seconds = 0.0
+        self._single_latency: Optional[float] = None
+        self._collector = threading.Thread(target=self._collect_loop, name=name, daemon=True)
+        self._collector.start()
+
+    def submit(self, item: Any, timeout: Optional[float] = None) -> Any:
+        """
+        Process one input as part of a batch and wait for its result
+
+        Args:
+            item: Input for process_batch
+            timeout: Maximum seconds to wait for the result (default: max_wait)
+
+        Returns:
+            The result for this input
+
+        Raises:
+            TimeoutError: No result within the timeout
+        """
+        future: Future = Future()
+        self._queue.put((item, future))
+        return future.result(timeout=timeout if timeout is not None else self.max_wait)
+
+    def _collect_loop(self) -> None:
+        """Group queued requests into batches and hand them to the executor"""
+        while True:
+            batch = [self._queue.get()]
+            deadline = time.monotonic() + self.window
+            while len(batch) < self.max_batch_size:
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    break
+                try:
+                    batch.append(self._queue.get(timeout=remaining))
+                except queue.Empty:
+                    break
+            try:
+                self._executor.submit(self._run_batch, batch)
+            except RuntimeError as e:
+                # Shut down: fail the callers instead of leaving them waiting
+                for _, future in batch:
+                    future.set_exception(e)
+
+    def _run_batch(self, batch: list[tuple[Any, Future]]) -> None:
+        """Process one batch and distribute the results"""
+        inputs = [item for item, _ in batch]
+        started = time.monotonic()
+        try:
+            results = self.process_batch(inputs)
+            if len(results) != len(inputs):
+                raise RuntimeError(
+                    f"Batch returned {len(results)} results for {len(inputs)} inputs"
+                )
+        except Exception as e:
+            results = [e] * len(inputs)
+        elapsed = time.monotonic() - started
+
+        self._record(len(batch), elapsed)
+        logger.debug(f"Processed batch of {len(batch)} in {elapsed * 1000:.0f} ms")
+
+        for (_, future), result in zip(batch, results):
+            if isinstance(result, Exception):
+                future.set_exception(result)
+            else:
+                future.set_result(result)
+
+    def _record(self, size: int, elapsed: float) -> None:
+        """Update batch counters and the single-request latency estimate"""
+        with self._stats_lock:
+            self._batches += 1
+            self._items += size
+            self._batch_seconds += elapsed
+            if size == 1:
+                # Exponential moving average of unbatched latency, the baseline for gain
+                if self._single_latency is None:
+                    self._single_latency = elapsed
+                else:
+                    self._single_latency = 0.8 * self._single_latency + 0.2 * elapsed
+
+    def stats(self) -> dict[str, Any]:
+        """
+        Get batching statistics
+
+        `throughput_gain` compares the measured batch time with running the
+        same requests one at a time at the observed single-request latency.
+        """
+        with self._stats_lock:
+            stats: dict[str, Any] = {
+                "batches": self._batches,
+                "items": self._items,
+                "avg_batch_size": self._items / self._batches if self._batches else 0.0,
+                "single_latency_ms": (
+                    self._single_latency * 1000 if self._single_latency is not None else None
+                ),
+                "throughput_gain": None,
+            }
+            if self._single_latency is not None and self._batch_seconds > 0:
+                stats["throughput_gain"] = (
+                    self._single_latency * self._items / self._batch_seconds
+                )
+        return stats
+
+    def shutdown(self) -> None:
+        """Stop processing new batches (the collector thread is a daemon)"""
+        self._executor.shutdown(wait=False)
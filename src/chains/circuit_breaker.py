@@ -0,0 +1,231 @@
+"""Latency-budget circuit breaker for LLM calls"""
+
+import asyncio
+import logging
+import threading
+import time
+from collections import Counter, deque
+from concurrent.futures import ThreadPoolExecutor
+from concurrent.futures import TimeoutError as FutureTimeoutError
+from typing import Any, Awaitable, Callable
+
+logger = logging.getLogger(__name__)
+
+STATE_CLOSED = "closed"
+STATE_OPEN = "open"
+STATE_HALF_OPEN = "half_open"
+
+
+class CircuitOpenError(RuntimeError):
+    """Raised when a call is refused because the circuit is open"""
+
+
+class CircuitBreaker:
+    """
+    Trips when LLM calls get too slow or fail too often
+
+    Every call runs with a hard deadline. The breaker keeps the latency and
+    outcome of the last `window` calls; when their p95 latency exceeds
+    `latency_budget` or the error rate reaches `error_threshold`, it opens
+    and refuses calls for `cooldown` seconds. After that a single probe call
+    is let through (half-open): success closes the circuit, failure opens
+    it again.
+    """
+
+    def __init__(
+        self,
+        deadline: float = 4.0,
+        latency_budget: float = 3.0,
+        error_threshold: float = 0.5,
+        window: int = 20,
+        min_calls: int = 5,
+        cooldown: float = 30.0,
+        max_workers: int = 8,
+        name: str = "llm",
+    ):
+        """
+        Initialize the breaker
+
+        Args:
+            deadline: Seconds a single call may take before it counts as failed
+            latency_budget: Rolling p95 latency (seconds) that trips the breaker
+            error_threshold: Rolling error rate (0-1) that trips the breaker
+            window: Number of recent calls the rolling numbers are computed over
+            min_calls: Calls needed in the window before the breaker can trip
+            cooldown: Seconds the circuit stays open before probing again
+            max_workers: Threads available for calls in flight
+            name: Name used in log messages
+        """
+        self.deadline = deadline
+        self.latency_budget = latency_budget
+        self.error_threshold = error_threshold
+        self.min_calls = min_calls
+        self.cooldown = cooldown
+        self.name = name
+
+        self._executor = ThreadPoolExecutor(
+            max_workers=max_workers, thread_name_prefix=f"{name}-call"
+        )
+        self._lock = threading.Lock()
+        # (latency seconds, failed) of recent calls
+        self._samples: deque[tuple[float, bool]] = deque(maxlen=window)
+        self._state = STATE_CLOSED
+        self._opened_at = 0.0
+        self._probe_in_flight = False
+        self.transitions: Counter[str] = Counter()
+        self.rejected = 0
+        self.timeouts = 0
+
+    @property
+    def state(self) -> str:
+        """Current state (closed, open or half_open)"""
+        with self._lock:
+            return self._state
+
+    def _set_state(self, state: str, reason: str) -> None:
+        """Change state and log it (caller holds the lock)"""
+        if state == self._state:
+            return
+        logger.warning(f"Circuit breaker '{self.name}': {self._state} -> {state} ({reason})")
+        self.transitions[f"{self._state}->{state}"] += 1
+        self._state = state
+        if state == STATE_OPEN:
+            self._opened_at = time.monotonic()
+        elif state == STATE_CLOSED:
+            self._samples.clear()
+
+    def _admit(self) -> bool:
+        """Decide whether a call may go through; True if it is the half-open probe"""
+        with self._lock:
+            if self._state == STATE_OPEN:
+                if time.monotonic() - self._opened_at < self.cooldown:
+                    self.rejected += 1
+                    raise CircuitOpenError(f"Circuit '{self.name}' is open")
+                self._set_state(STATE_HALF_OPEN, "cool-down elapsed, probing")
+
+            if self._state == STATE_HALF_OPEN:
+                if self._probe_in_flight:
+                    self.rejected += 1
+                    raise CircuitOpenError(f"Circuit '{self.name}' is probing")
+                self._probe_in_flight = True
+                return True
+            return False
+
+    def call(self, fn: Callable[[], Any]) -> Any:
+        """
+        Run a call under the deadline and update the breaker
+
+        Args:
+            fn: The LLM call
+
+        Returns:
+            The call's result
+
+        Raises:
+            CircuitOpenError: The circuit is open; use the fallback path
+            TimeoutError: The call exceeded the deadline
+        """
+        is_probe = self._admit()
+        started = time.monotonic()
+        future = self._executor.submit(fn)
+        try:
+            result = future.result(timeout=self.deadline)
+        except FutureTimeoutError:
+            # The call keeps running in the background; its answer is discarded
+            with self._lock:
+                self.timeouts += 1
+            self._record(self.deadline, failed=True, is_probe=is_probe)
+            raise TimeoutError(f"LLM call exceeded {self.deadline:.1f}s deadline")
+        except Exception:
+            self._record(time.monotonic() - started, failed=True, is_probe=is_probe)
+            raise
+
+        self._record(time.monotonic() - started, failed=False, is_probe=is_probe)
+        return result
+
+    async def acall(self, fn: Callable[[], Awaitable[Any]]) -> Any:
+        """
+        Async version of call; a call past the deadline is cancelled
+
+        Args:
+            fn: Coroutine function making the LLM call
+
+        Returns:
+            The call's result
+
+        Raises:
+            CircuitOpenError: The circuit is open; use the fallback path
+            TimeoutError: The call exceeded the deadline
+        """
+        is_probe = self._admit()
+        started = time.monotonic()
+        try:
+            result = await asyncio.wait_for(fn(), self.deadline)
+        except asyncio.TimeoutError:
+            with self._lock:
+                self.timeouts += 1
+            self._record(self.deadline, failed=True, is_probe=is_probe)
+            raise TimeoutError(f"LLM call exceeded {self.deadline:.1f}s deadline")
+        except asyncio.CancelledError:
+            # The caller went away; that says nothing about Ollama
+            if is_probe:
+                with self._lock:
+                    self._probe_in_flight = False
+            raise
+        except Exception:
+            self._record(time.monotonic() - started, failed=True, is_probe=is_probe)
+            raise
+
+        self._record(time.monotonic() - started, failed=False, is_probe=is_probe)
+        return result
+
+    def _record(self, latency: float, failed: bool, is_probe: bool) -> None:
+        """Add a call outcome and trip or reset the breaker"""
+        with self._lock:
+            if is_probe:
+                self._probe_in_flight = False
+                if failed or latency > self.latency_budget:
+                    self._set_state(STATE_OPEN, f"probe failed ({latency:.1f}s)")
+                else:
+                    self._set_state(STATE_CLOSED, f"probe succeeded ({latency:.1f}s)")
+                return
+
+            self._samples.append((latency, failed))
+            if self._state != STATE_CLOSED or len(self._samples) < self.min_calls:
+                return
+
+            p95 = self._p95()
+            error_rate = self._error_rate()
+            if p95 > self.latency_budget:
+                self._set_state(STATE_OPEN, f"p95 latency {p95:.1f}s > {self.latency_budget:.1f}s")
+            elif error_rate >= self.error_threshold:
+                self._set_state(STATE_OPEN, f"error rate {error_rate:.0%}")
+
+    def _p95(self) -> float:
+        """Rolling p95 latency (caller holds the lock)"""
+        latencies = sorted(latency for latency, _ in self._samples)
+        if not latencies:
+            return 0.0
+        return latencies[min(len(latencies) - 1, int(len(latencies) * 0.95))]
+
+    def _error_rate(self) -> float:
+        """Rolling error rate (caller holds the lock)"""
+        if not self._samples:
+            return 0.0
+        return sum(1 for _, failed in self._samples if failed) / len(self._samples)
+
+    def stats(self) -> dict[str, Any]:
+        """Get the state, rolling numbers and counters"""
+        with self._lock:
+            return {
+                "state": self._state,
+                "p95_ms": self._p95() * 1000,
+                "error_rate": self._error_rate(),
+                "rejected": self.rejected,
+                "timeouts": self.timeouts,
+                "transitions": dict(self.transitions),
+            }
+
+    def shutdown(self) -> None:
+        """Stop the call executor without waiting for calls in flight"""
+        self._executor.shutdown(wait=False)
@@ -0,0 +1,175 @@
+"""LRU + TTL cache for URL extraction results"""
+
+import json
+import logging
+import os
+import re
+import threading
+import time
+from collections import OrderedDict
+from pathlib import Path
+from typing import Any, Optional
+
+logger = logging.getLogger(__name__)
+
+WHITESPACE_PATTERN = re.compile(r"\s+")
+
+
+def normalize_message(text: str) -> str:
+    """
+    Normalize message text into a cache key
+
+    Whitespace is collapsed but case is kept: video IDs are case-sensitive.
+
+    Args:
+        text: Message text
+
+    Returns:
+        Normalized text
+    """
+    return WHITESPACE_PATTERN.sub(" ", text).strip()
+
+
+class ExtractionCache:
+    """
+    Thread-safe LRU cache with a per-entry TTL
+
+    Entries expire `ttl` seconds after they were stored. When `path` is set,
+    the cache is loaded from that JSON file on startup and written back
+    (atomically) at most every `save_interval` seconds and on `save()`.
+    """
+
+    def __init__(
+        self,
+        max_size: int = 1024,
+        ttl: float = 86400,
+        path: Optional[str] = None,
+        save_interval: float = 60,
+    ):
+        """
+        Initialize the cache
+
+        Args:
+            max_size: Maximum number of entries before the least recently used is evicted
+            ttl: Seconds an entry stays valid
+            path: Optional JSON file for persistence across restarts
+            save_interval: Minimum seconds between automatic saves
+        """
+        self.max_size = max(1, max_size)
+        self.ttl = ttl
+        self.path = path
+        self.save_interval = save_interval
+
+        self._lock = threading.Lock()
+        self._save_lock = threading.Lock()
+        # key -> (stored_at unix time, result)
+        self._entries: OrderedDict[str, tuple[float, dict[str, Any]]] = OrderedDict()
+        self._dirty = False
+        self._last_save = time.monotonic()
+        self.hits = 0
+        self.misses = 0
+
+        if path:
+            self._load()
+
+    def get(self, text: str) -> Optional[dict[str, Any]]:
+        """
+        Look up the cached result for a message
+
+        Args:
+            text: Message text
+
+        Returns:
+            Copy of the cached result or None on a miss
+        """
+        key = normalize_message(text)
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None and time.time() - entry[0] > self.ttl:
+                del self._entries[key]
+                self._dirty = True
+                entry = None
+
+            if entry is None:
+                self.misses += 1
+                return None
+
+            self._entries.move_to_end(key)
+            self.hits += 1
+            result = entry[1]
+
+        return {**result, "urls": list(result.get("urls", []))}
+
+    def put(self, text: str, result: dict[str, Any]) -> None:
+        """
+        Store the result for a message
+
+        Args:
+            text: Message text
+            result: Extraction result
+        """
+        key = normalize_message(text)
+        with self._lock:
+            self._entries[key] = (time.time(), {**result, "urls": list(result.get("urls", []))})
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_size:
+                self._entries.popitem(last=False)
+            self._dirty = True
+            due = time.monotonic() - self._last_save >= self.save_interval
+
+        if self.path and due:
+            self.save()
+
+    def stats(self) -> dict[str, Any]:
+        """Get cache size and hit/miss counters"""
+        with self._lock:
+            total = self.hits + self.misses
+            return {
+                "size": len(self._entries),
+                "max_size": self.max_size,
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_rate": self.hits / total if total else 0.0,
+            }
+
+    def _load(self) -> None:
+        """Load unexpired entries from the persistence file"""
+        path = Path(self.path)
+        if not path.exists():
+            return
+        try:
+            data = json.loads(path.read_text(encoding="utf-8"))
+        except (OSError, json.JSONDecodeError) as e:
+            logger.warning(f"Ignoring unreadable extraction cache {path}: {e}")
+            return
+
+        now = time.time()
+        # Entries are saved oldest first, so insertion order restores LRU order
+        for key, stored_at, result in data.get("entries", [])[-self.max_size:]:
+            if now - stored_at <= self.ttl:
+                self._entries[key] = (stored_at, result)
+        logger.info(f"Loaded {len(self._entries)} cached extraction result(s) from {path}")
+
+    def save(self) -> None:
+        """Write the cache to the persistence file if it changed"""
+        if not self.path:
+            return
+        with self._lock:
+            if not self._dirty:
+                return
+            entries = [
+                [key, stored_at, result] for key, (stored_at, result) in self._entries.items()
+            ]
+            self._dirty = False
+            self._last_save = time.monotonic()
+
+        path = Path(self.path)
+        tmp_path = path.with_suffix(path.suffix + ".tmp")
+        with self._save_lock:
+            try:
+                tmp_path.write_text(
+                    json.dumps({"entries": entries}, ensure_ascii=False), encoding="utf-8"
+                )
+                os.replace(tmp_path, path)
+            except OSError as e:
+                logger.error(f"Failed to save extraction cache: {e}")
@@ -0,0 +1,341 @@
+"""Local download-intent classifier trained from logged LLM decisions
+
+Messages are turned into hashed character n-gram and word features and scored
+with a logistic-regression model in NumPy. Classifying one message takes a few
+microseconds, so the LLM is only needed when the model isn't confident.
+
+Train and evaluate from the decision log URLExtractionChain writes when
+INTENT_DECISION_LOG is set:
+
+    python -m src.chains.intent_classifier train --log logs/intent_decisions.jsonl
+    python -m src.chains.intent_classifier eval --log logs/intent_decisions.jsonl
+"""
+
+import argparse
+import json
+import logging
+import re
+import threading
+import time
+import unicodedata
+import zlib
+from pathlib import Path
+from typing import Optional
+
+import numpy as np
+
+logger = logging.getLogger(__name__)
+
+# URLs are replaced by a placeholder so the model learns from the words around them
+URL_PATTERN = re.compile(r"https?://\S+", re.IGNORECASE)
+
+# Word tokens; \w covers Hangul syllables as well as Latin letters and digits
+TOKEN_PATTERN = re.compile(r"[\w']+")
+
+# Character n-gram sizes taken inside each token (Korean stems like 저장 / 받아)
+CHAR_NGRAM_SIZES = (2, 3, 4)
+
+
+def tokenize(text: str) -> list[str]:
+    """
+    Split a message into lowercase word tokens
+
+    Args:
+        text: Message text
+
+    Returns:
+        Tokens with URLs replaced by a placeholder token
+    """
+    text = unicodedata.normalize("NFC", text)
+    text = URL_PATTERN.sub(" __url__ ", text).lower()
+    return TOKEN_PATTERN.findall(text)
+
+
+def extract_features(text: str, num_features: int) -> tuple[np.ndarray, np.ndarray]:
+    """
+    Hash a message into sparse, L2-normalized binary features
+
+    Args:
+        text: Message text
+        num_features: Size of the hashed feature space
+
+    Returns:
+        Tuple of (feature indices, feature values)
+    """
+    tokens = tokenize(text)
+    grams = [f"w:{token}" for token in tokens]
+    grams += [f"b:{a} {b}" for a, b in zip(tokens, tokens[1:])]
+    for token in tokens:
+        padded = f"<{token}>"
+        for n in CHAR_NGRAM_SIZES:
+            grams += [f"c:{padded[i:i + n]}" for i in range(len(padded) - n + 1)]
+    grams.append("bias-term")
+
+    # crc32 is stable across processes, unlike the built-in hash()
+    indices = np.unique(
+        np.fromiter((zlib.crc32(g.encode("utf-8")) for g in grams), dtype=np.int64)
+        % num_features
+    )
+    values = np.full(len(indices), 1.0 / np.sqrt(len(indices)))
+    return indices, values
+
+
+class IntentClassifier:
+    """Hashed n-gram logistic regression for download intent"""
+
+    def __init__(self, num_features: int = 2**18):
+        """
+        Initialize an untrained classifier
+
+        Args:
+            num_features: Size of the hashed feature space
+        """
+        self.num_features = num_features
+        self.weights = np.zeros(num_features)
+        self.bias = 0.0
+
+    def predict_proba(self, text: str) -> float:
+        """
+        Get the probability that a message asks for a download
+
+        Args:
+            text: Message text
+
+        Returns:
+            Probability between 0 and 1
+        """
+        indices, values = extract_features(text, self.num_features)
+        score = float(self.weights[indices] @ values) + self.bias
+        return 1.0 / (1.0 + np.exp(-score))
+
+    def fit(
+        self,
+        texts: list[str],
+        labels: list[bool],
+        epochs: int = 30,
+        learning_rate: float = 0.5,
+        l2: float = 1e-5,
+        seed: int = 0,
+    ) -> None:
+        """
+        Train with stochastic gradient descent on the logistic loss
+
+        Args:
+            texts: Training messages
+            labels: Download intent decided by the LLM for each message
+            epochs: Passes over the training data
+            learning_rate: Initial SGD step size
+            l2: L2 regularization strength
+            seed: Shuffle seed
+        """
+        samples = [extract_features(text, self.num_features) for text in texts]
+        targets = np.asarray(labels, dtype=float)
+        rng = np.random.default_rng(seed)
+
+        for epoch in range(epochs):
+            step = learning_rate / (1 + epoch * 0.1)
+            for i in rng.permutation(len(samples)):
+                indices, values = samples[i]
+                score = float(self.weights[indices] @ values) + self.bias
+                error = 1.0 / (1.0 + np.exp(-score)) - targets[i]
+                self.weights[indices] -= step * (error * values + l2 * self.weights[indices])
+                self.bias -= step * error
+
+    def save(self, path: str) -> None:
+        """Save the model as a compressed .npz file"""
+        Path(path).parent.mkdir(parents=True, exist_ok=True)
+        # Only non-zero weights are stored; hashed weight vectors are mostly empty
+        nonzero = np.flatnonzero(self.weights)
+        with open(path, "wb") as f:
+            np.savez_compressed(
+                f,
+                num_features=self.num_features,
+                indices=nonzero,
+                weights=self.weights[nonzero],
+                bias=self.bias,
+            )
+
+    @classmethod
+    def load(cls, path: str) -> "IntentClassifier":
+        """Load a model saved with save()"""
+        with np.load(path) as data:
+            model = cls(num_features=int(data["num_features"]))
+            model.weights[data["indices"]] = data["weights"]
+            model.bias = float(data["bias"])
+        return model
+
+
+class ConfidentIntentClassifier:
+    """
+    Wraps a trained model with confidence thresholds
+
+    `classify` returns an answer only when the probability is outside
+    (low_threshold, high_threshold); everything in between is left to the LLM.
+    """
+
+    def __init__(
+        self,
+        model: IntentClassifier,
+        high_threshold: float = 0.9,
+        low_threshold: float = 0.1,
+    ):
+        """
+        Initialize the wrapper
+
+        Args:
+            model: Trained IntentClassifier
+            high_threshold: Probability at or above which the intent is True
+            low_threshold: Probability at or below which the intent is False
+        """
+        self.model = model
+        self.high_threshold = high_threshold
+        self.low_threshold = low_threshold
+        self._lock = threading.Lock()
+        self.confident = 0
+        self.deferred = 0
+
+    def classify(self, text: str) -> Optional[bool]:
+        """
+        Classify a message if the model is confident
+
+        Args:
+            text: Message text
+
+        Returns:
+            Download intent, or None when the LLM should decide
+        """
+        probability = self.model.predict_proba(text)
+        if probability >= self.high_threshold:
+            decision: Optional[bool] = True
+        elif probability <= self.low_threshold:
+            decision = False
+        else:
+            decision = None
+
+        with self._lock:
+            if decision is None:
+                self.deferred += 1
+            else:
+                self.confident += 1
+        logger.debug(f"Intent probability {probability:.3f} -> {decision}")
+        return decision
+
+    def stats(self) -> dict[str, int]:
+        """Get how many messages were answered and deferred to the LLM"""
+        with self._lock:
+            return {"confident": self.confident, "deferred": self.deferred}
+
+
+def load_decisions(log_path: str) -> tuple[list[str], list[bool]]:
+    """
+    Read LLM decisions from the JSONL decision log
+
+    The latest decision wins when the same message was logged more than once.
+
+    Args:
+        log_path: Path of the decision log
+
+    Returns:
+        Tuple of (messages, download intents)
+    """
+    decisions: dict[str, bool] = {}
+    with open(log_path, encoding="utf-8") as f:
+        for line in f:
+            try:
+                record = json.loads(line)
+            except json.JSONDecodeError:
+                continue
+            if record.get("message") and "download_intent" in record:
+                decisions[record["message"]] = bool(record["download_intent"])
+    return list(decisions), list(decisions.values())
+
+
+def split_train_test(
+    texts: list[str], labels: list[bool], test_fraction: float = 0.2
+) -> tuple[tuple[list[str], list[bool]], tuple[list[str], list[bool]]]:
+    """Deterministically split messages by a hash of their text"""
+    train: tuple[list[str], list[bool]] = ([], [])
+    test: tuple[list[str], list[bool]] = ([], [])
+    for text, label in zip(texts, labels):
+        bucket = test if zlib.crc32(text.encode("utf-8")) % 100 < test_fraction * 100 else train
+        bucket[0].append(text)
+        bucket[1].append(label)
+    return train, test
+
+
+def evaluate(
+    classifier: ConfidentIntentClassifier, texts: list[str], labels: list[bool]
+) -> dict[str, float]:
+    """
+    Measure accuracy, coverage and latency on labelled messages
+
+    Args:
+        classifier: Classifier with thresholds
+        texts: Messages
+        labels: Expected download intents
+
+    Returns:
+        Dictionary of metrics
+    """
+    started = time.perf_counter()
+    probabilities = [classifier.model.predict_proba(text) for text in texts]
+    elapsed = time.perf_counter() - started
+
+    predicted = [p >= 0.5 for p in probabilities]
+    confident = [
+        (p >= classifier.high_threshold, label)
+        for p, label in zip(probabilities, labels)
+        if p >= classifier.high_threshold or p <= classifier.low_threshold
+    ]
+    true_positive = sum(1 for p, label in zip(predicted, labels) if p and label)
+
+    return {
+        "messages": len(texts),
+        "accuracy": sum(p == label for p, label in zip(predicted, labels)) / max(1, len(texts)),
+        "precision": true_positive / max(1, sum(predicted)),
+        "recall": true_positive / max(1, sum(labels)),
+        "coverage": len(confident) / max(1, len(texts)),
+        "confident_accuracy": (
+            sum(p == label for p, label in confident) / len(confident) if confident else 0.0
+        ),
+        "latency_us": elapsed / max(1, len(texts)) * 1e6,
+    }
+
+
+def main(argv: Optional[list[str]] = None) -> None:
+    """Command-line entry point for training and evaluating the classifier"""
+    parser = argparse.ArgumentParser(description="Train or evaluate the local intent classifier")
+    parser.add_argument("command", choices=["train", "eval"])
+    parser.add_argument(
+        "--log", default="logs/intent_decisions.jsonl", help="JSONL log of LLM decisions"
+    )
+    parser.add_argument("--model", default="data/intent_model.npz", help="Model file")
+    parser.add_argument("--epochs", type=int, default=30)
+    parser.add_argument("--high-threshold", type=float, default=0.9)
+    parser.add_argument("--low-threshold", type=float, default=0.1)
+    args = parser.parse_args(argv)
+
+    texts, labels = load_decisions(args.log)
+    if not texts:
+        raise SystemExit(f"No decisions found in {args.log}")
+    train, test = split_train_test(texts, labels)
+    print(f"Loaded {len(texts)} decisions ({len(train[0])} train, {len(test[0])} test)")
+
+    if args.command == "train":
+        model = IntentClassifier()
+        model.fit(*train, epochs=args.epochs)
+        model.save(args.model)
+        print(f"Saved model to {args.model}")
+    else:
+        model = IntentClassifier.load(args.model)
+
+    classifier = ConfidentIntentClassifier(
+        model, high_threshold=args.high_threshold, low_threshold=args.low_threshold
+    )
+    eval_texts, eval_labels = test if test[0] else train
+    for name, value in evaluate(classifier, eval_texts, eval_labels).items():
+        print(f"  {name}: {value:.4f}" if isinstance(value, float) else f"  {name}: {value}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,76 @@
+"""Incremental parser for streamed URL-extraction JSON"""
+
+import json
+import re
+from typing import Optional
+
+URLS_START_PATTERN = re.compile(r'"urls"\s*:\s*\[')
+INTENT_PATTERN = re.compile(r'"download_intent"\s*:\s*(true|false)', re.IGNORECASE)
+
+
+class StreamingIntentParser:
+    """
+    Picks `urls` and `download_intent` out of a JSON answer as it streams in
+
+    The parser doesn't need the rest of the object: as soon as the `urls`
+    array is closed and `download_intent` has a value, `done` is True and the
+    caller can stop generation, skipping `reasoning` and anything after it.
+    """
+
+    def __init__(self):
+        """Initialize an empty parser"""
+        self.buffer = ""
+        self.urls: Optional[list[str]] = None
+        self.download_intent: Optional[bool] = None
+
+    @property
+    def done(self) -> bool:
+        """Whether both fields have been parsed"""
+        return self.urls is not None and self.download_intent is not None
+
+    def feed(self, chunk: str) -> bool:
+        """
+        Add a streamed chunk and try to parse the fields
+
+        Args:
+            chunk: Next piece of the LLM output
+
+        Returns:
+            True when both fields are known
+        """
+        self.buffer += chunk
+
+        if self.download_intent is None:
+            match = INTENT_PATTERN.search(self.buffer)
+            if match:
+                self.download_intent = match.group(1).lower() == "true"
+
+        if self.urls is None:
+            self.urls = self._parse_urls()
+
+        return self.done
+
+    def _parse_urls(self) -> Optional[list[str]]:
+        """Parse the `urls` array once its closing bracket has arrived"""
+        match = URLS_START_PATTERN.search(self.buffer)
+        if not match:
+            return None
+
+        start = match.end() - 1
+        in_string = False
+        escaped = False
+        for i in range(match.end(), len(self.buffer)):
+            char = self.buffer[i]
+            if escaped:
+                escaped = False
+            elif char == "\\":
+                escaped = True
+            elif char == '"':
+                in_string = not in_string
+            elif char == "]" and not in_string:
+                try:
+                    urls = json.loads(self.buffer[start:i + 1])
+                except json.JSONDecodeError:
+                    return []
+                return [url for url in urls if isinstance(url, str)]
+        return None
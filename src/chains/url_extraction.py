@@ -3,58 +3,324 @@
 import json
 import logging
 import re
-from typing import Any
+import threading
+import time
+from collections import Counter
+from functools import partial
+from typing import Any, Optional, Union
 
+from langchain_core.language_models import BaseChatModel
 from langchain_core.output_parsers import StrOutputParser
-from langchain_core.runnables import Runnable
-from langchain_ollama import ChatOllama
+from langchain_core.runnables import Runnable, RunnableLambda
 
+from ..llm import create_ollama_llm
 from ..prompts import create_url_extraction_prompt
+from ..tools.download_index import extract_video_id
+from .batching import MicroBatcher
+from .circuit_breaker import CircuitBreaker, CircuitOpenError
+from .extraction_cache import ExtractionCache
+from .intent_classifier import ConfidentIntentClassifier
+from .streaming_parser import StreamingIntentParser
 
 logger = logging.getLogger(__name__)
 
+# Extraction modes
+MODE_LLM = "llm"  # every message with text goes to the LLM
+MODE_TIERED = "tiered"  # regex decides clear cases, the LLM only ambiguous ones
+MODE_CLASSIFIER = "classifier"  # tiered, plus the local classifier before the LLM
+EXTRACTION_MODES = (MODE_LLM, MODE_TIERED, MODE_CLASSIFIER)
+
+# Tier that produced an extraction result
+TIER_NO_URL = "no_url"
+TIER_RULE = "rule"
+TIER_CACHE = "cache"
+TIER_CLASSIFIER = "classifier"
+TIER_LLM = "llm"
+TIER_FALLBACK = "regex_fallback"
+TIER_DEGRADED = "degraded"  # circuit breaker open, LLM skipped
+
+# Seconds a caller waits for its batch without a circuit breaker deadline
+BATCH_MAX_WAIT = 30.0
+
 
 class URLExtractionChain:
     """Chain for extracting YouTube URLs from messages"""
 
-    # YouTube URL patterns for fallback
+    # YouTube URL patterns
     YOUTUBE_PATTERNS = [
         r"https?://(?:www\.)?youtube\.com/watch\?v=[\w-]+(?:&[\w=&]*)?",
         r"https?://(?:www\.)?youtube\.com/shorts/[\w-]+",
         r"https?://youtu\.be/[\w-]+(?:\?[\w=&]*)?",
     ]
 
-    # Download intent keywords
-    DOWNLOAD_KEYWORDS = [
-        "다운로드",
-        "받아",
-        "저장",
-        "download",
-        "get",
-        "save",
-        "받아줘",
-        "저장해",
-        "다운",
-    ]
+    # Single-pass scanner over all URL patterns
+    URL_SCANNER = re.compile("|".join(YOUTUBE_PATTERNS), re.IGNORECASE)
+
+    # Download intent keywords: whole English words ("get" must not match
+    # "together"), Korean stems as substrings (받아줘, 저장해, ...)
+    KEYWORD_PATTERN = re.compile(
+        r"\b(?:download|get|save|fetch)\b|다운로드|받아|저장|다운", re.IGNORECASE
+    )
+
+    # Words that can flip the meaning of a keyword; such messages go to the LLM
+    NEGATION_PATTERN = re.compile(
+        r"\b(?:don'?t|do not|not|no need|never)\b|말고|하지\s*마|안\s*해|필요\s*없",
+        re.IGNORECASE,
+    )
+
+    # A URL with at most this many other words counts as a bare link
+    BARE_URL_MAX_EXTRA_WORDS = 2
+
+    # Characters kept around each URL (and at the start) when trimming long messages
+    TRIM_CONTEXT_CHARS = 150
 
-    def __init__(self, llm: ChatOllama):
+    def __init__(
+        self,
+        llm: BaseChatModel,
+        mode: str = MODE_TIERED,
+        cache: Optional[ExtractionCache] = None,
+        batch_window: float = 0.0,
+        batch_max_size: int = 8,
+        classifier: Optional[ConfidentIntentClassifier] = None,
+        decision_log_path: Optional[str] = None,
+        streaming: bool = False,
+        max_output_tokens: int = 128,
+        include_reasoning: bool = True,
+        breaker: Optional[CircuitBreaker] = None,
+        max_message_chars: int = 0,
+    ):
         """
         Initialize the URL extraction chain
         
         Args:
-            llm: ChatOllama LLM instance
+            llm: ChatOllama (or OllamaRouter) LLM instance
+            mode: Extraction mode, "tiered" (regex first) or "llm" (always ask the LLM)
+            cache: Optional cache for LLM extraction results
+            batch_window: Seconds to collect concurrent LLM requests into one
+                batch (0 sends every request on its own)
+            batch_max_size: Maximum number of messages in one batch
+            classifier: Local intent classifier used in "classifier" mode
+            decision_log_path: Optional JSONL file where LLM decisions are
+                appended as training data for the classifier
+            streaming: Parse the answer while it streams and stop generation
+                once `urls` and `download_intent` are known
+            max_output_tokens: Streamed chunks (tokens) read before giving up
+            include_reasoning: Whether the prompt asks for a "reasoning" field
+            breaker: Optional circuit breaker that puts a deadline on LLM calls
+                and skips the LLM while Ollama is too slow or failing
+            max_message_chars: Messages longer than this are trimmed to the
+                text around their URLs before they are sent (0 disables)
         """
+        if mode not in EXTRACTION_MODES:
+            raise ValueError(f"Unknown extraction mode: {mode}")
         self.llm = llm
+        self.mode = mode
+        self.cache = cache
+        self.classifier = classifier if mode == MODE_CLASSIFIER else None
+        self.decision_log_path = decision_log_path
+        self._decision_log_lock = threading.Lock()
+        self.streaming = streaming
+        self.max_output_tokens = max_output_tokens
+        self.include_reasoning = include_reasoning
+        self.breaker = breaker
+        self.max_message_chars = max_message_chars
         self.chain = self._create_chain()
+        self.batcher: Optional[MicroBatcher] = None
+        if batch_window > 0:
+            self.batcher = MicroBatcher(
+                self._invoke_batch,
+                window=batch_window,
+                max_batch_size=batch_max_size,
+                name="llm-batcher",
+                # Don't hold a breaker thread past the deadline it enforces
+                max_wait=breaker.deadline if breaker is not None else BATCH_MAX_WAIT,
+            )
+        self._tier_lock = threading.Lock()
+        self.tier_counts: Counter[str] = Counter()
 
     def _create_chain(self) -> Runnable:
         """Create the LangChain runnable chain"""
-        prompt = create_url_extraction_prompt()
+        prompt = create_url_extraction_prompt(include_reasoning=self.include_reasoning)
         output_parser = StrOutputParser()
         
         chain = prompt | self.llm | output_parser
         return chain
 
+    def _invoke_batch(self, messages: list[str]) -> list[Any]:
+        """
+        Run several extractions as concurrent Ollama requests
+
+        Ollama serves them in parallel (up to OLLAMA_NUM_PARALLEL), so a
+        burst costs about one round trip instead of one per message.
+
+        Args:
+            messages: Message texts
+
+        Returns:
+            Parsed (urls, intent) tuples (or exceptions) in input order
+        """
+        return RunnableLambda(self._query_llm_direct).batch(
+            messages, config={"max_concurrency": len(messages)}, return_exceptions=True
+        )
+
+    def _query_llm(self, message: str) -> tuple[list[str], bool]:
+        """Ask the LLM about one message, batched and guarded when enabled"""
+        message = self._trim_message(message)
+        if self.batcher is not None:
+            call = partial(self.batcher.submit, message)
+        else:
+            call = partial(self._query_llm_direct, message)
+        if self.breaker is not None:
+            return self.breaker.call(call)
+        return call()
+
+    async def _aquery_llm(self, message: str) -> tuple[list[str], bool]:
+        """
+        Async version of _query_llm
+
+        Concurrent calls already overlap on the event loop, so the micro-batcher
+        is not used; the circuit breaker's deadline cancels the request itself.
+        """
+        message = self._trim_message(message)
+        if self.breaker is not None:
+            return await self.breaker.acall(partial(self._aquery_llm_direct, message))
+        return await self._aquery_llm_direct(message)
+
+    async def _aquery_llm_direct(self, message: str) -> tuple[list[str], bool]:
+        """Async version of _query_llm_direct"""
+        if self.streaming:
+            return await self._astream_llm(message)
+
+        response = await self.chain.ainvoke({"message": message})
+        logger.debug(f"LLM response: {response}")
+        return self._parse_llm_response(response)
+
+    async def _astream_llm(self, message: str) -> tuple[list[str], bool]:
+        """Async version of _stream_llm"""
+        parser = StreamingIntentParser()
+        chunks = 0
+        stream = self.chain.astream({"message": message})
+        try:
+            async for chunk in stream:
+                chunks += 1
+                if parser.feed(chunk):
+                    break
+                if chunks >= self.max_output_tokens:
+                    logger.warning(f"LLM answer hit the {self.max_output_tokens}-token budget")
+                    break
+        finally:
+            await stream.aclose()
+        return self._streamed_result(parser)
+
+    def _query_llm_direct(self, message: str) -> tuple[list[str], bool]:
+        """
+        Ask the LLM about one message
+
+        Args:
+            message: Message text
+
+        Returns:
+            Tuple of (urls list, download intent boolean)
+        """
+        if self.streaming:
+            return self._stream_llm(message)
+
+        response = self.chain.invoke({"message": message})
+        logger.debug(f"LLM response: {response}")
+        return self._parse_llm_response(response)
+
+    def _stream_llm(self, message: str) -> tuple[list[str], bool]:
+        """
+        Stream the LLM answer and stop as soon as both fields are parsed
+
+        Closing the stream early closes the HTTP response, which makes
+        Ollama stop generating; `max_output_tokens` caps runaway answers.
+
+        Args:
+            message: Message text
+
+        Returns:
+            Tuple of (urls list, download intent boolean)
+        """
+        started = time.perf_counter()
+        parser = StreamingIntentParser()
+        chunks = 0
+        stream = self.chain.stream({"message": message})
+        try:
+            for chunk in stream:
+                chunks += 1
+                if parser.feed(chunk):
+                    break
+                if chunks >= self.max_output_tokens:
+                    logger.warning(f"LLM answer hit the {self.max_output_tokens}-token budget")
+                    break
+        finally:
+            stream.close()
+
+        logger.debug(
+            f"Streamed {chunks} chunk(s) in {(time.perf_counter() - started) * 1000:.0f} ms, "
+            f"early stop: {parser.done}"
+        )
+        return self._streamed_result(parser)
+
+    def _streamed_result(self, parser: StreamingIntentParser) -> tuple[list[str], bool]:
+        """Get (urls, intent) from a finished or stopped stream"""
+        if not parser.done:
+            # Incomplete or unusual answer: parse whatever arrived
+            return self._parse_llm_response(parser.buffer)
+
+        valid_urls = [url for url in parser.urls if self._is_valid_youtube_url(url)]
+        logger.info(
+            f"LLM extracted {len(valid_urls)} URLs, download intent: {parser.download_intent}"
+        )
+        return valid_urls, parser.download_intent
+
+    def _trim_message(self, message: str) -> str:
+        """
+        Shorten a long message to its start and the text around its URLs
+
+        Intent words sit next to the links or at the start of the message, so
+        the rest only costs prefill time. URLs are never cut or dropped: the
+        context around them shrinks to make room, and if the URLs alone are
+        longer than the limit they are all kept anyway.
+
+        Args:
+            message: Message text
+
+        Returns:
+            The message, or its relevant parts joined with " … "
+        """
+        if not self.max_message_chars or len(message) <= self.max_message_chars:
+            return message
+
+        matches = list(self.URL_SCANNER.finditer(message))
+        # What is left after the URLs and separators goes to context, narrower
+        # when there are many URLs
+        budget = self.max_message_chars - sum(len(m.group()) + 3 for m in matches)
+        context = max(0, min(self.TRIM_CONTEXT_CHARS, budget // (2 * len(matches) + 2)))
+        windows = [[0, context]]
+        for match in matches:
+            start, end = max(0, match.start() - context), match.end() + context
+            if start <= windows[-1][1]:
+                windows[-1][1] = max(windows[-1][1], end)
+            else:
+                windows.append([start, end])
+
+        # A window never ends inside a URL: one that overlaps the lead window
+        # was merged into it
+        parts = [message[start:end].strip() for start, end in windows]
+        trimmed = " … ".join(part for part in parts if part)
+
+        logger.debug(f"Trimmed message from {len(message)} to {len(trimmed)} characters")
+        return trimmed
+
+    def prime_prompt_prefix(self) -> None:
+        """Send one throwaway request so Ollama caches the fixed prompt prefix"""
+        try:
+            self.chain.invoke({"message": ""})
+        except Exception as e:
+            logger.warning(f"Failed to prime the prompt prefix: {e}")
+
     def _extract_with_regex(self, text: str) -> tuple[list[str], bool]:
         """
         Fallback: Extract URLs using regex patterns
@@ -65,24 +331,63 @@ class URLExtractionChain:
         Returns:
             Tuple of (urls list, download intent boolean)
         """
-        urls = []
-        for pattern in self.YOUTUBE_PATTERNS:
-            matches = re.findall(pattern, text, re.IGNORECASE)
-            urls.extend(matches)
-
-        # Remove duplicates while preserving order
-        unique_urls = list(dict.fromkeys(urls))
+        unique_urls = self._scan_urls(text)
 
         # Detect download intent
-        download_intent = any(
-            keyword in text.lower() for keyword in self.DOWNLOAD_KEYWORDS
-        )
+        download_intent = self.KEYWORD_PATTERN.search(text) is not None
 
         logger.info(
             f"Regex fallback: {len(unique_urls)} URLs, download intent: {download_intent}"
         )
         return unique_urls, download_intent
 
+    def _scan_urls(self, text: str) -> list[str]:
+        """
+        Find YouTube URLs in a single pass over the text
+
+        Args:
+            text: Message text
+
+        Returns:
+            Unique URLs in order of appearance
+        """
+        # Cheap substring check rejects the vast majority of chat messages
+        if "youtu" not in text.lower():
+            return []
+        return list(dict.fromkeys(self.URL_SCANNER.findall(text)))
+
+    def _classify_tier(self, text: str, urls: list[str]) -> tuple[str, bool]:
+        """
+        Decide whether a message with URLs can be answered without the LLM
+
+        Args:
+            text: Message text
+            urls: URLs found by the scanner
+
+        Returns:
+            Tuple of (tier, download intent); the intent is only meaningful
+            for the rule tier
+        """
+        remainder = self.URL_SCANNER.sub(" ", text)
+        if self.NEGATION_PATTERN.search(remainder):
+            return TIER_LLM, False
+
+        # A bare link (plus a word or two) or a link with a known keyword
+        if len(remainder.split()) <= self.BARE_URL_MAX_EXTRA_WORDS:
+            return TIER_RULE, True
+        if self.KEYWORD_PATTERN.search(remainder):
+            return TIER_RULE, True
+
+        return TIER_LLM, False
+
+    def _record_tier(self, tier: str, started: float) -> None:
+        """Count and log the tier that handled a message"""
+        with self._tier_lock:
+            self.tier_counts[tier] += 1
+        logger.info(
+            f"Extraction tier: {tier} ({(time.perf_counter() - started) * 1000:.2f} ms)"
+        )
+
     def _parse_llm_response(self, response: str) -> tuple[list[str], bool]:
         """
         Parse LLM JSON response
@@ -94,11 +399,11 @@ class URLExtractionChain:
             Tuple of (urls list, download intent boolean)
         """
         try:
-            # Try to find JSON in the response
-            # Sometimes LLM adds extra text before/after JSON
-            json_match = re.search(r'\{.*\}', response, re.DOTALL)
-            if json_match:
-                result = json.loads(json_match.group())
+            # Decode the first JSON object in the response; the LLM sometimes
+            # adds extra text (or a second object) before/after it
+            start = response.find("{")
+            if start >= 0:
+                result, _ = json.JSONDecoder().raw_decode(response, start)
             else:
                 result = json.loads(response)
 
@@ -119,10 +424,7 @@ class URLExtractionChain:
 
     def _is_valid_youtube_url(self, url: str) -> bool:
         """Validate YouTube URL"""
-        for pattern in self.YOUTUBE_PATTERNS:
-            if re.match(pattern, url, re.IGNORECASE):
-                return True
-        return False
+        return self.URL_SCANNER.fullmatch(url) is not None
 
     def extract(self, message: str, use_llm: bool = True) -> dict[str, Any]:
         """
@@ -133,61 +435,228 @@ class URLExtractionChain:
             use_llm: Whether to use LLM (True) or regex only (False)
             
         Returns:
-            Dictionary with 'urls' and 'download_intent'
+            Dictionary with 'urls', 'download_intent' and the 'tier' that decided
+        """
+        started = time.perf_counter()
+        result = self._extract_without_llm(message, use_llm, started)
+        if result is not None:
+            return result
+        return self._finish_llm_result(message, self._extract_with_llm(message), started)
+
+    async def aextract(self, message: str) -> dict[str, Any]:
+        """
+        Async version of extract
+
+        The rule, classifier and cache tiers run inline (they take
+        microseconds); the LLM call is awaited on the event loop.
+
+        Args:
+            message: The message text to analyze
+
+        Returns:
+            Dictionary with 'urls', 'download_intent' and the 'tier' that decided
+        """
+        started = time.perf_counter()
+        result = self._extract_without_llm(message, True, started)
+        if result is not None:
+            return result
+        return self._finish_llm_result(message, await self._aextract_with_llm(message), started)
+
+    def _extract_without_llm(
+        self, message: str, use_llm: bool, started: float
+    ) -> Optional[dict[str, Any]]:
+        """
+        Answer from the tiers in front of the LLM
+
+        Args:
+            message: The message text to analyze
+            use_llm: Whether the LLM may be used at all
+            started: perf_counter() when extraction started
+
+        Returns:
+            Extraction result, or None when the LLM has to decide
         """
         if not message or not message.strip():
-            return {"urls": [], "download_intent": False}
+            return {"urls": [], "download_intent": False, "tier": TIER_NO_URL}
 
         if not use_llm:
             urls, intent = self._extract_with_regex(message)
-            return {"urls": urls, "download_intent": intent}
+            return {"urls": urls, "download_intent": intent, "tier": TIER_FALLBACK}
+
+        if self.mode in (MODE_TIERED, MODE_CLASSIFIER):
+            urls = self._scan_urls(message)
+            if not urls:
+                self._record_tier(TIER_NO_URL, started)
+                return {"urls": [], "download_intent": False, "tier": TIER_NO_URL}
+
+            tier, intent = self._classify_tier(message, urls)
+            if tier == TIER_RULE:
+                self._record_tier(TIER_RULE, started)
+                return {"urls": urls, "download_intent": intent, "tier": TIER_RULE}
+
+            if self.classifier is not None:
+                decision = self.classifier.classify(message)
+                if decision is not None:
+                    self._record_tier(TIER_CLASSIFIER, started)
+                    return {"urls": urls, "download_intent": decision, "tier": TIER_CLASSIFIER}
 
+        if self.cache is not None:
+            cached = self.cache.get(message)
+            if cached is not None:
+                cached["tier"] = TIER_CACHE
+                self._record_tier(TIER_CACHE, started)
+                return cached
+
+        return None
+
+    def _finish_llm_result(
+        self, message: str, result: dict[str, Any], started: float
+    ) -> dict[str, Any]:
+        """Cache and log an LLM answer, and count its tier"""
+        if result["tier"] == TIER_LLM:
+            # Fallback answers are not cached so Ollama gets another chance
+            if self.cache is not None:
+                self.cache.put(message, result)
+            self._log_decision(message, result)
+        self._record_tier(result["tier"], started)
+        return result
+
+    def _extract_with_llm(self, message: str) -> dict[str, Any]:
+        """
+        Extract URLs and intent with the LLM, falling back to regex
+
+        Args:
+            message: The message text to analyze
+
+        Returns:
+            Dictionary with 'urls', 'download_intent' and 'tier'
+        """
         try:
             # Try LLM extraction
             logger.debug(f"Extracting URLs from message: {message[:100]}...")
-            response = self.chain.invoke({"message": message})
-            
-            logger.debug(f"LLM response: {response}")
-            
-            urls, intent = self._parse_llm_response(response)
-            
-            # If LLM found nothing but there are URLs in text, use regex fallback
-            if not urls:
-                logger.info("LLM found no URLs, trying regex fallback")
-                urls, intent_regex = self._extract_with_regex(message)
-                # Keep LLM's intent decision if it was confident
-                if not intent:
-                    intent = intent_regex
+            urls, intent = self._query_llm(message)
+            return self._llm_result(message, urls, intent)
 
-            return {"urls": urls, "download_intent": intent}
+        except CircuitOpenError:
+            return self._extract_degraded(message)
 
         except Exception as e:
             logger.error(f"LLM extraction failed: {e}, using regex fallback")
             urls, intent = self._extract_with_regex(message)
-            return {"urls": urls, "download_intent": intent}
+            return {"urls": urls, "download_intent": intent, "tier": TIER_FALLBACK}
+
+    async def _aextract_with_llm(self, message: str) -> dict[str, Any]:
+        """Async version of _extract_with_llm"""
+        try:
+            logger.debug(f"Extracting URLs from message: {message[:100]}...")
+            urls, intent = await self._aquery_llm(message)
+            return self._llm_result(message, urls, intent)
+
+        except CircuitOpenError:
+            return self._extract_degraded(message)
+
+        except Exception as e:
+            logger.error(f"LLM extraction failed: {e}, using regex fallback")
+            urls, intent = self._extract_with_regex(message)
+            return {"urls": urls, "download_intent": intent, "tier": TIER_FALLBACK}
+
+    def _llm_result(self, message: str, urls: list[str], intent: bool) -> dict[str, Any]:
+        """Build the result of an LLM answer, filling in URLs the LLM missed"""
+        # If LLM found nothing but there are URLs in text, use regex fallback
+        if not urls:
+            logger.info("LLM found no URLs, trying regex fallback")
+            urls, intent_regex = self._extract_with_regex(message)
+            # Keep LLM's intent decision if it was confident
+            if not intent:
+                intent = intent_regex
+        else:
+            # The LLM may have skipped links, or seen a trimmed message
+            known = (set(urls) | {extract_video_id(url) for url in urls}) - {None}
+            missed = [
+                url
+                for url in self._scan_urls(message)
+                if url not in known and extract_video_id(url) not in known
+            ]
+            if missed:
+                logger.info(f"Adding {len(missed)} URL(s) the LLM missed")
+                urls = urls + missed
+
+        return {"urls": urls, "download_intent": intent, "tier": TIER_LLM}
+
+    def _extract_degraded(self, message: str) -> dict[str, Any]:
+        """
+        Answer without the LLM while the circuit breaker is open
+
+        URLs come from the regex scanner; the intent comes from the local
+        classifier's best guess when one is loaded, otherwise from keywords.
+
+        Args:
+            message: The message text to analyze
+
+        Returns:
+            Dictionary with 'urls', 'download_intent' and 'tier'
+        """
+        urls, intent = self._extract_with_regex(message)
+        if self.classifier is not None:
+            intent = self.classifier.model.predict_proba(message) >= 0.5
+        return {"urls": urls, "download_intent": intent, "tier": TIER_DEGRADED}
+
+    def _log_decision(self, message: str, result: dict[str, Any]) -> None:
+        """Append an LLM decision to the decision log (classifier training data)"""
+        if not self.decision_log_path:
+            return
+        record = {
+            "ts": time.time(),
+            "message": message,
+            "urls": result["urls"],
+            "download_intent": bool(result["download_intent"]),
+        }
+        try:
+            with self._decision_log_lock:
+                with open(self.decision_log_path, "a", encoding="utf-8") as f:
+                    f.write(json.dumps(record, ensure_ascii=False) + "\n")
+        except OSError as e:
+            logger.warning(f"Failed to write decision log: {e}")
+
+    def tier_stats(self) -> dict[str, int]:
+        """Get how many messages each tier handled"""
+        with self._tier_lock:
+            return dict(self.tier_counts)
 
 
 def create_url_extraction_chain(
     model: str = "gemma3:4b",
-    host: str = "http://localhost:11434",
-    temperature: float = 0.1
+    host: Union[str, list[str]] = "http://localhost:11434",
+    temperature: float = 0.1,
+    mode: str = MODE_TIERED,
+    streaming: bool = False,
+    max_output_tokens: int = 128,
+    num_ctx: Optional[int] = None,
 ) -> URLExtractionChain:
     """
     Factory function to create a URL extraction chain
     
     Args:
         model: Ollama model name
-        host: Ollama server URL
+        host: Ollama server URL, or several URLs to load-balance across
         temperature: LLM temperature (lower = more consistent)
+        mode: Extraction mode ("tiered", "classifier" or "llm")
+        streaming: Stop generation as soon as the answer is parsed
+        max_output_tokens: Hard output-token budget per call
+        num_ctx: Fixed context size, so the cached prompt prefix is reused
         
     Returns:
         URLExtractionChain instance
     """
-    llm = ChatOllama(
+    llm = create_ollama_llm(
         model=model,
-        base_url=host,
+        hosts=host,
         temperature=temperature,
+        num_predict=max_output_tokens,
+        num_ctx=num_ctx,
     )
     
-    return URLExtractionChain(llm)
+    return URLExtractionChain(
+        llm, mode=mode, streaming=streaming, max_output_tokens=max_output_tokens
+    )
 
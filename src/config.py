@@ -20,7 +20,105 @@ class Settings(BaseSettings):
 
     # Ollama Configuration
     ollama_model: str = Field(default="gemma3:4b", description="Ollama model name")
-    ollama_host: str = Field(default="http://localhost:11434", description="Ollama server URL")
+    ollama_host: str = Field(
+        default="http://localhost:11434",
+        description="Ollama server URL, or comma-separated URLs to load-balance across",
+    )
+    ollama_num_ctx: int = Field(
+        default=2048,
+        ge=256,
+        description="Fixed context size; changing it per request reloads the model",
+    )
+    ollama_health_check_interval: float = Field(
+        default=10.0, gt=0, description="Seconds between health checks of Ollama backends"
+    )
+    ollama_keep_alive: str = Field(
+        default="30m",
+        description="How long Ollama keeps the model loaded (duration, seconds, or -1 to pin)",
+    )
+    ollama_warm_up: bool = Field(
+        default=True, description="Load the model into Ollama at startup"
+    )
+    ollama_max_connections: int = Field(
+        default=10, ge=1, description="Size of the pooled HTTP connection pool to Ollama"
+    )
+    llm_latency_budget: float = Field(
+        default=3.0, gt=0, description="Seconds an extraction LLM call should take (PR-2)"
+    )
+    llm_max_message_chars: int = Field(
+        default=1000,
+        ge=0,
+        description="Longer messages are trimmed to the text around their URLs (0 disables)",
+    )
+    llm_call_deadline: float = Field(
+        default=4.0, gt=0, description="Seconds after which an extraction LLM call is abandoned"
+    )
+    llm_breaker_error_threshold: float = Field(
+        default=0.5, gt=0, le=1, description="Rolling LLM error rate that opens the circuit"
+    )
+    llm_breaker_window: int = Field(
+        default=20, ge=1, description="Recent LLM calls used for the rolling p95 and error rate"
+    )
+    llm_breaker_cooldown: float = Field(
+        default=30.0, gt=0, description="Seconds the LLM is skipped after the circuit opens"
+    )
+    url_extraction_mode: str = Field(
+        default="tiered",
+        description=(
+            "URL extraction mode: 'tiered' (regex first, LLM for ambiguous), "
+            "'classifier' (tiered plus the local intent classifier) or 'llm'"
+        ),
+    )
+    intent_model_path: str = Field(
+        default="data/intent_model.npz", description="Trained local intent classifier"
+    )
+    intent_high_threshold: float = Field(
+        default=0.9, ge=0, le=1, description="Classifier probability treated as download intent"
+    )
+    intent_low_threshold: float = Field(
+        default=0.1, ge=0, le=1, description="Classifier probability treated as no intent"
+    )
+    intent_decision_log: str = Field(
+        default="",
+        description=(
+            "JSONL log of LLM decisions used to train the classifier; it stores the raw "
+            "message text, so it is off unless a path is set"
+        ),
+    )
+
+    # LLM Output Configuration
+    llm_streaming: bool = Field(
+        default=True,
+        description="Stream LLM answers and stop once urls and download_intent are parsed",
+    )
+    llm_max_output_tokens: int = Field(
+        default=128, ge=16, description="Hard budget of output tokens per extraction call"
+    )
+    llm_include_reasoning: bool = Field(
+        default=False, description="Ask the LLM for a free-text reasoning field (slower)"
+    )
+
+    # LLM Batching Configuration
+    llm_batch_window_ms: float = Field(
+        default=50,
+        ge=0,
+        description="Milliseconds to collect concurrent LLM requests into one batch (0 disables)",
+    )
+    llm_batch_max_size: int = Field(
+        default=8, ge=1, description="Maximum number of messages classified in one batch"
+    )
+
+    # URL Extraction Cache Configuration
+    extraction_cache_size: int = Field(
+        default=1024, ge=1, description="Maximum number of cached LLM extraction results"
+    )
+    extraction_cache_ttl: float = Field(
+        default=86400, gt=0, description="Seconds a cached extraction result stays valid"
+    )
+    extraction_cache_path: str = Field(
+        default="data/extraction_cache.json",
+        description="File the extraction cache is persisted to (empty to keep it in memory)",
+    )
 
     # Download Configuration
     download_dir: str = Field(
@@ -28,6 +126,123 @@ class Settings(BaseSettings):
         description="Directory to save downloaded videos",
     )
 
+    download_scratch_dir: str = Field(
+        default="data/scratch",
+        description=(
+            "Local directory yt-dlp downloads and merges in; finished files are then "
+            "moved to download_dir (empty to download in place)"
+        ),
+    )
+
+    download_quota_gb: float = Field(
+        default=0,
+        ge=0,
+        description=(
+            "Maximum total size of downloaded videos; the least recently requested "
+            "are deleted to make room (0 for no quota)"
+        ),
+    )
+    download_min_free_gb: float = Field(
+        default=2.0, ge=0, description="Free disk space downloads must leave on each volume"
+    )
+
+    download_index_path: str = Field(
+        default="data/download_index.sqlite3",
+        description="SQLite database mapping video IDs to downloaded files",
+    )
+
+    # Download Scheduler Configuration
+    download_max_concurrent: int = Field(
+        default=2, ge=1, description="Maximum number of downloads running at once"
+    )
+    download_per_user_limit: int = Field(
+        default=2, ge=1, description="Maximum number of downloads running at once per user"
+    )
+    job_journal_path: str = Field(
+        default="data/jobs.sqlite3",
+        description="SQLite journal of download jobs, used to resume them after a restart",
+    )
+    job_max_attempts: int = Field(
+        default=3, ge=1, description="Starts of a journaled download before it is given up"
+    )
+    shutdown_drain_timeout: float = Field(
+        default=5.0,
+        ge=0,
+        description="Seconds running downloads may finish at shutdown before being checkpointed",
+    )
+    ytdlp_workers: int = Field(
+        default=0,
+        ge=0,
+        description=(
+            "Pre-warmed yt-dlp worker processes (needs the yt-dlp Python module); "
+            "0 starts a yt-dlp process per call"
+        ),
+    )
+    ytdlp_worker_max_jobs: int = Field(
+        default=50, ge=1, description="Jobs a yt-dlp worker runs before it is replaced"
+    )
+    ytdlp_worker_max_memory_mb: float = Field(
+        default=500, gt=0, description="Peak memory after which a yt-dlp worker is replaced"
+    )
+    slack_progress_interval: float = Field(
+        default=3.0, gt=0, description="Minimum seconds between two download progress edits"
+    )
+
+    # Message Queue Configuration
+    runtime_mode: str = Field(
+        default="threaded",
+        description=(
+            "How Slack messages are processed: 'threaded' (worker threads) or "
+            "'async' (one asyncio event loop; needs aiohttp)"
+        ),
+    )
+    worker_count: int = Field(
+        default=4,
+        ge=1,
+        description="Number of workers (threads or tasks) processing Slack messages",
+    )
+    queue_max_size: int = Field(
+        default=100, ge=1, description="Maximum number of messages waiting for a worker"
+    )
+    queue_put_timeout: float = Field(
+        default=2.0, ge=0, description="Seconds to wait for a free queue slot before rejecting"
+    )
+
+    # Event De-duplication Configuration
+    event_dedup_window: float = Field(
+        default=600, gt=0, description="Seconds a Slack event ID is remembered to drop redeliveries"
+    )
+    event_dedup_max_size: int = Field(
+        default=10000, ge=1, description="Maximum number of remembered event IDs"
+    )
+    event_dedup_path: str = Field(
+        default="data/event_dedup.json",
+        description="File the seen event IDs are persisted to (empty to keep them in memory)",
+    )
+
+    # Backfill Configuration
+    backfill_enabled: bool = Field(
+        default=True,
+        description="Catch up on monitored channels after each (re)connect",
+    )
+    backfill_max_age: float = Field(
+        default=86400,
+        gt=0,
+        description="Seconds of channel history the backfill looks back at most",
+    )
+    channel_cursor_path: str = Field(
+        default="data/channel_cursors.json",
+        description="File storing the last processed message ts per channel",
+    )
+
+    # Outbound Slack Messages Configuration
+    slack_send_rate: float = Field(
+        default=1.0, gt=0, description="Messages (posts and edits) per second per channel"
+    )
+    slack_send_burst: int = Field(
+        default=3, ge=1, description="Messages a quiet channel may send at once"
+    )
+
     # Logging Configuration
     log_level: str = Field(default="INFO", description="Logging level")
     log_file: str = Field(default="logs/app.log", description="Log file path")
@@ -47,13 +262,39 @@ class Settings(BaseSettings):
         expanded_path.mkdir(parents=True, exist_ok=True)
         return str(expanded_path)
 
-    @field_validator("log_file")
+    @field_validator("download_scratch_dir")
     @classmethod
-    def ensure_log_dir(cls, v: str) -> str:
-        """Ensure log directory exists"""
-        log_path = Path(v)
-        log_path.parent.mkdir(parents=True, exist_ok=True)
-        return str(log_path)
+    def expand_scratch_dir(cls, v: str) -> str:
+        """Expand user path and ensure the scratch directory exists"""
+        if not v:
+            return v
+        expanded_path = Path(v).expanduser().resolve()
+        expanded_path.mkdir(parents=True, exist_ok=True)
+        return str(expanded_path)
+
+    @field_validator(
+        "log_file",
+        "download_index_path",
+        "job_journal_path",
+        "extraction_cache_path",
+        "event_dedup_path",
+        "channel_cursor_path",
+        "intent_model_path",
+        "intent_decision_log",
+    )
+    @classmethod
+    def ensure_parent_dir(cls, v: str) -> str:
+        """Ensure the parent directory of a local file exists"""
+        if not v:
+            return v
+        path = Path(v).expanduser()
+        path.parent.mkdir(parents=True, exist_ok=True)
+        return str(path)
+
+    @property
+    def ollama_hosts(self) -> list[str]:
+        """Get the list of Ollama server URLs"""
+        return [host.strip() for host in self.ollama_host.split(",") if host.strip()]
 
     @property
     def monitored_channels(self) -> set[str]:
@@ -0,0 +1,181 @@
+"""De-duplication of Slack events redelivered after a late ack or a reconnect"""
+
+import json
+import logging
+import os
+import threading
+import time
+from collections import OrderedDict
+from pathlib import Path
+from typing import Any, Iterable, Optional
+
+logger = logging.getLogger(__name__)
+
+
+def event_keys(envelope_id: Optional[str], payload: dict) -> list[str]:
+    """
+    Get the IDs identifying a Socket Mode event
+
+    A redelivery repeats at least one of them: the envelope, the Events API
+    event ID, the client's message ID or the message's channel and ts.
+
+    Args:
+        envelope_id: Socket Mode envelope ID
+        payload: Events API payload
+
+    Returns:
+        Keys to check against the already-seen set
+    """
+    event = payload.get("event", {})
+    keys = []
+    if envelope_id:
+        keys.append(f"envelope:{envelope_id}")
+    if payload.get("event_id"):
+        keys.append(f"event:{payload['event_id']}")
+    if event.get("client_msg_id"):
+        keys.append(f"client_msg:{event['client_msg_id']}")
+    if event.get("channel") and event.get("ts"):
+        keys.append(f"message:{event['channel']}:{event['ts']}")
+    return keys
+
+
+class EventDeduplicator:
+    """
+    Thread-safe set of recently seen event keys
+
+    Keys are forgotten `window` seconds after they were first seen, and the
+    oldest go first once there are `max_size` of them. When `path` is set,
+    the set is loaded from that JSON file on startup and written back
+    (atomically) at most every `save_interval` seconds and on `save()`.
+    """
+
+    def __init__(
+        self,
+        window: float = 600,
+        max_size: int = 10000,
+        path: Optional[str] = None,
+        save_interval: float = 5,
+    ):
+        """
+        Initialize the deduplicator
+
+        Args:
+            window: Seconds a key is remembered
+            max_size: Maximum number of keys remembered
+            path: Optional JSON file for persistence across restarts
+            save_interval: Minimum seconds between automatic saves
+        """
+        self.window = window
+        self.max_size = max(1, max_size)
+        self.path = path
+        self.save_interval = save_interval
+
+        self._lock = threading.Lock()
+        self._save_lock = threading.Lock()
+        # key -> first seen unix time, oldest first
+        self._seen: OrderedDict[str, float] = OrderedDict()
+        self._dirty = False
+        self._last_save = time.monotonic()
+        self.checked = 0
+        self.duplicates = 0
+
+        if path:
+            self._load()
+
+    def is_duplicate(self, keys: Iterable[str]) -> bool:
+        """
+        Check an event and remember its keys
+
+        Args:
+            keys: Keys of the event (see event_keys)
+
+        Returns:
+            True if any key was seen within the window
+        """
+        keys = [key for key in keys if key]
+        now = time.time()
+        with self._lock:
+            self._expire(now)
+            self.checked += 1
+            duplicate = any(key in self._seen for key in keys)
+            for key in keys:
+                if key not in self._seen:
+                    self._seen[key] = now
+                    self._dirty = True
+            while len(self._seen) > self.max_size:
+                self._seen.popitem(last=False)
+            if duplicate:
+                self.duplicates += 1
+            due = self._dirty and time.monotonic() - self._last_save >= self.save_interval
+
+        if self.path and due:
+            self.save()
+        return duplicate
+
+    def forget(self, keys: Iterable[str]) -> None:
+        """
+        Drop keys again, e.g. for an event that could not be queued after all
+
+        Args:
+            keys: Keys of the event (see event_keys)
+        """
+        with self._lock:
+            for key in keys:
+                if self._seen.pop(key, None) is not None:
+                    self._dirty = True
+
+    def _expire(self, now: float) -> None:
+        """Forget keys older than the window (lock held)"""
+        while self._seen:
+            key, seen_at = next(iter(self._seen.items()))
+            if now - seen_at <= self.window:
+                break
+            del self._seen[key]
+            self._dirty = True
+
+    def stats(self) -> dict[str, Any]:
+        """Get the number of remembered keys and the duplicate counter"""
+        with self._lock:
+            return {
+                "size": len(self._seen),
+                "max_size": self.max_size,
+                "checked": self.checked,
+                "duplicates": self.duplicates,
+            }
+
+    def _load(self) -> None:
+        """Load keys still within the window from the persistence file"""
+        path = Path(self.path)
+        if not path.exists():
+            return
+        try:
+            data = json.loads(path.read_text(encoding="utf-8"))
+        except (OSError, json.JSONDecodeError) as e:
+            logger.warning(f"Ignoring unreadable event dedup file {path}: {e}")
+            return
+
+        now = time.time()
+        for key, seen_at in data.get("keys", [])[-self.max_size:]:
+            if now - seen_at <= self.window:
+                self._seen[key] = seen_at
+        logger.info(f"Loaded {len(self._seen)} recent event key(s) from {path}")
+
+    def save(self) -> None:
+        """Write the keys to the persistence file if they changed"""
+        if not self.path:
+            return
+        with self._lock:
+            if not self._dirty:
+                return
+            keys = [[key, seen_at] for key, seen_at in self._seen.items()]
+            self._dirty = False
+            self._last_save = time.monotonic()
+
+        path = Path(self.path)
+        tmp_path = path.with_suffix(path.suffix + ".tmp")
+        with self._save_lock:
+            try:
+                tmp_path.write_text(json.dumps({"keys": keys}), encoding="utf-8")
+                os.replace(tmp_path, path)
+            except OSError as e:
+                logger.error(f"Failed to save event dedup file: {e}")
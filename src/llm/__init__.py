@@ -0,0 +1,20 @@
+"""Ollama client setup, routing, warm-up and latency tracking"""
+
+from .ollama_client import (
+    LLMLatencyTracker,
+    create_chat_ollama,
+    create_ollama_llm,
+    parse_keep_alive,
+    warm_up_model,
+)
+from .router import OllamaBackend, OllamaRouter
+
+__all__ = [
+    "LLMLatencyTracker",
+    "OllamaBackend",
+    "OllamaRouter",
+    "create_chat_ollama",
+    "create_ollama_llm",
+    "parse_keep_alive",
+    "warm_up_model",
+]
@@ -0,0 +1,381 @@
+"""Shared ChatOllama client with warm-up, keep-alive and latency tracking"""
+
+import logging
+import threading
+import time
+from collections import deque
+from typing import Any, Optional, Union
+from uuid import UUID
+
+import httpx
+from langchain_core.callbacks import BaseCallbackHandler
+from langchain_core.language_models import BaseChatModel
+from langchain_ollama import ChatOllama
+from ollama import Client as OllamaHTTPClient
+
+from .router import OllamaBackend, OllamaRouter
+
+logger = logging.getLogger(__name__)
+
+# Seconds a request may run past the call deadline before httpx cuts it off
+REQUEST_TIMEOUT_GRACE = 1.0
+
+# Seconds to establish a connection to Ollama
+CONNECT_TIMEOUT = 5.0
+
+
+def parse_keep_alive(value: str) -> Union[int, str]:
+    """
+    Convert a keep-alive setting into what Ollama expects
+
+    Plain numbers are seconds (-1 keeps the model loaded forever); anything
+    else is passed through as a duration string such as "30m".
+
+    Args:
+        value: Keep-alive setting
+
+    Returns:
+        Seconds as int, or the duration string
+    """
+    try:
+        return int(value)
+    except ValueError:
+        return value
+
+
+class LLMLatencyTracker(BaseCallbackHandler):
+    """
+    Callback handler that records latency and token counts of LLM calls
+
+    Attached to the shared ChatOllama instance, so every call is measured,
+    whether it is streamed or not (ChatOllama streams internally). Ollama
+    reports prompt tokens and prefill time only for answers that run to the
+    end; for streams stopped early the completion count is the number of
+    chunks read.
+    """
+
+    # Number of recent calls kept for percentiles
+    SAMPLE_SIZE = 500
+
+    def __init__(self, budget_seconds: float = 3.0):
+        """
+        Initialize the tracker
+
+        Args:
+            budget_seconds: Latency budget a call is counted against (PR-2)
+        """
+        self.budget_seconds = budget_seconds
+        self._lock = threading.Lock()
+        self._starts: dict[UUID, float] = {}
+        self._first_token: dict[UUID, float] = {}
+        self._chunks: dict[UUID, int] = {}
+        self._first_token_samples: deque[float] = deque(maxlen=self.SAMPLE_SIZE)
+        self._total_samples: deque[float] = deque(maxlen=self.SAMPLE_SIZE)
+        self._prefill_samples: deque[float] = deque(maxlen=self.SAMPLE_SIZE)
+        self.calls = 0
+        self.errors = 0
+        self.stopped_early = 0
+        self.over_budget = 0
+        self.prompt_tokens = 0
+        self.completion_tokens = 0
+        self.counted_prompts = 0
+
+    def on_chat_model_start(
+        self, serialized: dict[str, Any], messages: list, *, run_id: UUID, **kwargs: Any
+    ) -> None:
+        with self._lock:
+            self._starts[run_id] = time.perf_counter()
+
+    def on_llm_start(
+        self, serialized: dict[str, Any], prompts: list[str], *, run_id: UUID, **kwargs: Any
+    ) -> None:
+        with self._lock:
+            self._starts[run_id] = time.perf_counter()
+
+    def on_llm_new_token(self, token: str, *, run_id: UUID, **kwargs: Any) -> None:
+        with self._lock:
+            self._chunks[run_id] = self._chunks.get(run_id, 0) + 1
+            if run_id in self._starts and run_id not in self._first_token:
+                self._first_token[run_id] = time.perf_counter() - self._starts[run_id]
+
+    def on_llm_end(self, response: Any, *, run_id: UUID, **kwargs: Any) -> None:
+        self._finish(run_id, error=False, usage=self._usage(response))
+
+    def on_llm_error(self, error: BaseException, *, run_id: UUID, **kwargs: Any) -> None:
+        # GeneratorExit means the caller closed a stream on purpose (early stop)
+        self._finish(run_id, error=not isinstance(error, GeneratorExit), usage={})
+
+    @staticmethod
+    def _usage(response: Any) -> dict[str, Any]:
+        """Token counts and prefill time Ollama reported for a finished call"""
+        try:
+            generation = response.generations[0][0]
+        except (AttributeError, IndexError):
+            return {}
+        info = generation.generation_info or {}
+        usage = getattr(getattr(generation, "message", None), "usage_metadata", None) or {}
+        return {
+            "prompt_tokens": usage.get("input_tokens", info.get("prompt_eval_count")),
+            "completion_tokens": usage.get("output_tokens", info.get("eval_count")),
+            "prefill": (
+                info["prompt_eval_duration"] / 1e9 if info.get("prompt_eval_duration") else None
+            ),
+        }
+
+    def _finish(self, run_id: UUID, error: bool, usage: dict[str, Any]) -> None:
+        """Record the samples of a finished call"""
+        with self._lock:
+            started = self._starts.pop(run_id, None)
+            first_token = self._first_token.pop(run_id, None)
+            chunks = self._chunks.pop(run_id, 0)
+            if started is None:
+                return
+            total = time.perf_counter() - started
+            self.calls += 1
+            if error:
+                self.errors += 1
+            elif not usage:
+                self.stopped_early += 1
+            if first_token is not None:
+                self._first_token_samples.append(first_token)
+            self._total_samples.append(total)
+            if total > self.budget_seconds:
+                self.over_budget += 1
+
+            prompt_tokens = usage.get("prompt_tokens")
+            completion_tokens = usage.get("completion_tokens") or chunks
+            if prompt_tokens is not None:
+                self.prompt_tokens += prompt_tokens
+                self.counted_prompts += 1
+            self.completion_tokens += completion_tokens
+            if usage.get("prefill") is not None:
+                self._prefill_samples.append(usage["prefill"])
+
+        prefill = usage.get("prefill")
+        logger.debug(
+            f"LLM call: first token "
+            f"{f'{first_token * 1000:.0f} ms' if first_token is not None else 'n/a'}, "
+            f"total {total * 1000:.0f} ms, "
+            f"prompt {prompt_tokens if prompt_tokens is not None else 'n/a'} tokens"
+            f"{f' (prefill {prefill * 1000:.0f} ms)' if prefill is not None else ''}, "
+            f"completion {completion_tokens} tokens"
+        )
+
+    @staticmethod
+    def _percentiles(samples: list[float]) -> dict[str, Optional[float]]:
+        """p50/p95/max of samples in milliseconds"""
+        if not samples:
+            return {"p50_ms": None, "p95_ms": None, "max_ms": None}
+        ordered = sorted(samples)
+        return {
+            "p50_ms": ordered[len(ordered) // 2] * 1000,
+            "p95_ms": ordered[min(len(ordered) - 1, int(len(ordered) * 0.95))] * 1000,
+            "max_ms": ordered[-1] * 1000,
+        }
+
+    def stats(self) -> dict[str, Any]:
+        """
+        Get latency and token statistics
+
+        Returns:
+            Call and token counters, and first-token / prefill / total
+            latency percentiles
+        """
+        with self._lock:
+            first_token = list(self._first_token_samples)
+            total = list(self._total_samples)
+            prefill = list(self._prefill_samples)
+            stats: dict[str, Any] = {
+                "calls": self.calls,
+                "errors": self.errors,
+                "stopped_early": self.stopped_early,
+                "over_budget": self.over_budget,
+                "budget_ms": self.budget_seconds * 1000,
+                "tokens": {
+                    "prompt_total": self.prompt_tokens,
+                    "prompt_avg": (
+                        self.prompt_tokens / self.counted_prompts if self.counted_prompts else None
+                    ),
+                    "completion_total": self.completion_tokens,
+                    "completion_avg": (
+                        self.completion_tokens / self.calls if self.calls else None
+                    ),
+                },
+            }
+        stats["first_token"] = self._percentiles(first_token)
+        stats["prefill"] = self._percentiles(prefill)
+        stats["total"] = self._percentiles(total)
+        return stats
+
+
+def create_chat_ollama(
+    model: str,
+    base_url: str,
+    temperature: float = 0.1,
+    num_predict: Optional[int] = None,
+    keep_alive: Union[int, str, None] = None,
+    max_connections: int = 10,
+    callbacks: Optional[list[BaseCallbackHandler]] = None,
+    num_ctx: Optional[int] = None,
+    call_deadline: Optional[float] = None,
+) -> ChatOllama:
+    """
+    Create the ChatOllama instance shared by all Ollama traffic
+
+    One instance owns one httpx client, so every call reuses the same
+    connection pool instead of opening a new connection.
+
+    Args:
+        model: Ollama model name
+        base_url: Ollama server URL
+        temperature: LLM temperature
+        num_predict: Output-token budget per call
+        keep_alive: How long Ollama keeps the model loaded after a call
+        max_connections: Size of the HTTP connection pool
+        callbacks: Callback handlers attached to every call
+        num_ctx: Fixed context size; Ollama reloads the model (and loses its
+            prompt cache) whenever a request asks for a different one
+        call_deadline: Seconds after which callers abandon a call; requests
+            time out shortly after, so an abandoned call frees its
+            connection and thread instead of hanging on
+
+    Returns:
+        ChatOllama instance
+    """
+    client_kwargs: dict[str, Any] = {
+        "limits": httpx.Limits(
+            max_connections=max_connections,
+            max_keepalive_connections=max_connections,
+            keepalive_expiry=300,
+        ),
+    }
+    if call_deadline is not None:
+        timeout = call_deadline + REQUEST_TIMEOUT_GRACE
+        client_kwargs["timeout"] = httpx.Timeout(timeout, connect=min(timeout, CONNECT_TIMEOUT))
+    return ChatOllama(
+        model=model,
+        base_url=base_url,
+        temperature=temperature,
+        num_predict=num_predict,
+        num_ctx=num_ctx,
+        keep_alive=keep_alive,
+        client_kwargs=client_kwargs,
+        callbacks=callbacks,
+    )
+
+
+def create_ollama_llm(
+    model: str,
+    hosts: Union[str, list[str]],
+    temperature: float = 0.1,
+    num_predict: Optional[int] = None,
+    keep_alive: Union[int, str, None] = None,
+    max_connections: int = 10,
+    callbacks: Optional[list[BaseCallbackHandler]] = None,
+    health_check_interval: float = 10.0,
+    num_ctx: Optional[int] = None,
+    call_deadline: Optional[float] = None,
+) -> BaseChatModel:
+    """
+    Create the chat model for one or several Ollama servers
+
+    A single host gets a plain ChatOllama; several hosts get an OllamaRouter
+    over one ChatOllama per host, with health checks running.
+
+    Args:
+        model: Ollama model name
+        hosts: Server URL, comma-separated URLs, or a list of URLs
+        temperature: LLM temperature
+        num_predict: Output-token budget per call
+        keep_alive: How long Ollama keeps the model loaded after a call
+        max_connections: Size of the HTTP connection pool per server
+        callbacks: Callback handlers attached to every call
+        health_check_interval: Seconds between backend health checks
+        num_ctx: Fixed context size for every server
+        call_deadline: Seconds after which callers abandon a call (sets the HTTP timeout)
+
+    Returns:
+        ChatOllama or OllamaRouter
+    """
+    if isinstance(hosts, str):
+        hosts = [host.strip() for host in hosts.split(",") if host.strip()]
+    if not hosts:
+        raise ValueError("At least one Ollama host is required")
+
+    if len(hosts) == 1:
+        return create_chat_ollama(
+            model,
+            hosts[0],
+            temperature=temperature,
+            num_predict=num_predict,
+            keep_alive=keep_alive,
+            max_connections=max_connections,
+            callbacks=callbacks,
+            num_ctx=num_ctx,
+            call_deadline=call_deadline,
+        )
+
+    backends = [
+        OllamaBackend(
+            create_chat_ollama(
+                model,
+                host,
+                temperature=temperature,
+                num_predict=num_predict,
+                keep_alive=keep_alive,
+                max_connections=max_connections,
+                num_ctx=num_ctx,
+                call_deadline=call_deadline,
+            )
+        )
+        for host in hosts
+    ]
+    router = OllamaRouter(
+        backends=backends, health_check_interval=health_check_interval, callbacks=callbacks
+    )
+    router.start_health_checks()
+    logger.info(f"Routing Ollama requests across {len(hosts)} backends: {', '.join(hosts)}")
+    return router
+
+
+def warm_up_model(llm: BaseChatModel) -> Optional[float]:
+    """
+    Load the model into Ollama's memory before the first message arrives
+
+    An empty generate request loads the model without producing tokens and
+    sets its keep-alive, so the first real call doesn't pay the load time.
+    The model is loaded with the same context size the chat calls use, or
+    the first call would reload it.
+
+    Args:
+        llm: Shared ChatOllama instance, or a router (every backend is warmed)
+
+    Returns:
+        Seconds the warm-up took, or None if it failed
+    """
+    if isinstance(llm, OllamaRouter):
+        timings = [warm_up_model(backend.llm) for backend in llm.backends]
+        succeeded = [t for t in timings if t is not None]
+        return max(succeeded) if succeeded else None
+
+    # Loading a model takes longer than the chat calls' request timeout
+    client = llm._client
+    if (getattr(llm, "client_kwargs", None) or {}).get("timeout") is not None:
+        client = OllamaHTTPClient(host=llm.base_url)
+
+    started = time.perf_counter()
+    try:
+        options = {"num_ctx": llm.num_ctx} if getattr(llm, "num_ctx", None) else None
+        client.generate(
+            model=llm.model, prompt="", keep_alive=llm.keep_alive, options=options
+        )
+    except Exception as e:
+        logger.warning(f"Failed to warm up {llm.model}: {e}")
+        return None
+
+    elapsed = time.perf_counter() - started
+    logger.info(
+        f"🔥 Warmed up {llm.model} on {llm.base_url} in {elapsed:.1f}s "
+        f"(keep-alive: {llm.keep_alive})"
+    )
+    return elapsed
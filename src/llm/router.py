@@ -0,0 +1,232 @@
+"""Routing of chat requests across several Ollama backends"""
+
+import logging
+import threading
+import time
+from typing import Any, Iterator, Optional
+
+import httpx
+from langchain_core.callbacks import CallbackManagerForLLMRun
+from langchain_core.language_models import BaseChatModel
+from langchain_core.messages import BaseMessage
+from langchain_core.outputs import ChatGenerationChunk, ChatResult
+from langchain_ollama import ChatOllama
+from pydantic import PrivateAttr
+
+logger = logging.getLogger(__name__)
+
+# Errors that mean the backend itself is unreachable, so another one may answer
+CONNECTION_ERRORS = (httpx.TransportError, ConnectionError)
+
+
+class OllamaBackend:
+    """One Ollama server with its load and health state"""
+
+    # Weight of the newest call in the latency moving average
+    LATENCY_SMOOTHING = 0.3
+
+    def __init__(self, llm: ChatOllama):
+        """
+        Initialize the backend
+
+        Args:
+            llm: ChatOllama instance pointing at this server
+        """
+        self.llm = llm
+        self.url = llm.base_url or "http://localhost:11434"
+        self.in_flight = 0
+        self.latency: Optional[float] = None
+        self.healthy = True
+        self.requests = 0
+        self.failures = 0
+
+    def score(self) -> float:
+        """Expected wait for a new request: queue length times recent latency"""
+        return (self.in_flight + 1) * (self.latency if self.latency is not None else 1.0)
+
+    def record_latency(self, seconds: float) -> None:
+        """Update the latency moving average"""
+        if self.latency is None:
+            self.latency = seconds
+        else:
+            self.latency += self.LATENCY_SMOOTHING * (seconds - self.latency)
+
+
+class OllamaRouter(BaseChatModel):
+    """
+    Chat model that sends each request to the least-loaded healthy backend
+
+    Backends are ranked by in-flight requests times their recent latency.
+    A backend that fails to connect is marked unhealthy and the request is
+    retried on the next one; a background health check brings it back.
+    Streaming requests fail over only before the first chunk arrives.
+    """
+
+    backends: list[OllamaBackend]
+    health_check_interval: float = 10.0
+
+    _lock: threading.Lock = PrivateAttr(default_factory=threading.Lock)
+    _stop: threading.Event = PrivateAttr(default_factory=threading.Event)
+    _health_thread: Optional[threading.Thread] = PrivateAttr(default=None)
+
+    @property
+    def _llm_type(self) -> str:
+        return "ollama-router"
+
+    @property
+    def model(self) -> str:
+        """Model name (the same on every backend)"""
+        return self.backends[0].llm.model
+
+    def start_health_checks(self) -> None:
+        """Start the background health-check thread"""
+        if self._health_thread is not None:
+            return
+        self._health_thread = threading.Thread(
+            target=self._health_loop, name="ollama-health", daemon=True
+        )
+        self._health_thread.start()
+
+    def stop_health_checks(self) -> None:
+        """Stop the background health-check thread"""
+        self._stop.set()
+
+    def _health_loop(self) -> None:
+        """Probe every backend periodically"""
+        while not self._stop.wait(self.health_check_interval):
+            for backend in self.backends:
+                self.check_health(backend)
+
+    def check_health(self, backend: OllamaBackend) -> bool:
+        """
+        Probe one backend and update its health
+
+        Args:
+            backend: Backend to probe
+
+        Returns:
+            Whether the backend answered
+        """
+        try:
+            httpx.get(f"{backend.url.rstrip('/')}/api/version", timeout=2.0).raise_for_status()
+            healthy = True
+        except httpx.HTTPError:
+            healthy = False
+        self._set_health(backend, healthy)
+        return healthy
+
+    def _set_health(self, backend: OllamaBackend, healthy: bool) -> None:
+        """Change a backend's health and log transitions"""
+        with self._lock:
+            changed = backend.healthy != healthy
+            backend.healthy = healthy
+        if changed:
+            if healthy:
+                logger.info(f"Ollama backend {backend.url} is healthy again")
+            else:
+                logger.warning(f"Ollama backend {backend.url} marked unhealthy")
+
+    def _candidates(self) -> list[OllamaBackend]:
+        """Backends in the order they should be tried"""
+        with self._lock:
+            ranked = sorted(self.backends, key=OllamaBackend.score)
+        healthy = [backend for backend in ranked if backend.healthy]
+        # With every backend down, still try them all rather than fail outright
+        return healthy + [backend for backend in ranked if not backend.healthy]
+
+    def _acquire(self, backend: OllamaBackend) -> float:
+        """Count a request as in flight on a backend"""
+        with self._lock:
+            backend.in_flight += 1
+            backend.requests += 1
+        return time.perf_counter()
+
+    def _release(self, backend: OllamaBackend, started: float, failed: bool) -> None:
+        """Finish a request and update the backend's latency"""
+        with self._lock:
+            backend.in_flight -= 1
+            if failed:
+                backend.failures += 1
+            else:
+                backend.record_latency(time.perf_counter() - started)
+
+    def _generate(
+        self,
+        messages: list[BaseMessage],
+        stop: Optional[list[str]] = None,
+        run_manager: Optional[CallbackManagerForLLMRun] = None,
+        **kwargs: Any,
+    ) -> ChatResult:
+        last_error: Optional[Exception] = None
+        for backend in self._candidates():
+            started = self._acquire(backend)
+            try:
+                result = backend.llm._generate(messages, stop, run_manager, **kwargs)
+            except CONNECTION_ERRORS as e:
+                self._release(backend, started, failed=True)
+                self._set_health(backend, False)
+                logger.warning(f"Ollama backend {backend.url} failed ({e}), trying the next")
+                last_error = e
+                continue
+            except Exception:
+                self._release(backend, started, failed=True)
+                raise
+            self._release(backend, started, failed=False)
+            return result
+        raise last_error or RuntimeError("No Ollama backends configured")
+
+    def _stream(
+        self,
+        messages: list[BaseMessage],
+        stop: Optional[list[str]] = None,
+        run_manager: Optional[CallbackManagerForLLMRun] = None,
+        **kwargs: Any,
+    ) -> Iterator[ChatGenerationChunk]:
+        last_error: Optional[Exception] = None
+        for backend in self._candidates():
+            started = self._acquire(backend)
+            stream = backend.llm._stream(messages, stop, run_manager, **kwargs)
+            try:
+                first = next(stream, None)
+            except CONNECTION_ERRORS as e:
+                stream.close()
+                self._release(backend, started, failed=True)
+                self._set_health(backend, False)
+                logger.warning(f"Ollama backend {backend.url} failed ({e}), trying the next")
+                last_error = e
+                continue
+            except Exception:
+                stream.close()
+                self._release(backend, started, failed=True)
+                raise
+
+            failed = False
+            try:
+                if first is not None:
+                    yield first
+                    yield from stream
+            except Exception:
+                failed = True
+                raise
+            finally:
+                # Also runs when the consumer closes the stream early
+                stream.close()
+                self._release(backend, started, failed=failed)
+            return
+        raise last_error or RuntimeError("No Ollama backends configured")
+
+    def stats(self) -> dict[str, dict[str, Any]]:
+        """Get load, latency and health per backend"""
+        with self._lock:
+            return {
+                backend.url: {
+                    "healthy": backend.healthy,
+                    "in_flight": backend.in_flight,
+                    "latency_ms": (
+                        backend.latency * 1000 if backend.latency is not None else None
+                    ),
+                    "requests": backend.requests,
+                    "failures": backend.failures,
+                }
+                for backend in self.backends
+            }
@@ -1,9 +1,10 @@
 """Main entry point for the YouTube Download Agent (LangChain-based)"""
 
+import asyncio
 import logging
 import signal
 import sys
-import time
+import threading
 from logging.handlers import RotatingFileHandler
 from pathlib import Path
 
@@ -11,8 +12,11 @@ from .config import get_settings
 from .agents import YouTubeDownloadAgent
 from .slack_handler import SlackHandler
 
-# Global flag for graceful shutdown
-running = True
+# Set by the signal handler to request a graceful shutdown
+shutdown_requested = threading.Event()
+
+# Seconds between queue statistics log lines
+STATS_LOG_INTERVAL = 300
 
 
 def setup_logging(settings) -> None:
@@ -52,10 +56,9 @@ def setup_logging(settings) -> None:
 
 def signal_handler(signum, frame):
     """Handle shutdown signals gracefully"""
-    global running
     logger = logging.getLogger(__name__)
     logger.info(f"Received signal {signum}, shutting down...")
-    running = False
+    shutdown_requested.set()
 
 
 class YouTubeAgent:
@@ -65,18 +68,32 @@ class YouTubeAgent:
         """Initialize the agent with all components"""
         self.settings = get_settings()
         self.logger = logging.getLogger(__name__)
+        if self.settings.runtime_mode not in ("threaded", "async"):
+            raise ValueError(f"Unknown runtime mode: {self.settings.runtime_mode}")
+        self.is_async = self.settings.runtime_mode == "async"
 
         # Initialize Slack handler
-        self.slack_handler = SlackHandler(self.settings)
+        if self.is_async:
+            from .async_slack_handler import AsyncSlackHandler
+
+            self.slack_handler = AsyncSlackHandler(self.settings)
+        else:
+            self.slack_handler = SlackHandler(self.settings)
 
         # Initialize LangChain YouTube Agent with feedback callback
         self.youtube_agent = YouTubeDownloadAgent(
             settings=self.settings,
-            feedback_callback=self.slack_handler.send_message
+            feedback_callback=self.slack_handler.send_message,
+            update_callback=self.slack_handler.update_message,
         )
 
+        # The backfill skips messages whose videos are already downloaded
+        self.slack_handler.set_download_index(self.youtube_agent.download_index)
+
         # Set up message callback
-        self.slack_handler.set_message_callback(self.handle_message)
+        self.slack_handler.set_message_callback(
+            self.ahandle_message if self.is_async else self.handle_message
+        )
 
     def handle_message(self, channel_id: str, user_id: str, text: str, ts: str) -> None:
         """
@@ -99,19 +116,7 @@ class YouTubeAgent:
                 thread_ts=ts
             )
             
-            # Log the result
-            if result.get("success"):
-                action = result.get("action", "none")
-                if action == "download":
-                    total = result.get("total", 0)
-                    successful = result.get("successful", 0)
-                    self.logger.info(
-                        f"Agent completed: {successful}/{total} downloads successful"
-                    )
-                else:
-                    self.logger.debug(f"Agent action: {action}")
-            else:
-                self.logger.error(f"Agent failed: {result.get('error')}")
+            self._log_result(result)
 
         except Exception as e:
             self.logger.error(f"Error in message handler: {e}", exc_info=True)
@@ -121,26 +126,70 @@ class YouTubeAgent:
                 thread_ts=ts,
             )
 
+    async def ahandle_message(self, channel_id: str, user_id: str, text: str, ts: str) -> None:
+        """
+        Handle incoming Slack messages on the event loop (async runtime mode)
+
+        Args:
+            channel_id: The channel where the message was posted
+            user_id: The user who posted the message
+            text: The message text
+            ts: The message timestamp (for threading)
+        """
+        self.logger.info(f"Processing message from {user_id} in {channel_id}")
+
+        try:
+            result = await self.youtube_agent.aprocess_message(
+                channel_id=channel_id,
+                user_id=user_id,
+                message=text,
+                thread_ts=ts
+            )
+            self._log_result(result)
+
+        except Exception as e:
+            self.logger.error(f"Error in message handler: {e}", exc_info=True)
+            await self.slack_handler.send_message(
+                channel_id,
+                f"❌ An error occurred: {str(e)}",
+                thread_ts=ts,
+            )
+
+    def _log_result(self, result: dict) -> None:
+        """Log the outcome of processing one message"""
+        if result.get("success"):
+            action = result.get("action", "none")
+            if action == "download":
+                total = result.get("total", 0)
+                successful = result.get("successful", 0)
+                self.logger.info(
+                    f"Agent completed: {successful}/{total} downloads successful"
+                )
+            else:
+                self.logger.debug(f"Agent action: {action}")
+        else:
+            self.logger.error(f"Agent failed: {result.get('error')}")
+
     def run(self) -> None:
         """Start the bot and keep it running"""
-        global running
-
         self.logger.info("=" * 60)
         self.logger.info("🚀 Starting YouTube Download Agent (LangChain)")
         self.logger.info("=" * 60)
         self.logger.info(f"🤖 Using LangChain Agent with {self.settings.ollama_model}")
 
+        if self.is_async:
+            asyncio.run(self._run_async())
+            return
+
         # Start Slack connection
         try:
             self.slack_handler.start()
+            self._log_running()
+            self.youtube_agent.resume_jobs()
 
-            self.logger.info("✨ Agent is now running and listening for messages...")
-            self.logger.info(f"📂 Download directory: {self.settings.download_dir}")
-            self.logger.info("Press Ctrl+C to stop")
-
-            # Keep the main thread alive
-            while running:
-                time.sleep(1)
+            # Sleep until a signal arrives, waking up only to log statistics
+            while not shutdown_requested.wait(STATS_LOG_INTERVAL):
+                self.log_stats()
 
         except KeyboardInterrupt:
             self.logger.info("Received keyboard interrupt")
@@ -149,9 +198,66 @@ class YouTubeAgent:
         finally:
             self.shutdown()
 
+    async def _run_async(self) -> None:
+        """Run the Slack connection, LLM calls and downloads on one event loop"""
+        loop = asyncio.get_running_loop()
+        stop = asyncio.Event()
+        for signum in (signal.SIGINT, signal.SIGTERM):
+            loop.add_signal_handler(signum, self._request_stop, signum, stop)
+
+        try:
+            await self.slack_handler.start()
+            self._log_running()
+            await self.youtube_agent.aresume_jobs()
+
+            while True:
+                try:
+                    await asyncio.wait_for(stop.wait(), STATS_LOG_INTERVAL)
+                    break
+                except asyncio.TimeoutError:
+                    self.log_stats()
+
+        except Exception as e:
+            self.logger.error(f"Fatal error: {e}", exc_info=True)
+        finally:
+            self.logger.info("Shutting down agent...")
+            await self.slack_handler.disconnect()
+            # Downloads run on this loop, so the drain must not block it
+            await loop.run_in_executor(
+                None, self.youtube_agent.shutdown, self.settings.shutdown_drain_timeout
+            )
+            await self.slack_handler.stop()
+            self.logger.info("✅ Agent shutdown complete")
+
+    def _request_stop(self, signum: int, stop: asyncio.Event) -> None:
+        """Signal handler of the async runtime"""
+        self.logger.info(f"Received signal {signum}, shutting down...")
+        stop.set()
+
+    def _log_running(self) -> None:
+        """Log that the agent is ready"""
+        self.logger.info(
+            f"✨ Agent is now running ({self.settings.runtime_mode}) "
+            "and listening for messages..."
+        )
+        self.logger.info(f"📂 Download directory: {self.settings.download_dir}")
+        self.logger.info("Press Ctrl+C to stop")
+
+    def log_stats(self) -> None:
+        """Log queue, download and LLM statistics"""
+        self.logger.info(f"Queue stats: {self.slack_handler.queue_stats()}")
+        self.logger.info(f"Event dedup stats: {self.slack_handler.dedup.stats()}")
+        self.logger.info(f"Outbound Slack stats: {self.slack_handler.outbound_stats()}")
+        for name, stats in self.youtube_agent.stats().items():
+            self.logger.info(f"{name} stats: {stats}")
+
     def shutdown(self) -> None:
         """Gracefully shutdown the agent"""
         self.logger.info("Shutting down agent...")
+        # No new messages, then settle downloads while the outbound dispatcher
+        # still sends their replies; the dispatcher stops last
+        self.slack_handler.disconnect()
+        self.youtube_agent.shutdown(timeout=self.settings.shutdown_drain_timeout)
         self.slack_handler.stop()
         self.logger.info("✅ Agent shutdown complete")
 
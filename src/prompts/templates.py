@@ -21,35 +21,58 @@ Download intent keywords (Korean and English):
 
 Response format:
 You must respond with ONLY a JSON object in this exact format:
-{{
-    "urls": ["url1", "url2"],
-    "download_intent": true/false,
-    "reasoning": "brief explanation"
-}}
+{response_format}
 
 Rules:
 - Extract ONLY valid YouTube URLs
 - Set download_intent to true if keywords are present OR if the message is just a URL with minimal text
 - If no URLs found, return empty array for urls
-- Be strict about URL validation
-- Provide brief reasoning for your decision
+- Be strict about URL validation{reasoning_rule}
 """
 
-# Human prompt template
-URL_EXTRACTION_HUMAN_PROMPT = """Message: {message}
+# JSON answer formats; "urls" and "download_intent" come first so a streaming
+# parser can stop generation before the reasoning
+RESPONSE_FORMAT_WITH_REASONING = """{{
+    "urls": ["url1", "url2"],
+    "download_intent": true/false,
+    "reasoning": "brief explanation"
+}}"""
+
+RESPONSE_FORMAT_WITHOUT_REASONING = """{{
+    "urls": ["url1", "url2"],
+    "download_intent": true/false
+}}"""
 
-Extract YouTube URLs and determine download intent."""
+# Human prompt template; the message comes last so everything before it is a
+# stable prefix that Ollama can serve from its prompt cache on the next call
+URL_EXTRACTION_HUMAN_PROMPT = """Extract YouTube URLs and determine download intent.
 
+Message: {message}"""
 
-def create_url_extraction_prompt() -> ChatPromptTemplate:
+
+def create_url_extraction_prompt(include_reasoning: bool = True) -> ChatPromptTemplate:
     """
     Create a chat prompt template for URL extraction
     
+    Args:
+        include_reasoning: Whether the model should explain its decision
+            (costs generation time; nothing downstream reads it)
+    
     Returns:
         ChatPromptTemplate configured for URL extraction
     """
+    if include_reasoning:
+        response_format = RESPONSE_FORMAT_WITH_REASONING
+        reasoning_rule = "\n- Provide brief reasoning for your decision"
+    else:
+        response_format = RESPONSE_FORMAT_WITHOUT_REASONING
+        reasoning_rule = ""
+
+    system_prompt = URL_EXTRACTION_SYSTEM_PROMPT.format(
+        response_format=response_format, reasoning_rule=reasoning_rule
+    )
     return ChatPromptTemplate.from_messages([
-        SystemMessagePromptTemplate.from_template(URL_EXTRACTION_SYSTEM_PROMPT),
+        SystemMessagePromptTemplate.from_template(system_prompt),
         HumanMessagePromptTemplate.from_template(URL_EXTRACTION_HUMAN_PROMPT),
     ])
 
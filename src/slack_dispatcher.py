@@ -0,0 +1,505 @@
+"""Background sender for outbound Slack messages with per-channel rate limits"""
+
+import asyncio
+import logging
+import threading
+import time
+from collections import deque
+from concurrent.futures import Future
+from dataclasses import dataclass, field
+from typing import Any, Optional, Union
+
+from slack_sdk import WebClient
+from slack_sdk.errors import SlackApiError
+from slack_sdk.web.async_client import AsyncWebClient
+
+logger = logging.getLogger(__name__)
+
+# Merged posts stop growing at this length
+MAX_MERGED_CHARS = 3000
+
+# Pause after a 429 response without a Retry-After header
+DEFAULT_RETRY_AFTER = 1.0
+
+
+class TokenBucket:
+    """Allows `rate` operations per second on average, in bursts of up to `burst`"""
+
+    def __init__(self, rate: float, burst: int):
+        """
+        Initialize the bucket (full)
+
+        Args:
+            rate: Tokens added per second
+            burst: Bucket capacity
+        """
+        self.rate = rate
+        self.burst = burst
+        self.tokens = float(burst)
+        self.updated = time.monotonic()
+
+    def _refill(self, now: float) -> None:
+        self.tokens = min(self.burst, self.tokens + (now - self.updated) * self.rate)
+        self.updated = now
+
+    def wait_time(self, now: float) -> float:
+        """Seconds until a token is available (0 if one is available now)"""
+        self._refill(now)
+        return 0.0 if self.tokens >= 1 else (1 - self.tokens) / self.rate
+
+    def take(self, now: float) -> None:
+        """Consume one token"""
+        self._refill(now)
+        self.tokens -= 1
+
+
+@dataclass(eq=False)
+class _Post:
+    """One chat.postMessage; queued posts to the same thread are merged into it"""
+
+    channel_id: str
+    thread_ts: Optional[str]
+    parts: list[str]
+    future: Future = field(default_factory=Future)
+    ts: Optional[str] = None
+    sent: bool = False
+    attempts: int = 0
+
+    @property
+    def text(self) -> str:
+        return "\n".join(self.parts)
+
+
+@dataclass(eq=False)
+class _Edit:
+    """One chat.update; a newer edit of the same message replaces its text"""
+
+    channel_id: str
+    target: Union[str, _Post]
+    # None renders the target post's parts
+    text: Optional[str] = None
+    attempts: int = 0
+
+
+class PendingMessage:
+    """Handle of a queued message, accepted as `ts` by SlackDispatcher.update"""
+
+    def __init__(self, post: _Post, index: int):
+        self._post = post
+        self._index = index
+
+    def result(self, timeout: Optional[float] = None) -> Any:
+        """
+        Wait until the message is sent
+
+        Args:
+            timeout: Maximum seconds to wait
+
+        Returns:
+            The response from Slack API
+        """
+        return self._post.future.result(timeout)
+
+
+class SlackDispatcher:
+    """
+    Sends Slack posts and edits from one background thread
+
+    Each channel has a token bucket, so bursts of feedback are spread out
+    instead of hitting Slack's per-channel limits. While a channel waits,
+    new posts to a thread already queued are merged into one message and
+    edits of the same message collapse to the latest text. A 429 response
+    pauses sending for its Retry-After and the operation is retried.
+    """
+
+    def __init__(
+        self,
+        web_client: WebClient,
+        rate: float = 1.0,
+        burst: int = 3,
+        max_attempts: int = 5,
+    ):
+        """
+        Initialize the dispatcher
+
+        Args:
+            web_client: Slack Web API client
+            rate: Messages per second per channel
+            burst: Messages a channel may send at once after being idle
+            max_attempts: Attempts per message when rate limited
+        """
+        self.web_client = web_client
+        self.rate = rate
+        self.burst = burst
+        self.max_attempts = max_attempts
+
+        self._cond = threading.Condition()
+        self._queues: dict[str, deque[Union[_Post, _Edit]]] = {}
+        self._buckets: dict[str, TokenBucket] = {}
+        self._paused_until = 0.0
+        self._stopping = False
+        self._thread: Optional[threading.Thread] = None
+        self._sent = 0
+        self._merged = 0
+        self._coalesced = 0
+        self._rate_limited = 0
+        self._failed = 0
+
+    def start(self) -> None:
+        """Start the sender thread"""
+        if self._thread is not None:
+            return
+        self._stopping = False
+        self._thread = threading.Thread(target=self._run, name="slack-sender", daemon=True)
+        self._thread.start()
+
+    def stop(self, timeout: float = 10.0) -> None:
+        """
+        Send what is queued, then stop the sender thread
+
+        Args:
+            timeout: Maximum seconds to wait for the queue to drain
+        """
+        if self._thread is None:
+            return
+        with self._cond:
+            self._stopping = True
+            self._cond.notify()
+        self._thread.join(timeout)
+        if self._thread.is_alive():
+            logger.warning(f"{self.depth} outbound Slack message(s) not sent at shutdown")
+        self._thread = None
+
+    def post(self, channel_id: str, text: str, thread_ts: Optional[str] = None) -> PendingMessage:
+        """
+        Queue a message
+
+        Args:
+            channel_id: The channel ID to send the message to
+            text: The message text
+            thread_ts: Optional thread timestamp to reply in a thread
+
+        Returns:
+            Handle for waiting on the message or editing it
+        """
+        with self._cond:
+            queue = self._queues.setdefault(channel_id, deque())
+            for op in reversed(queue):
+                if (
+                    isinstance(op, _Post)
+                    and op.thread_ts == thread_ts
+                    and len(op.text) + len(text) < MAX_MERGED_CHARS
+                ):
+                    op.parts.append(text)
+                    self._merged += 1
+                    return PendingMessage(op, len(op.parts) - 1)
+
+            post = _Post(channel_id=channel_id, thread_ts=thread_ts, parts=[text])
+            queue.append(post)
+            self._cond.notify()
+            return PendingMessage(post, 0)
+
+    def update(self, channel_id: str, ts: Union[str, PendingMessage], text: str) -> None:
+        """
+        Queue an edit of a message
+
+        Args:
+            channel_id: The channel ID of the message
+            ts: Timestamp of the message, or the handle returned by post()
+            text: The new message text
+        """
+        with self._cond:
+            if isinstance(ts, PendingMessage):
+                post = ts._post
+                post.parts[ts._index] = text
+                if not post.sent:
+                    # Still queued: the post goes out with the new text
+                    self._coalesced += 1
+                    return
+                target: Union[str, _Post] = post
+                text = None
+            else:
+                target = ts
+
+            queue = self._queues.setdefault(channel_id, deque())
+            for op in queue:
+                if isinstance(op, _Edit) and op.target == target:
+                    op.text = text
+                    self._coalesced += 1
+                    return
+            queue.append(_Edit(channel_id=channel_id, target=target, text=text))
+            self._cond.notify()
+
+    def _next_op(self, now: float) -> tuple[Optional[Union[_Post, _Edit]], Optional[float]]:
+        """
+        Take the next operation whose channel has a token (lock held)
+
+        Returns:
+            (operation, None), or (None, seconds until one is ready / None if idle)
+        """
+        wait: Optional[float] = None
+        for channel_id, queue in list(self._queues.items()):
+            if not queue:
+                continue
+            bucket = self._buckets.get(channel_id)
+            if bucket is None:
+                bucket = self._buckets[channel_id] = TokenBucket(self.rate, self.burst)
+            channel_wait = bucket.wait_time(now)
+            if channel_wait > 0:
+                wait = channel_wait if wait is None else min(wait, channel_wait)
+                continue
+
+            bucket.take(now)
+            op = queue.popleft()
+            # Round robin: this channel goes to the back
+            del self._queues[channel_id]
+            self._queues[channel_id] = queue
+            return op, None
+        return None, wait
+
+    def _take(self, now: float) -> tuple[Optional[Union[_Post, _Edit]], str, Optional[float]]:
+        """
+        Take the next operation that may be sent now, with its text (lock held)
+
+        Returns:
+            (operation, text, None), or (None, "", seconds to wait / None if idle)
+        """
+        wait: Optional[float] = self._paused_until - now
+        if wait > 0:
+            return None, "", wait
+        op, wait = self._next_op(now)
+        if op is None:
+            return None, "", wait
+        if isinstance(op, _Post):
+            op.sent = True
+            return op, op.text, None
+        return op, op.text if op.text is not None else op.target.text, None
+
+    def _run(self) -> None:
+        """Send queued operations until stopped and drained"""
+        while True:
+            with self._cond:
+                op = None
+                while op is None:
+                    if self._stopping and self.depth == 0:
+                        return
+                    op, text, wait = self._take(time.monotonic())
+                    if op is None:
+                        self._cond.wait(wait)
+            self._send(op, text)
+
+    def _send(self, op: Union[_Post, _Edit], text: str) -> None:
+        """Send one operation, requeueing it when rate limited"""
+        op.attempts += 1
+        try:
+            if isinstance(op, _Post):
+                response = self.web_client.chat_postMessage(
+                    channel=op.channel_id, text=text, thread_ts=op.thread_ts
+                )
+            else:
+                ts = self._edit_ts(op)
+                if ts is None:
+                    return
+                response = self.web_client.chat_update(channel=op.channel_id, ts=ts, text=text)
+            self._sent_ok(op, text, response)
+        except Exception as e:
+            self._send_failed(op, e)
+
+    @staticmethod
+    def _edit_ts(op: _Edit) -> Optional[str]:
+        """Timestamp of the message an edit targets, or None if it was never sent"""
+        ts = op.target.ts if isinstance(op.target, _Post) else op.target
+        if ts is None:
+            logger.debug("Dropping edit of a message that was never sent")
+        return ts
+
+    def _sent_ok(self, op: Union[_Post, _Edit], text: str, response: Any) -> None:
+        """Record a sent operation"""
+        if isinstance(op, _Post):
+            op.ts = response.get("ts")
+            op.future.set_result(response)
+        logger.debug(f"Slack message sent to {op.channel_id}: {text[:50]}...")
+        with self._cond:
+            self._sent += 1
+
+    def _send_failed(self, op: Union[_Post, _Edit], error: Exception) -> None:
+        """Retry a rate-limited operation later, or give up on it"""
+        if (
+            isinstance(error, SlackApiError)
+            and error.response.status_code == 429
+            and op.attempts < self.max_attempts
+        ):
+            self._retry_later(op, error)
+        else:
+            self._fail(op, error)
+
+    def _retry_later(self, op: Union[_Post, _Edit], error: SlackApiError) -> None:
+        """Pause sending for Retry-After and put the operation back in front"""
+        headers = error.response.headers or {}
+        retry_after = headers.get("Retry-After") or headers.get("retry-after")
+        try:
+            delay = float(retry_after) if retry_after is not None else DEFAULT_RETRY_AFTER
+        except (TypeError, ValueError):
+            delay = DEFAULT_RETRY_AFTER
+
+        logger.warning(f"Slack rate limited, retrying in {delay:.1f}s")
+        with self._cond:
+            self._rate_limited += 1
+            self._paused_until = max(self._paused_until, time.monotonic() + delay)
+            if isinstance(op, _Post):
+                op.sent = False
+            self._queues.setdefault(op.channel_id, deque()).appendleft(op)
+            self._cond.notify()
+
+    def _fail(self, op: Union[_Post, _Edit], error: Exception) -> None:
+        """Give up on an operation"""
+        action = "send" if isinstance(op, _Post) else "update"
+        logger.error(f"Failed to {action} Slack message in {op.channel_id}: {error}")
+        with self._cond:
+            self._failed += 1
+        if isinstance(op, _Post):
+            op.future.set_exception(error)
+
+    @property
+    def depth(self) -> int:
+        """Number of operations waiting to be sent"""
+        return sum(len(queue) for queue in self._queues.values())
+
+    def stats(self) -> dict[str, Any]:
+        """
+        Get dispatcher statistics
+
+        Returns:
+            Dictionary with queue depth and counters
+        """
+        with self._cond:
+            return {
+                "depth": self.depth,
+                "sent": self._sent,
+                "merged_posts": self._merged,
+                "coalesced_edits": self._coalesced,
+                "rate_limited": self._rate_limited,
+                "failed": self._failed,
+            }
+
+
+class AsyncSlackDispatcher(SlackDispatcher):
+    """
+    SlackDispatcher for the async runtime: sends from a task on the event loop
+
+    Queueing, merging, token buckets and Retry-After pauses are the same as
+    in the threaded dispatcher; waiting is done with asyncio instead of a
+    thread. post() and update() must be called on the loop.
+    """
+
+    def __init__(
+        self,
+        web_client: AsyncWebClient,
+        rate: float = 1.0,
+        burst: int = 3,
+        max_attempts: int = 5,
+    ):
+        """
+        Initialize the dispatcher
+
+        Args:
+            web_client: Async Slack Web API client
+            rate: Messages per second per channel
+            burst: Messages a channel may send at once after being idle
+            max_attempts: Attempts per message when rate limited
+        """
+        super().__init__(web_client, rate=rate, burst=burst, max_attempts=max_attempts)
+        self._wakeup: Optional[asyncio.Event] = None
+        self._task: Optional[asyncio.Task] = None
+
+    def start(self) -> None:
+        """Start the sender task (call on the event loop)"""
+        if self._task is not None:
+            return
+        self._stopping = False
+        self._wakeup = asyncio.Event()
+        self._task = asyncio.create_task(self._arun(), name="slack-sender")
+
+    async def stop(self, timeout: float = 10.0) -> None:
+        """
+        Send what is queued, then stop the sender task
+
+        Args:
+            timeout: Maximum seconds to wait for the queue to drain
+        """
+        if self._task is None:
+            return
+        self._stopping = True
+        self._wakeup.set()
+        try:
+            await asyncio.wait_for(self._task, timeout)
+        except asyncio.TimeoutError:
+            logger.warning(f"{self.depth} outbound Slack message(s) not sent at shutdown")
+        self._task = None
+
+    def post(self, channel_id: str, text: str, thread_ts: Optional[str] = None) -> PendingMessage:
+        """
+        Queue a message
+
+        Args:
+            channel_id: The channel ID to send the message to
+            text: The message text
+            thread_ts: Optional thread timestamp to reply in a thread
+
+        Returns:
+            Handle for editing the message
+        """
+        handle = super().post(channel_id, text, thread_ts=thread_ts)
+        self._wake()
+        return handle
+
+    def update(self, channel_id: str, ts: Union[str, PendingMessage], text: str) -> None:
+        """
+        Queue an edit of a message
+
+        Args:
+            channel_id: The channel ID of the message
+            ts: Timestamp of the message, or the handle returned by post()
+            text: The new message text
+        """
+        super().update(channel_id, ts, text)
+        self._wake()
+
+    def _wake(self) -> None:
+        if self._wakeup is not None:
+            self._wakeup.set()
+
+    async def _arun(self) -> None:
+        """Send queued operations until stopped and drained"""
+        while True:
+            with self._cond:
+                if self._stopping and self.depth == 0:
+                    return
+                op, text, wait = self._take(time.monotonic())
+            if op is None:
+                self._wakeup.clear()
+                try:
+                    await asyncio.wait_for(self._wakeup.wait(), wait)
+                except asyncio.TimeoutError:
+                    pass
+                continue
+            await self._asend(op, text)
+
+    async def _asend(self, op: Union[_Post, _Edit], text: str) -> None:
+        """Send one operation, requeueing it when rate limited"""
+        op.attempts += 1
+        try:
+            if isinstance(op, _Post):
+                response = await self.web_client.chat_postMessage(
+                    channel=op.channel_id, text=text, thread_ts=op.thread_ts
+                )
+            else:
+                ts = self._edit_ts(op)
+                if ts is None:
+                    return
+                response = await self.web_client.chat_update(
+                    channel=op.channel_id, ts=ts, text=text
+                )
+            self._sent_ok(op, text, response)
+        except Exception as e:
+            self._send_failed(op, e)
@@ -0,0 +1,51 @@
+"""Filtering of Slack message events shared by the live handlers and the backfill"""
+
+import logging
+from typing import Optional
+
+logger = logging.getLogger(__name__)
+
+
+def parse_message_event(
+    payload: dict, bot_user_id: Optional[str], monitored_channels: set[str]
+) -> Optional[tuple[str, str, str, str]]:
+    """
+    Pick the message out of an Events API payload, if the bot should handle it
+
+    Args:
+        payload: Events API payload of a Socket Mode request
+        bot_user_id: The bot's own user ID
+        monitored_channels: Channels to handle (empty for all)
+
+    Returns:
+        Tuple of (channel_id, user_id, text, ts), or None to ignore the event
+    """
+    event = payload.get("event", {})
+    if event.get("type") != "message":
+        return None
+
+    # Filter out bot messages and message changes
+    if event.get("subtype") in ["bot_message", "message_changed"]:
+        return None
+
+    # Filter out messages from the bot itself (unless it's a test message)
+    user_id = event.get("user")
+    text = event.get("text", "")
+
+    # Allow test messages from bot (with [TEST] marker)
+    is_test_message = "[TEST]" in text
+
+    if user_id == bot_user_id and not is_test_message:
+        logger.debug("Ignoring message from bot itself")
+        return None
+
+    channel_id = event.get("channel")
+    ts = event.get("ts")
+
+    # Check if we should monitor this channel
+    if monitored_channels and channel_id not in monitored_channels:
+        logger.debug(f"Ignoring message from non-monitored channel: {channel_id}")
+        return None
+
+    logger.info(f"Received message in channel {channel_id} from user {user_id}")
+    return channel_id, user_id, text, ts
@@ -1,17 +1,26 @@
 """Slack Socket Mode handler for receiving messages"""
 
 import logging
-from typing import Callable, Optional
+import threading
+from typing import Any, Callable, Optional, Union
 
 from slack_sdk import WebClient
 from slack_sdk.socket_mode import SocketModeClient
 from slack_sdk.socket_mode.request import SocketModeRequest
 from slack_sdk.socket_mode.response import SocketModeResponse
 
+from .backfill import Backfiller, ChannelCursors
 from .config import Settings
+from .event_dedup import EventDeduplicator, event_keys
+from .slack_dispatcher import PendingMessage, SlackDispatcher
+from .slack_events import parse_message_event
+from .work_queue import WorkQueue
 
 logger = logging.getLogger(__name__)
 
+# Reply sent when a message can't be queued
+BUSY_MESSAGE = "⚠️ I'm busy with other downloads right now. Please try again in a moment."
+
 
 class SlackHandler:
     """Handles Slack Socket Mode connections and message events"""
@@ -28,6 +37,26 @@ class SlackHandler:
         self.socket_client: Optional[SocketModeClient] = None
         self.message_callback: Optional[Callable] = None
         self.bot_user_id: Optional[str] = None
+        self.work_queue = WorkQueue(
+            handler=self._dispatch_message,
+            max_size=settings.queue_max_size,
+            num_workers=settings.worker_count,
+            put_timeout=settings.queue_put_timeout,
+            name="message-worker",
+        )
+        self.dedup = EventDeduplicator(
+            window=settings.event_dedup_window,
+            max_size=settings.event_dedup_max_size,
+            path=settings.event_dedup_path or None,
+        )
+        self.cursors = ChannelCursors(settings.channel_cursor_path or None)
+        self.download_index = None
+        self._backfill_lock = threading.Lock()
+        self.dispatcher = SlackDispatcher(
+            self.web_client,
+            rate=settings.slack_send_rate,
+            burst=settings.slack_send_burst,
+        )
         self._get_bot_user_id()
 
     def _get_bot_user_id(self) -> None:
@@ -49,6 +78,50 @@ class SlackHandler:
         """
         self.message_callback = callback
 
+    def set_download_index(self, index) -> None:
+        """
+        Set the download index the backfill checks before replaying a message
+
+        Args:
+            index: DownloadIndex of the agent
+        """
+        self.download_index = index
+
+    def _handle_socket_message(
+        self, client: SocketModeClient, message: dict, raw_message: Optional[str]
+    ) -> None:
+        """Start a backfill on every (re)connect; Slack greets each connection with hello"""
+        if message.get("type") == "hello":
+            self._start_backfill()
+
+    def _start_backfill(self) -> None:
+        """Catch up on missed messages in the background (one run at a time)"""
+        if not self.settings.backfill_enabled or not self.settings.monitored_channels:
+            return
+        if not self._backfill_lock.acquire(blocking=False):
+            return
+
+        backfiller = Backfiller(
+            self.web_client,
+            self.cursors,
+            self.settings.monitored_channels,
+            submit=self.work_queue.submit,
+            bot_user_id=self.bot_user_id,
+            dedup=self.dedup,
+            index=self.download_index,
+            max_age=self.settings.backfill_max_age,
+        )
+
+        def run() -> None:
+            try:
+                backfiller.run()
+            except Exception as e:
+                logger.error(f"Backfill failed: {e}", exc_info=True)
+            finally:
+                self._backfill_lock.release()
+
+        threading.Thread(target=run, name="slack-backfill", daemon=True).start()
+
     def _handle_message_event(self, client: SocketModeClient, req: SocketModeRequest) -> None:
         """
         Handle incoming message events from Slack
@@ -62,49 +135,54 @@ class SlackHandler:
         client.send_socket_mode_response(response)
 
         # Process the event
-        if req.type == "events_api":
-            event = req.payload.get("event", {})
-            event_type = event.get("type")
-
-            if event_type == "message":
-                # Filter out bot messages and message changes
-                if event.get("subtype") in ["bot_message", "message_changed"]:
-                    return
-
-                # Filter out messages from the bot itself (unless it's a test message)
-                user_id = event.get("user")
-                text = event.get("text", "")
-
-                # Allow test messages from bot (with [TEST] marker)
-                is_test_message = "[TEST]" in text
-
-                if user_id == self.bot_user_id and not is_test_message:
-                    logger.debug("Ignoring message from bot itself")
-                    return
-
-                channel_id = event.get("channel")
-                ts = event.get("ts")
+        if req.type != "events_api":
+            return
+        message = parse_message_event(
+            req.payload, self.bot_user_id, self.settings.monitored_channels
+        )
+        if message is None:
+            return
+        # Checked before queueing, so a redelivery never reaches the LLM or a download
+        if self.dedup.is_duplicate(event_keys(req.envelope_id, req.payload)):
+            logger.info(f"Dropping redelivered event (retry {req.retry_attempt})")
+            return
+        channel_id, user_id, text, ts = message
+
+        # Hand off to the worker pool; the listener thread never runs the callback
+        if self.message_callback:
+            self.cursors.start(channel_id, ts)
+            if not self.work_queue.submit(channel_id, user_id, text, ts):
+                # The user is told to retry, so the backfill mustn't replay it
+                self.cursors.finish(channel_id, ts)
+                self._reject_busy(channel_id, ts)
+            else:
+                logger.debug(f"Queue depth: {self.work_queue.depth}")
+
+    def _dispatch_message(self, channel_id: str, user_id: str, text: str, ts: str) -> None:
+        """Run the message callback on a worker thread"""
+        try:
+            if self.message_callback:
+                self.message_callback(channel_id, user_id, text, ts)
+        finally:
+            self.cursors.finish(channel_id, ts)
 
-                # Check if we should monitor this channel
-                monitored_channels = self.settings.monitored_channels
-                if monitored_channels and channel_id not in monitored_channels:
-                    logger.debug(f"Ignoring message from non-monitored channel: {channel_id}")
-                    return
+    def _reject_busy(self, channel_id: str, ts: str) -> None:
+        """Tell the user their message was dropped because the queue is full"""
+        self.send_message(channel_id, BUSY_MESSAGE, thread_ts=ts)
 
-                logger.info(f"Received message in channel {channel_id} from user {user_id}")
+    def queue_stats(self) -> dict:
+        """Get statistics for the message work queue"""
+        return self.work_queue.stats()
 
-                # Call the message callback if set
-                if self.message_callback:
-                    try:
-                        self.message_callback(channel_id, user_id, text, ts)
-                    except Exception as e:
-                        logger.error(f"Error in message callback: {e}", exc_info=True)
+    def outbound_stats(self) -> dict[str, Any]:
+        """Get statistics for outbound messages"""
+        return self.dispatcher.stats()
 
     def send_message(
         self, channel_id: str, text: str, thread_ts: Optional[str] = None
-    ) -> dict:
+    ) -> PendingMessage:
         """
-        Send a message to a Slack channel
+        Queue a message to a Slack channel (sent in the background)
 
         Args:
             channel_id: The channel ID to send the message to
@@ -112,27 +190,36 @@ class SlackHandler:
             thread_ts: Optional thread timestamp to reply in a thread
 
         Returns:
-            The response from Slack API
+            Handle for editing the message or waiting for Slack's response
         """
-        try:
-            response = self.web_client.chat_postMessage(
-                channel=channel_id, text=text, thread_ts=thread_ts
-            )
-            logger.debug(f"Message sent to {channel_id}: {text[:50]}...")
-            return response
-        except Exception as e:
-            logger.error(f"Failed to send message: {e}")
-            raise
+        return self.dispatcher.post(channel_id, text, thread_ts=thread_ts)
+
+    def update_message(
+        self, channel_id: str, ts: Union[str, PendingMessage], text: str
+    ) -> None:
+        """
+        Queue an edit of a message the bot sent
+
+        Args:
+            channel_id: The channel ID of the message
+            ts: Timestamp of the message, or the handle returned by send_message
+            text: The new message text
+        """
+        self.dispatcher.update(channel_id, ts, text)
 
     def start(self) -> None:
         """Start the Socket Mode connection"""
         try:
+            self.dispatcher.start()
+            self.work_queue.start()
+
             self.socket_client = SocketModeClient(
                 app_token=self.settings.slack_app_token, web_client=self.web_client
             )
 
             # Register event handlers
             self.socket_client.socket_mode_request_listeners.append(self._handle_message_event)
+            self.socket_client.message_listeners.append(self._handle_socket_message)
 
             logger.info("Starting Slack Socket Mode connection...")
             self.socket_client.connect()
@@ -143,13 +230,31 @@ class SlackHandler:
             logger.error(f"Failed to start Slack connection: {e}")
             raise
 
-    def stop(self) -> None:
-        """Stop the Socket Mode connection"""
+    def disconnect(self) -> None:
+        """Close the Socket Mode connection so no new messages arrive"""
         if self.socket_client:
             logger.info("Disconnecting from Slack...")
             self.socket_client.close()
+            self.socket_client = None
             logger.info("Disconnected from Slack")
 
+    def stop(self) -> None:
+        """
+        Disconnect, finish the queued messages, then flush outbound messages
+
+        Call disconnect() first and stop downloads before this, so workers
+        waiting on downloads return and their replies still go out.
+        """
+        self.disconnect()
+        self.work_queue.stop()
+        logger.info(f"Message queue stats: {self.work_queue.stats()}")
+        self.dedup.save()
+        self.cursors.save()
+
+        # Last, so replies produced while draining the work queue still go out
+        self.dispatcher.stop()
+        logger.info(f"Outbound message stats: {self.dispatcher.stats()}")
+
     def is_connected(self) -> bool:
         """Check if the Socket Mode client is connected"""
         return self.socket_client is not None and self.socket_client.is_connected()
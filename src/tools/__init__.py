@@ -1,6 +1,52 @@
 """LangChain tools for YouTube downloading"""
 
+from .disk_quota import DiskQuota, InsufficientSpaceError
+from .download_index import DownloadIndex, extract_video_id
+from .download_scheduler import (
+    LANE_LONG,
+    LANE_NORMAL,
+    LANE_SHORT,
+    DownloadScheduler,
+    classify_lane,
+    get_download_scheduler,
+)
+from .file_publisher import FilePublisher
+from .job_journal import (
+    JOB_DONE,
+    JOB_FAILED,
+    JOB_INTERRUPTED,
+    JOB_QUEUED,
+    JOB_RUNNING,
+    JobJournal,
+    JournalEntry,
+)
+from .progress import ProgressEvent
+from .single_flight import SingleFlight
+from .ytdlp_pool import YtDlpWorkerPool
 from .youtube_tool import YouTubeDownloadTool, get_youtube_tools
 
-__all__ = ["YouTubeDownloadTool", "get_youtube_tools"]
-
+__all__ = [
+    "JOB_DONE",
+    "JOB_FAILED",
+    "JOB_INTERRUPTED",
+    "JOB_QUEUED",
+    "JOB_RUNNING",
+    "LANE_LONG",
+    "LANE_NORMAL",
+    "LANE_SHORT",
+    "DiskQuota",
+    "DownloadIndex",
+    "DownloadScheduler",
+    "FilePublisher",
+    "InsufficientSpaceError",
+    "JobJournal",
+    "JournalEntry",
+    "ProgressEvent",
+    "SingleFlight",
+    "YouTubeDownloadTool",
+    "YtDlpWorkerPool",
+    "classify_lane",
+    "extract_video_id",
+    "get_download_scheduler",
+    "get_youtube_tools",
+]
@@ -0,0 +1,204 @@
+"""Disk-space admission control and LRU eviction for the download directory"""
+
+import json
+import logging
+import os
+import shutil
+import threading
+from pathlib import Path
+from typing import Any, Optional
+
+from .download_index import DownloadIndex
+from .progress import format_bytes
+
+logger = logging.getLogger(__name__)
+
+# Prefix of the line yt-dlp prints with SIZE_PRINT_TEMPLATE
+SIZE_MARKER = "__size__ "
+
+# Printed once the format is chosen and before anything is downloaded
+SIZE_PRINT_TEMPLATE = "video:" + SIZE_MARKER + "%(.{filesize,filesize_approx,tbr,duration})j"
+
+# Staging holds the video and audio streams and the merged file at once
+STAGING_FACTOR = 2
+
+
+class InsufficientSpaceError(Exception):
+    """A download was rejected because it doesn't fit on disk or in the quota"""
+
+
+def parse_size_line(line: str) -> Optional[int]:
+    """
+    Parse the line printed with SIZE_PRINT_TEMPLATE into an estimated size
+
+    The exact size is used if the site reports one, then the approximate
+    size, then total bitrate times duration.
+
+    Args:
+        line: A line of yt-dlp output
+
+    Returns:
+        Estimated size in bytes, 0 if unknown, or None if it isn't a size line
+    """
+    if not line.startswith(SIZE_MARKER):
+        return None
+    try:
+        info = json.loads(line[len(SIZE_MARKER):])
+    except json.JSONDecodeError:
+        return 0
+    size = info.get("filesize") or info.get("filesize_approx")
+    if not size and info.get("tbr") and info.get("duration"):
+        size = info["tbr"] * 1000 / 8 * info["duration"]  # tbr is in kbit/s
+    return int(size or 0)
+
+
+class DiskQuota:
+    """
+    Admits downloads that fit and evicts old ones to make room
+
+    A download fits when the download directory stays within `quota_bytes`
+    (0 for no quota) and every volume involved keeps `min_free_bytes` free.
+    Admitted sizes are reserved until the download is released, so
+    concurrent downloads can't all claim the same free space. When a
+    download doesn't fit, the least recently requested videos in the index
+    are deleted until it does; if even that isn't enough it is rejected.
+    """
+
+    def __init__(
+        self,
+        download_dir: str,
+        index: DownloadIndex,
+        quota_bytes: int = 0,
+        min_free_bytes: int = 0,
+        scratch_dir: Optional[str] = None,
+    ):
+        """
+        Initialize the quota
+
+        Args:
+            download_dir: Directory finished downloads are kept in
+            index: Download index; its entries are the eviction candidates
+            quota_bytes: Maximum total size of the indexed downloads (0 for none)
+            min_free_bytes: Free space every volume must keep
+            scratch_dir: Directory downloads are staged in, if not download_dir
+        """
+        self.download_dir = download_dir
+        self.index = index
+        self.quota_bytes = quota_bytes
+        self.min_free_bytes = min_free_bytes
+        self.scratch_dir = scratch_dir or download_dir
+
+        self._lock = threading.Lock()
+        # key (video ID or URL) -> admitted size in bytes
+        self._reserved: dict[str, int] = {}
+        self.admitted = 0
+        self.rejected = 0
+        self.evicted = 0
+        self.evicted_bytes = 0
+
+    def admit(self, key: str, size: Optional[int] = None) -> None:
+        """
+        Reserve space for a download, evicting old downloads if needed
+
+        Called with no size before yt-dlp starts (only the free-space floor
+        is checked) and again with the estimate once the format is known.
+
+        Args:
+            key: Video ID (or URL) of the download; never evicted meanwhile
+            size: Estimated size in bytes
+
+        Raises:
+            InsufficientSpaceError: The download doesn't fit even after eviction
+        """
+        size = size or 0
+        with self._lock:
+            self._reserved.pop(key, None)
+            try:
+                self._make_room(key, size)
+            except InsufficientSpaceError:
+                self.rejected += 1
+                raise
+            self._reserved[key] = size
+            if size:
+                self.admitted += 1
+
+    def release(self, key: str) -> None:
+        """Drop a download's reservation once it finished (or failed)"""
+        with self._lock:
+            self._reserved.pop(key, None)
+
+    def _make_room(self, key: str, size: int) -> None:
+        """Evict until `size` more bytes fit, or raise (lock held)"""
+        reserved = sum(self._reserved.values())
+
+        if self.quota_bytes:
+            if size > self.quota_bytes:
+                raise InsufficientSpaceError(
+                    f"the video (~{format_bytes(size)}) is larger than the whole "
+                    f"download quota ({format_bytes(self.quota_bytes)})"
+                )
+            over = self.index.total_size() + reserved + size - self.quota_bytes
+            if over > 0 and self._evict(over, key) < over:
+                raise InsufficientSpaceError(
+                    f"the download quota ({format_bytes(self.quota_bytes)}) is full "
+                    f"and ~{format_bytes(size)} more is needed"
+                )
+
+        # Volume -> bytes the download still needs on it
+        needs: dict[int, tuple[str, int]] = {}
+        for directory, factor in ((self.scratch_dir, STAGING_FACTOR), (self.download_dir, 1)):
+            device = os.stat(directory).st_dev
+            needed = (size + reserved) * factor
+            if device not in needs or needs[device][1] < needed:
+                needs[device] = (directory, needed)
+
+        download_device = os.stat(self.download_dir).st_dev
+        for device, (directory, needed) in needs.items():
+            short = needed + self.min_free_bytes - shutil.disk_usage(directory).free
+            # Only evicting from the download directory frees space on its volume
+            if short > 0 and (device != download_device or self._evict(short, key) < short):
+                raise InsufficientSpaceError(
+                    f"not enough free disk space in {directory} "
+                    f"(~{format_bytes(size)} needed, {format_bytes(self.min_free_bytes)} kept free)"
+                )
+
+    def _evict(self, needed: int, keep: str) -> int:
+        """
+        Delete least recently requested downloads until `needed` bytes are freed (lock held)
+
+        Returns:
+            Number of bytes freed
+        """
+        freed = 0
+        for entry in self.index.least_recently_requested():
+            if freed >= needed:
+                break
+            if entry.video_id == keep or entry.video_id in self._reserved:
+                continue
+            path = Path(entry.file_path)
+            if path.parent != Path(self.download_dir):
+                continue
+            try:
+                path.unlink(missing_ok=True)
+            except OSError as e:
+                logger.warning(f"Failed to evict {path}: {e}")
+                continue
+            self.index.remove(entry.video_id)
+            freed += entry.file_size
+            self.evicted += 1
+            self.evicted_bytes += entry.file_size
+            logger.info(f"Evicted {path.name} ({format_bytes(entry.file_size)}) to make room")
+        return freed
+
+    def stats(self) -> dict[str, Any]:
+        """Get admission and eviction counters and current usage"""
+        with self._lock:
+            return {
+                "used_bytes": self.index.total_size(),
+                "quota_bytes": self.quota_bytes,
+                "reserved_bytes": sum(self._reserved.values()),
+                "admitted": self.admitted,
+                "rejected": self.rejected,
+                "evicted": self.evicted,
+                "evicted_bytes": self.evicted_bytes,
+            }
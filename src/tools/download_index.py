@@ -0,0 +1,259 @@
+"""Persistent index of downloaded videos keyed by canonical YouTube video ID"""
+
+import logging
+import re
+import sqlite3
+import threading
+import time
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Optional
+
+logger = logging.getLogger(__name__)
+
+# Canonical YouTube video IDs are 11 characters from this alphabet
+VIDEO_ID_PATTERN = re.compile(
+    r"(?:youtube\.com/(?:watch\?(?:[^#\s]*&)?v=|shorts/|embed/|live/)|youtu\.be/)"
+    r"([\w-]{11})(?![\w-])",
+    re.IGNORECASE,
+)
+
+# Downloaded files are named "<title> [<video id>].<ext>"
+FILENAME_ID_PATTERN = re.compile(r"\[([\w-]{11})\]\.\w+$")
+
+# Extensions considered finished downloads when rebuilding the index
+VIDEO_EXTENSIONS = {".mp4", ".mkv", ".webm", ".m4a", ".mov"}
+
+
+def extract_video_id(url: str) -> Optional[str]:
+    """
+    Get the canonical video ID from any YouTube URL form
+
+    `youtu.be/X`, `youtube.com/watch?v=X&t=30` and `youtube.com/shorts/X`
+    all return `X`.
+
+    Args:
+        url: YouTube URL
+
+    Returns:
+        11-character video ID or None if the URL has none
+    """
+    match = VIDEO_ID_PATTERN.search(url)
+    return match.group(1) if match else None
+
+
+@dataclass
+class IndexEntry:
+    """A downloaded video recorded in the index"""
+
+    video_id: str
+    file_path: str
+    file_size: int
+    format: Optional[str]
+    title: Optional[str]
+    downloaded_at: float
+    last_requested_at: Optional[float] = None
+
+
+class DownloadIndex:
+    """
+    SQLite-backed map from video ID to the downloaded file
+
+    Lookups are local and take well under a millisecond, so already-downloaded
+    videos are answered before any network call. One connection is shared by
+    all threads behind a lock.
+    """
+
+    def __init__(self, db_path: str):
+        """
+        Initialize the index
+
+        Args:
+            db_path: Path of the SQLite database file
+        """
+        self.db_path = db_path
+        Path(db_path).parent.mkdir(parents=True, exist_ok=True)
+
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(db_path, check_same_thread=False)
+        self._conn.row_factory = sqlite3.Row
+        with self._lock, self._conn:
+            self._conn.execute("PRAGMA journal_mode=WAL")
+            self._conn.execute(
+                """
+                CREATE TABLE IF NOT EXISTS downloads (
+                    video_id TEXT PRIMARY KEY,
+                    file_path TEXT NOT NULL,
+                    file_size INTEGER NOT NULL,
+                    format TEXT,
+                    title TEXT,
+                    downloaded_at REAL NOT NULL,
+                    last_requested_at REAL
+                )
+                """
+            )
+            columns = {row["name"] for row in self._conn.execute("PRAGMA table_info(downloads)")}
+            if "last_requested_at" not in columns:
+                self._conn.execute("ALTER TABLE downloads ADD COLUMN last_requested_at REAL")
+
+    def get(self, video_id: str, verify: bool = True) -> Optional[IndexEntry]:
+        """
+        Look up a downloaded video
+
+        Args:
+            video_id: Canonical video ID
+            verify: Check that the file still exists and drop the entry if not
+
+        Returns:
+            IndexEntry or None if the video isn't downloaded
+        """
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT * FROM downloads WHERE video_id = ?",
+                (video_id,),
+            ).fetchone()
+        if row is None:
+            return None
+
+        entry = IndexEntry(**dict(row))
+        if verify and not Path(entry.file_path).is_file():
+            logger.info(f"Indexed file for {video_id} is gone, removing entry")
+            self.remove(video_id)
+            return None
+        return entry
+
+    def add(
+        self,
+        video_id: str,
+        file_path: str,
+        file_size: int,
+        format: Optional[str] = None,
+        title: Optional[str] = None,
+        downloaded_at: Optional[float] = None,
+    ) -> None:
+        """
+        Record (or replace) a downloaded video
+
+        Args:
+            video_id: Canonical video ID
+            file_path: Absolute path of the downloaded file
+            file_size: File size in bytes
+            format: yt-dlp format ID or container extension
+            title: Video title
+            downloaded_at: Unix timestamp, defaults to now
+        """
+        now = time.time()
+        with self._lock, self._conn:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO downloads "
+                "(video_id, file_path, file_size, format, title, downloaded_at, last_requested_at) "
+                "VALUES (?, ?, ?, ?, ?, ?, ?)",
+                (video_id, file_path, file_size, format, title, downloaded_at or now, now),
+            )
+
+    def touch(self, video_id: str) -> None:
+        """Record that a downloaded video was requested again (for eviction order)"""
+        with self._lock, self._conn:
+            self._conn.execute(
+                "UPDATE downloads SET last_requested_at = ? WHERE video_id = ?",
+                (time.time(), video_id),
+            )
+
+    def total_size(self) -> int:
+        """Total size in bytes of the indexed files"""
+        with self._lock:
+            return self._conn.execute(
+                "SELECT COALESCE(SUM(file_size), 0) FROM downloads"
+            ).fetchone()[0]
+
+    def least_recently_requested(self) -> list[IndexEntry]:
+        """
+        Get all entries, least recently requested first
+
+        Files that were never requested since the index was rebuilt count
+        from their modification time.
+        """
+        with self._lock:
+            rows = self._conn.execute(
+                "SELECT * FROM downloads "
+                "ORDER BY COALESCE(last_requested_at, downloaded_at), video_id"
+            ).fetchall()
+        return [IndexEntry(**dict(row)) for row in rows]
+
+    def remove(self, video_id: str) -> None:
+        """Remove a video from the index (the file is left alone)"""
+        with self._lock, self._conn:
+            self._conn.execute("DELETE FROM downloads WHERE video_id = ?", (video_id,))
+
+    def __len__(self) -> int:
+        """Number of indexed videos"""
+        with self._lock:
+            return self._conn.execute("SELECT COUNT(*) FROM downloads").fetchone()[0]
+
+    def rebuild(self, download_dir: str) -> int:
+        """
+        Reconcile the index with the download directory in one scan
+
+        Entries whose file is gone are dropped, and files named with a
+        `[<video id>]` suffix that aren't indexed yet are added.
+
+        Args:
+            download_dir: Directory containing downloaded videos
+
+        Returns:
+            Number of entries in the index afterwards
+        """
+        start = time.monotonic()
+        found: dict[str, tuple[str, int, str, float]] = {}
+        try:
+            for entry in Path(download_dir).iterdir():
+                if entry.suffix.lower() not in VIDEO_EXTENSIONS:
+                    continue
+                match = FILENAME_ID_PATTERN.search(entry.name)
+                if not match:
+                    continue
+                stat = entry.stat()
+                found[match.group(1)] = (
+                    str(entry),
+                    stat.st_size,
+                    entry.suffix.lstrip("."),
+                    stat.st_mtime,
+                )
+        except OSError as e:
+            logger.error(f"Failed to scan download directory: {e}")
+            return len(self)
+
+        with self._lock, self._conn:
+            rows = self._conn.execute("SELECT video_id, file_path FROM downloads").fetchall()
+            stale = [
+                row["video_id"]
+                for row in rows
+                if row["video_id"] not in found and not Path(row["file_path"]).is_file()
+            ]
+            self._conn.executemany(
+                "DELETE FROM downloads WHERE video_id = ?", [(v,) for v in stale]
+            )
+            indexed = {row["video_id"] for row in rows}
+            new_entries = [
+                (video_id, path, size, fmt, None, mtime)
+                for video_id, (path, size, fmt, mtime) in found.items()
+                if video_id not in indexed
+            ]
+            self._conn.executemany(
+                "INSERT INTO downloads "
+                "(video_id, file_path, file_size, format, title, downloaded_at) "
+                "VALUES (?, ?, ?, ?, ?, ?)",
+                new_entries,
+            )
+
+        total = len(self)
+        logger.info(
+            f"Download index rebuilt in {time.monotonic() - start:.2f}s: {total} entries "
+            f"({len(new_entries)} added, {len(stale)} stale removed)"
+        )
+        return total
+
+    def close(self) -> None:
+        """Close the database connection"""
+        with self._lock:
+            self._conn.close()
@@ -0,0 +1,373 @@
+"""Process-wide download scheduler with concurrency limits and priority lanes"""
+
+import itertools
+import logging
+import re
+import threading
+import time
+from collections import deque
+from concurrent.futures import Future, ThreadPoolExecutor
+from concurrent.futures import wait as wait_futures
+from dataclasses import dataclass, field
+from typing import Any, Callable, Optional
+
+logger = logging.getLogger(__name__)
+
+# Priority lanes, highest priority first
+LANE_SHORT = "short"
+LANE_NORMAL = "normal"
+LANE_LONG = "long"
+LANES = (LANE_SHORT, LANE_NORMAL, LANE_LONG)
+
+SHORTS_URL_PATTERN = re.compile(r"youtube\.com/shorts/", re.IGNORECASE)
+
+
+def classify_lane(
+    url: str,
+    duration: Optional[float] = None,
+    short_max_duration: float = 600,
+    long_min_duration: float = 3600,
+) -> str:
+    """
+    Pick a priority lane for a download
+
+    Args:
+        url: YouTube URL
+        duration: Video duration in seconds, if already known
+        short_max_duration: Videos up to this length go to the short lane
+        long_min_duration: Videos at least this long go to the long lane
+
+    Returns:
+        Lane name
+    """
+    if SHORTS_URL_PATTERN.search(url):
+        return LANE_SHORT
+    if duration is None:
+        return LANE_NORMAL
+    if duration <= short_max_duration:
+        return LANE_SHORT
+    if duration >= long_min_duration:
+        return LANE_LONG
+    return LANE_NORMAL
+
+
+@dataclass
+class DownloadJob:
+    """A download waiting for (or holding) a scheduler slot"""
+
+    seq: int
+    fn: Callable[[], Any]
+    user_id: str
+    lane: str
+    label: str
+    future: Future
+    submitted_at: float = field(default_factory=time.monotonic)
+    started_at: Optional[float] = None
+
+
+class DownloadScheduler:
+    """
+    Schedules download jobs across a fixed number of slots
+
+    Jobs wait in one FIFO per lane. When a slot is free the scheduler takes
+    the oldest job from the highest-priority lane whose user is below the
+    per-user cap. A job that has waited longer than `max_wait_before_boost`
+    is taken first regardless of lane, so the long lane can't starve.
+    """
+
+    # Seconds of history used for throughput numbers
+    THROUGHPUT_WINDOW = 300
+
+    def __init__(
+        self,
+        max_concurrent: int = 2,
+        per_user_limit: int = 2,
+        max_wait_before_boost: float = 900,
+    ):
+        """
+        Initialize the scheduler
+
+        Args:
+            max_concurrent: Maximum downloads running at once (process-wide)
+            per_user_limit: Maximum downloads running at once for one user
+            max_wait_before_boost: Seconds after which a queued job skips the lane order
+        """
+        self.max_concurrent = max(1, max_concurrent)
+        self.per_user_limit = max(1, per_user_limit)
+        self.max_wait_before_boost = max_wait_before_boost
+
+        self._executor = ThreadPoolExecutor(
+            max_workers=self.max_concurrent, thread_name_prefix="download"
+        )
+        self._lock = threading.Lock()
+        self._lanes: dict[str, deque[DownloadJob]] = {lane: deque() for lane in LANES}
+        self._running: dict[int, DownloadJob] = {}
+        self._running_per_user: dict[str, int] = {}
+        self._closed = False
+        self._seq = itertools.count()
+        self._completed: deque[tuple[float, float, int]] = deque()
+        self._total_completed = 0
+        self._total_failed = 0
+        self._total_bytes = 0
+
+    def submit(
+        self,
+        fn: Callable[[], Any],
+        user_id: str,
+        lane: str = LANE_NORMAL,
+        label: str = "",
+    ) -> Future:
+        """
+        Queue a download job
+
+        Args:
+            fn: Function that performs the download; a dict result with a
+                `file_size` key (bytes) is counted towards throughput
+            user_id: User who requested the download
+            lane: Priority lane (see LANES)
+            label: Description for logging (usually the URL)
+
+        Returns:
+            Future resolved with the return value of `fn`, or already
+            cancelled if the scheduler is shut down
+        """
+        if lane not in self._lanes:
+            raise ValueError(f"Unknown lane: {lane}")
+
+        job = DownloadJob(
+            seq=next(self._seq),
+            fn=fn,
+            user_id=user_id,
+            lane=lane,
+            label=label,
+            future=Future(),
+        )
+        with self._lock:
+            if self._closed:
+                logger.info(f"Scheduler is shut down, not queueing download: {label}")
+                job.future.cancel()
+                return job.future
+            self._lanes[lane].append(job)
+            logger.info(
+                f"Queued download [{lane}] for {user_id}: {label} "
+                f"(running: {len(self._running)}, queued: {self._queued_count()})"
+            )
+        self._dispatch()
+        return job.future
+
+    def would_start(self, user_id: str) -> bool:
+        """
+        Check whether a job submitted now would start without queueing
+
+        Lanes only order waiting jobs, so a job that starts right away needs none.
+
+        Args:
+            user_id: User who would submit the job
+        """
+        with self._lock:
+            return (
+                len(self._running) < self.max_concurrent
+                and not self._queued_count()
+                and self._running_per_user.get(user_id, 0) < self.per_user_limit
+            )
+
+    def _queued_count(self) -> int:
+        """Number of jobs waiting in all lanes (caller holds the lock)"""
+        return sum(len(q) for q in self._lanes.values())
+
+    def _next_job(self, now: float) -> Optional[DownloadJob]:
+        """Pick the next runnable job (caller holds the lock)"""
+        eligible = [
+            job
+            for lane in LANES
+            for job in self._lanes[lane]
+            if self._running_per_user.get(job.user_id, 0) < self.per_user_limit
+        ]
+        if not eligible:
+            return None
+
+        # Starvation guard: the oldest job that waited too long goes first
+        oldest = min(eligible, key=lambda j: j.seq)
+        if now - oldest.submitted_at >= self.max_wait_before_boost:
+            return oldest
+
+        # Otherwise lane order, FIFO within a lane (eligible is already in that order)
+        return eligible[0]
+
+    def _dispatch(self) -> None:
+        """Start queued jobs while there are free slots"""
+        to_start = []
+        with self._lock:
+            now = time.monotonic()
+            while not self._closed and len(self._running) < self.max_concurrent:
+                job = self._next_job(now)
+                if job is None:
+                    break
+                self._lanes[job.lane].remove(job)
+                if not job.future.set_running_or_notify_cancel():
+                    continue
+                job.started_at = now
+                self._running[job.seq] = job
+                self._running_per_user[job.user_id] = (
+                    self._running_per_user.get(job.user_id, 0) + 1
+                )
+                to_start.append(job)
+
+        for job in to_start:
+            logger.debug(
+                f"Starting download [{job.lane}] after "
+                f"{job.started_at - job.submitted_at:.1f}s in queue: {job.label}"
+            )
+            try:
+                self._executor.submit(self._run_job, job)
+            except RuntimeError as e:
+                # Shut down between picking the job and starting it
+                with self._lock:
+                    self._free_slot(job)
+                job.future.set_exception(e)
+
+    def _run_job(self, job: DownloadJob) -> None:
+        """Execute a job on an executor thread and free its slot afterwards"""
+        result = None
+        error: Optional[BaseException] = None
+        try:
+            result = job.fn()
+        except BaseException as e:
+            error = e
+
+        finished_at = time.monotonic()
+        size = 0
+        if isinstance(result, dict):
+            size = int(result.get("file_size") or 0)
+
+        with self._lock:
+            self._free_slot(job)
+
+            failed = error is not None or (
+                isinstance(result, dict) and result.get("success") is False
+            )
+            if failed:
+                self._total_failed += 1
+            else:
+                self._total_completed += 1
+            self._total_bytes += size
+            self._completed.append((finished_at, finished_at - job.started_at, size))
+            self._trim_history(finished_at)
+
+        if error is not None:
+            job.future.set_exception(error)
+        else:
+            job.future.set_result(result)
+
+        self._dispatch()
+
+    def _free_slot(self, job: DownloadJob) -> None:
+        """Remove a job from the running set (caller holds the lock)"""
+        self._running.pop(job.seq, None)
+        remaining = self._running_per_user.get(job.user_id, 1) - 1
+        if remaining > 0:
+            self._running_per_user[job.user_id] = remaining
+        else:
+            self._running_per_user.pop(job.user_id, None)
+
+    def _trim_history(self, now: float) -> None:
+        """Drop completion records older than the throughput window"""
+        while self._completed and now - self._completed[0][0] > self.THROUGHPUT_WINDOW:
+            self._completed.popleft()
+
+    def stats(self) -> dict[str, Any]:
+        """
+        Get scheduler statistics
+
+        Returns:
+            Running/queued counts per lane and throughput over the recent window
+        """
+        with self._lock:
+            now = time.monotonic()
+            self._trim_history(now)
+            recent = list(self._completed)
+            stats: dict[str, Any] = {
+                "max_concurrent": self.max_concurrent,
+                "per_user_limit": self.per_user_limit,
+                "running": len(self._running),
+                "queued": self._queued_count(),
+                "queued_by_lane": {lane: len(q) for lane, q in self._lanes.items()},
+                "completed": self._total_completed,
+                "failed": self._total_failed,
+                "total_mb": self._total_bytes / (1024 * 1024),
+            }
+
+        if recent:
+            # Measure over the span actually covered by recent jobs
+            span = min(
+                self.THROUGHPUT_WINDOW,
+                max(1.0, now - min(finished - duration for finished, duration, _ in recent)),
+            )
+            recent_bytes = sum(size for _, _, size in recent)
+            stats["throughput_mb_per_sec"] = recent_bytes / (1024 * 1024) / span
+            stats["throughput_jobs_per_min"] = len(recent) / span * 60
+        else:
+            stats["throughput_mb_per_sec"] = 0.0
+            stats["throughput_jobs_per_min"] = 0.0
+        return stats
+
+    def drain(self, timeout: float) -> int:
+        """
+        Wait for the running downloads to finish
+
+        Args:
+            timeout: Maximum seconds to wait
+
+        Returns:
+            Number of downloads still running afterwards
+        """
+        with self._lock:
+            futures = [job.future for job in self._running.values()]
+        _, not_done = wait_futures(futures, timeout=timeout)
+        return len(not_done)
+
+    def shutdown(self, wait: bool = True) -> None:
+        """
+        Stop accepting work and cancel queued jobs
+
+        Jobs submitted afterwards get an already-cancelled future.
+
+        Args:
+            wait: Whether to wait for running downloads to finish (see also drain)
+        """
+        with self._lock:
+            self._closed = True
+            queued = [job for lane in LANES for job in self._lanes[lane]]
+            for lane in LANES:
+                self._lanes[lane].clear()
+        for job in queued:
+            job.future.cancel()
+        self._executor.shutdown(wait=wait)
+
+
+# Global scheduler instance
+_scheduler: Optional[DownloadScheduler] = None
+_scheduler_lock = threading.Lock()
+
+
+def get_download_scheduler(settings=None) -> DownloadScheduler:
+    """
+    Get or create the process-wide download scheduler
+
+    Args:
+        settings: Application settings used on first creation
+
+    Returns:
+        DownloadScheduler instance
+    """
+    global _scheduler
+    with _scheduler_lock:
+        if _scheduler is None:
+            if settings is not None:
+                _scheduler = DownloadScheduler(
+                    max_concurrent=settings.download_max_concurrent,
+                    per_user_limit=settings.download_per_user_limit,
+                )
+            else:
+                _scheduler = DownloadScheduler()
+        return _scheduler
@@ -0,0 +1,114 @@
+"""Moving finished downloads from the scratch directory into the download directory"""
+
+import errno
+import logging
+import os
+import shutil
+import threading
+import time
+from pathlib import Path
+from typing import Any
+
+logger = logging.getLogger(__name__)
+
+# Buffer size of the streamed copy between volumes
+COPY_BUFFER_SIZE = 4 * 1024 * 1024
+
+
+class FilePublisher:
+    """
+    Moves finished files into a (synced) directory in one visible step
+
+    On the same volume the file is renamed, which is atomic. Across volumes
+    it is streamed into a hidden temporary file next to the target, flushed
+    to disk and then renamed, so the synced folder never sees a half-written
+    file under the final name. The time each publish takes, from the end of
+    the download until the file is visible, is recorded.
+    """
+
+    def __init__(self, target_dir: str):
+        """
+        Initialize the publisher
+
+        Args:
+            target_dir: Directory finished files are moved into
+        """
+        self.target_dir = Path(target_dir)
+        self._lock = threading.Lock()
+        self.renamed = 0
+        self.copied = 0
+        self.failed = 0
+        self.total_seconds = 0.0
+        self.max_seconds = 0.0
+
+    def publish(self, source: Path) -> Path:
+        """
+        Move a file into the target directory, replacing a file of the same name
+
+        Args:
+            source: Finished file in the scratch directory
+
+        Returns:
+            Path of the published file
+
+        Raises:
+            OSError: If the file could not be moved; the source is kept
+        """
+        start = time.monotonic()
+        target = self.target_dir / source.name
+        try:
+            try:
+                os.replace(source, target)
+                copied = False
+            except OSError as e:
+                if e.errno != errno.EXDEV:
+                    raise
+                self._copy(source, target)
+                copied = True
+        except OSError:
+            with self._lock:
+                self.failed += 1
+            raise
+
+        elapsed = time.monotonic() - start
+        with self._lock:
+            if copied:
+                self.copied += 1
+            else:
+                self.renamed += 1
+            self.total_seconds += elapsed
+            self.max_seconds = max(self.max_seconds, elapsed)
+        logger.info(
+            f"Published {target.name} by {'copy' if copied else 'rename'}: "
+            f"visible after {elapsed * 1000:.0f} ms"
+        )
+        return target
+
+    def _copy(self, source: Path, target: Path) -> None:
+        """Stream a file to another volume, then swap it in under its final name"""
+        tmp_path = target.with_name(f".{target.name}.partial")
+        try:
+            with open(source, "rb") as src, open(tmp_path, "wb") as dst:
+                shutil.copyfileobj(src, dst, COPY_BUFFER_SIZE)
+                dst.flush()
+                os.fsync(dst.fileno())
+            shutil.copystat(source, tmp_path)
+            os.replace(tmp_path, target)
+        except OSError:
+            tmp_path.unlink(missing_ok=True)
+            raise
+        source.unlink()
+
+    def stats(self) -> dict[str, Any]:
+        """Get publish counts and complete-to-visible times"""
+        with self._lock:
+            published = self.renamed + self.copied
+            return {
+                "renamed": self.renamed,
+                "copied": self.copied,
+                "failed": self.failed,
+                "avg_visible_ms": round(self.total_seconds / published * 1000, 1)
+                if published
+                else None,
+                "max_visible_ms": round(self.max_seconds * 1000, 1),
+            }
@@ -0,0 +1,185 @@
+"""Persistent journal of download jobs, used to resume work after a restart"""
+
+import logging
+import sqlite3
+import threading
+import time
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Optional
+
+logger = logging.getLogger(__name__)
+
+# Job states; a job moves queued -> running -> done | failed, and a job that
+# was running or queued when the agent stopped is resumed on the next start
+JOB_QUEUED = "queued"
+JOB_RUNNING = "running"
+JOB_INTERRUPTED = "interrupted"
+JOB_DONE = "done"
+JOB_FAILED = "failed"
+UNFINISHED_STATES = (JOB_QUEUED, JOB_RUNNING, JOB_INTERRUPTED)
+
+
+@dataclass
+class JournalEntry:
+    """A download job recorded in the journal"""
+
+    job_id: int
+    url: str
+    channel_id: str
+    thread_ts: str
+    user_id: str
+    state: str
+    attempts: int
+    created_at: float
+    updated_at: float
+    error: Optional[str] = None
+
+
+class JobJournal:
+    """
+    SQLite-backed record of download jobs and their state transitions
+
+    Every transition is committed before the work it describes continues, so
+    after a crash the `running` and `queued` jobs are exactly the ones that
+    did not finish. Transitions are also appended to a history table.
+    """
+
+    def __init__(self, db_path: str):
+        """
+        Initialize the journal
+
+        Args:
+            db_path: Path of the SQLite database file
+        """
+        self.db_path = db_path
+        Path(db_path).parent.mkdir(parents=True, exist_ok=True)
+
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(db_path, check_same_thread=False)
+        self._conn.row_factory = sqlite3.Row
+        with self._lock, self._conn:
+            self._conn.execute("PRAGMA journal_mode=WAL")
+            self._conn.execute(
+                """
+                CREATE TABLE IF NOT EXISTS jobs (
+                    job_id INTEGER PRIMARY KEY AUTOINCREMENT,
+                    url TEXT NOT NULL,
+                    channel_id TEXT NOT NULL,
+                    thread_ts TEXT NOT NULL,
+                    user_id TEXT NOT NULL,
+                    state TEXT NOT NULL,
+                    attempts INTEGER NOT NULL DEFAULT 0,
+                    created_at REAL NOT NULL,
+                    updated_at REAL NOT NULL,
+                    error TEXT
+                )
+                """
+            )
+            self._conn.execute(
+                """
+                CREATE TABLE IF NOT EXISTS job_events (
+                    job_id INTEGER NOT NULL,
+                    state TEXT NOT NULL,
+                    at REAL NOT NULL
+                )
+                """
+            )
+
+    def add(self, url: str, channel_id: str, thread_ts: str, user_id: str) -> int:
+        """
+        Record a new queued job
+
+        Args:
+            url: YouTube URL
+            channel_id: Slack channel of the request
+            thread_ts: Thread to reply in
+            user_id: User who requested the download
+
+        Returns:
+            ID of the job
+        """
+        now = time.time()
+        with self._lock, self._conn:
+            cursor = self._conn.execute(
+                "INSERT INTO jobs (url, channel_id, thread_ts, user_id, state, created_at, "
+                "updated_at) VALUES (?, ?, ?, ?, ?, ?, ?)",
+                (url, channel_id, thread_ts, user_id, JOB_QUEUED, now, now),
+            )
+            job_id = cursor.lastrowid
+            self._conn.execute(
+                "INSERT INTO job_events (job_id, state, at) VALUES (?, ?, ?)",
+                (job_id, JOB_QUEUED, now),
+            )
+        return job_id
+
+    def update(self, job_id: int, state: str, error: Optional[str] = None) -> None:
+        """
+        Move a job to a new state
+
+        Args:
+            job_id: ID of the job
+            state: New state
+            error: Error message for failed or interrupted jobs
+        """
+        now = time.time()
+        with self._lock, self._conn:
+            self._conn.execute(
+                "UPDATE jobs SET state = ?, error = ?, updated_at = ?, "
+                "attempts = attempts + ? WHERE job_id = ?",
+                (state, error, now, 1 if state == JOB_RUNNING else 0, job_id),
+            )
+            self._conn.execute(
+                "INSERT INTO job_events (job_id, state, at) VALUES (?, ?, ?)",
+                (job_id, state, now),
+            )
+
+    def get(self, job_id: int) -> Optional[JournalEntry]:
+        """Look up a job"""
+        with self._lock:
+            row = self._conn.execute("SELECT * FROM jobs WHERE job_id = ?", (job_id,)).fetchone()
+        return JournalEntry(**dict(row)) if row is not None else None
+
+    def unfinished(self) -> list[JournalEntry]:
+        """
+        Get the jobs that did not finish, oldest first
+
+        Returns:
+            Queued, running and interrupted jobs
+        """
+        placeholders = ", ".join("?" for _ in UNFINISHED_STATES)
+        with self._lock:
+            rows = self._conn.execute(
+                f"SELECT * FROM jobs WHERE state IN ({placeholders}) ORDER BY job_id",
+                UNFINISHED_STATES,
+            ).fetchall()
+        return [JournalEntry(**dict(row)) for row in rows]
+
+    def history(self, job_id: int) -> list[str]:
+        """Get the states a job went through, in order"""
+        with self._lock:
+            rows = self._conn.execute(
+                "SELECT state FROM job_events WHERE job_id = ? ORDER BY rowid", (job_id,)
+            ).fetchall()
+        return [row["state"] for row in rows]
+
+    def prune(self, max_age: float) -> int:
+        """
+        Delete finished jobs last updated more than `max_age` seconds ago
+
+        Returns:
+            Number of jobs deleted
+        """
+        cutoff = time.time() - max_age
+        with self._lock, self._conn:
+            old = "SELECT job_id FROM jobs WHERE state IN (?, ?) AND updated_at < ?"
+            args = (JOB_DONE, JOB_FAILED, cutoff)
+            self._conn.execute(f"DELETE FROM job_events WHERE job_id IN ({old})", args)
+            return self._conn.execute(
+                "DELETE FROM jobs WHERE state IN (?, ?) AND updated_at < ?", args
+            ).rowcount
+
+    def close(self) -> None:
+        """Close the database connection"""
+        with self._lock:
+            self._conn.close()
@@ -0,0 +1,87 @@
+"""Structured download progress parsed from yt-dlp output"""
+
+import json
+from dataclasses import dataclass
+from typing import Optional
+
+# Prefix of the progress lines yt-dlp prints with PROGRESS_TEMPLATE
+PROGRESS_MARKER = "__progress__ "
+
+# One JSON object per progress update; needs --progress and --newline
+PROGRESS_TEMPLATE = (
+    "download:" + PROGRESS_MARKER
+    + "%(progress.{status,downloaded_bytes,total_bytes,total_bytes_estimate,speed,eta})j"
+)
+
+
+@dataclass
+class ProgressEvent:
+    """One progress update of a running download"""
+
+    status: str
+    downloaded_bytes: Optional[int] = None
+    total_bytes: Optional[int] = None
+    speed: Optional[float] = None  # bytes per second
+    eta: Optional[float] = None  # seconds
+
+    @property
+    def percent(self) -> Optional[float]:
+        """Share of the current file downloaded, 0-100"""
+        if self.status == "finished":
+            return 100.0
+        if not self.total_bytes or self.downloaded_bytes is None:
+            return None
+        return min(100.0, self.downloaded_bytes / self.total_bytes * 100)
+
+    def describe(self) -> str:
+        """Human-readable one-line summary, e.g. `42.0% of 120.5 MiB at 3.2 MiB/s, ETA 0:35`"""
+        parts = []
+        percent = self.percent
+        parts.append(f"{percent:.1f}%" if percent is not None else "?%")
+        if self.total_bytes:
+            parts.append(f"of {format_bytes(self.total_bytes)}")
+        if self.speed:
+            parts.append(f"at {format_bytes(self.speed)}/s")
+        text = " ".join(parts)
+        if self.eta is not None and self.status == "downloading":
+            minutes, seconds = divmod(int(self.eta), 60)
+            text += f", ETA {minutes}:{seconds:02d}"
+        return text
+
+
+def parse_progress_line(line: str) -> Optional[ProgressEvent]:
+    """
+    Parse one line printed with PROGRESS_TEMPLATE
+
+    Args:
+        line: A line of yt-dlp output
+
+    Returns:
+        ProgressEvent, or None if the line is not a progress line
+    """
+    if not line.startswith(PROGRESS_MARKER):
+        return None
+    try:
+        data = json.loads(line[len(PROGRESS_MARKER):])
+    except json.JSONDecodeError:
+        return None
+    if not isinstance(data, dict):
+        return None
+    return ProgressEvent(
+        status=data.get("status") or "downloading",
+        downloaded_bytes=data.get("downloaded_bytes"),
+        total_bytes=data.get("total_bytes") or data.get("total_bytes_estimate"),
+        speed=data.get("speed"),
+        eta=data.get("eta"),
+    )
+
+
+def format_bytes(size: float) -> str:
+    """Format a byte count with binary units"""
+    if size < 1024:
+        return f"{int(size)} B"
+    for unit in ("KiB", "MiB"):
+        size /= 1024
+        if size < 1024:
+            return f"{size:.1f} {unit}"
+    return f"{size / 1024:.1f} GiB"
@@ -0,0 +1,63 @@
+"""Single-flight coalescing of concurrent work for the same key"""
+
+import logging
+import threading
+from concurrent.futures import Future
+from typing import Callable, Hashable
+
+logger = logging.getLogger(__name__)
+
+
+class SingleFlight:
+    """
+    Runs at most one job per key at a time
+
+    The first caller for a key starts the job; callers that arrive while it
+    is still queued or running get the same Future instead of starting a
+    second one. The key is released as soon as the job finishes, so a later
+    request starts fresh.
+    """
+
+    def __init__(self):
+        """Initialize the in-flight table"""
+        self._lock = threading.Lock()
+        self._in_flight: dict[Hashable, Future] = {}
+        self.started = 0
+        self.coalesced = 0
+
+    def do(self, key: Hashable, start: Callable[[], Future]) -> tuple[Future, bool]:
+        """
+        Get the in-flight Future for a key, starting the job if there is none
+
+        Args:
+            key: Deduplication key (e.g. canonical video ID)
+            start: Function that starts the job and returns its Future; only
+                called by the first caller
+
+        Returns:
+            Tuple of (shared Future, whether this call attached to an existing job)
+        """
+        with self._lock:
+            future = self._in_flight.get(key)
+            if future is not None:
+                self.coalesced += 1
+                logger.info(f"Attaching to in-flight job for {key}")
+                return future, True
+
+            future = start()
+            self._in_flight[key] = future
+            self.started += 1
+
+        future.add_done_callback(lambda f: self._release(key, f))
+        return future, False
+
+    def _release(self, key: Hashable, future: Future) -> None:
+        """Forget a finished job so the key can run again"""
+        with self._lock:
+            if self._in_flight.get(key) is future:
+                del self._in_flight[key]
+
+    def in_flight(self) -> int:
+        """Number of keys with a job queued or running"""
+        with self._lock:
+            return len(self._in_flight)
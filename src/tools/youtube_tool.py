@@ -1,16 +1,45 @@
 """LangChain Tool for YouTube video downloading"""
 
+import asyncio
+import inspect
+import json
 import logging
 import shutil
 import subprocess
+import threading
+from collections import deque
 from pathlib import Path
-from typing import Optional, Type
+from typing import Any, Callable, Optional, Type
 
 from langchain.tools import BaseTool
-from pydantic import BaseModel, Field
+from pydantic import BaseModel, Field, PrivateAttr
+
+from .disk_quota import SIZE_PRINT_TEMPLATE, DiskQuota, InsufficientSpaceError, parse_size_line
+from .download_index import DownloadIndex, extract_video_id
+from .file_publisher import FilePublisher
+from .progress import PROGRESS_TEMPLATE, ProgressEvent, parse_progress_line
+from .ytdlp_pool import YtDlpWorkerPool, kill_process_tree
 
 logger = logging.getLogger(__name__)
 
+# Metadata yt-dlp prints as one JSON line; `filepath` is only known after the final move
+INFO_PRINT_TEMPLATE = "%(.{id,title,duration,uploader})j"
+DOWNLOAD_PRINT_TEMPLATE = (
+    "after_move:%(.{id,title,duration,uploader,filepath,format_id,ext})j"
+)
+
+# The video ID in the file name lets the download index be rebuilt from a scan
+OUTPUT_TEMPLATE = "%(title)s [%(id)s].%(ext)s"
+
+# Seconds a download may take before the process is killed
+DOWNLOAD_TIMEOUT = 600
+
+# Non-progress output lines kept per download (for the JSON line and errors)
+OUTPUT_BUFFER_LINES = 200
+
+# Longest output line the async reader accepts (the JSON line holds the title)
+ASYNC_LINE_LIMIT = 1024 * 1024
+
 
 class YouTubeDownloadInput(BaseModel):
     """Input schema for YouTube download tool"""
@@ -25,6 +54,16 @@ class YouTubeDownloadOutput(BaseModel):
     message: str = Field(description="Status message or error description")
     title: Optional[str] = Field(default=None, description="Video title if successful")
     file_path: Optional[str] = Field(default=None, description="Downloaded file path if successful")
+    file_size: Optional[int] = Field(default=None, description="Downloaded file size in bytes")
+    video_id: Optional[str] = Field(default=None, description="YouTube video ID")
+    duration: Optional[float] = Field(default=None, description="Video duration in seconds")
+    uploader: Optional[str] = Field(default=None, description="Channel that uploaded the video")
+    already_downloaded: bool = Field(
+        default=False, description="Whether the file came from the download index"
+    )
+    rejected: bool = Field(
+        default=False, description="Whether the download was refused for lack of disk space"
+    )
 
 
 class YouTubeDownloadTool(BaseTool):
@@ -38,17 +77,69 @@ class YouTubeDownloadTool(BaseTool):
     """
     args_schema: Type[BaseModel] = YouTubeDownloadInput
     download_dir: str = Field(description="Directory to save downloaded videos")
+    index: Optional[DownloadIndex] = Field(
+        default=None, description="Index of videos that are already downloaded"
+    )
+    scratch_dir: Optional[str] = Field(
+        default=None,
+        description="Local directory yt-dlp works in; finished files are moved to download_dir",
+    )
+    quota: Optional[DiskQuota] = Field(
+        default=None, description="Disk-space admission control and eviction"
+    )
+    worker_pool: Optional[YtDlpWorkerPool] = Field(
+        default=None, description="Pre-warmed yt-dlp workers; None starts yt-dlp per call"
+    )
+
+    # Moves finished files out of scratch_dir (None when downloading in place)
+    _publisher: Optional[FilePublisher] = PrivateAttr(default=None)
 
-    def __init__(self, download_dir: str, **kwargs):
+    # Running yt-dlp processes, so shutdown can interrupt them
+    _processes: set = PrivateAttr(default_factory=set)
+    _processes_lock: threading.Lock = PrivateAttr(default_factory=threading.Lock)
+
+    def __init__(
+        self,
+        download_dir: str,
+        index: Optional[DownloadIndex] = None,
+        scratch_dir: Optional[str] = None,
+        quota: Optional[DiskQuota] = None,
+        worker_pool: Optional[YtDlpWorkerPool] = None,
+        **kwargs,
+    ):
         """
         Initialize the YouTube download tool
         
         Args:
             download_dir: Directory path for downloads
+            index: Optional download index used to skip re-downloads
+            scratch_dir: Optional local directory for fragments, `.part` files
+                and merging; only finished files are moved into download_dir
+            quota: Optional disk quota every download must be admitted by
+            worker_pool: Optional pool of pre-warmed yt-dlp workers to run jobs in
         """
-        super().__init__(download_dir=download_dir, **kwargs)
+        super().__init__(
+            download_dir=download_dir,
+            index=index,
+            scratch_dir=scratch_dir,
+            quota=quota,
+            worker_pool=worker_pool,
+            **kwargs,
+        )
+        if scratch_dir and Path(scratch_dir).resolve() != Path(download_dir).resolve():
+            Path(scratch_dir).mkdir(parents=True, exist_ok=True)
+            self._publisher = FilePublisher(download_dir)
         self._check_ytdlp()
 
+    @property
+    def output_dir(self) -> str:
+        """Directory yt-dlp writes into"""
+        return self.scratch_dir if self._publisher is not None else self.download_dir
+
+    def publish_stats(self) -> Optional[dict[str, Any]]:
+        """Get statistics of moves out of the scratch directory (None without one)"""
+        return self._publisher.stats() if self._publisher is not None else None
+
     def _check_ytdlp(self) -> None:
         """Check if yt-dlp is installed"""
         if not shutil.which("yt-dlp"):
@@ -56,33 +147,40 @@ class YouTubeDownloadTool(BaseTool):
                 "yt-dlp is not installed. Install it with: brew install yt-dlp"
             )
 
-    def _get_video_info(self, url: str) -> Optional[dict]:
+    def get_video_info(self, url: str) -> Optional[dict]:
         """
         Get video information without downloading
-        
+
+        This is a metadata-only probe for callers that don't need the file;
+        downloads get the same fields from the download pass itself.
+
         Args:
             url: YouTube URL
-            
+
         Returns:
             Dictionary with video info or None if failed
         """
+        command = [
+            "yt-dlp",
+            "--skip-download",
+            "--no-playlist",
+            "--no-warnings",
+            "--print",
+            INFO_PRINT_TEMPLATE,
+            url,
+        ]
         try:
-            result = subprocess.run(
-                ["yt-dlp", "--dump-json", "--no-warnings", url],
-                capture_output=True,
-                text=True,
-                timeout=30,
-            )
+            if self.worker_pool is not None:
+                lines: list[str] = []
+                returncode = self.worker_pool.run(command[1:], lines.append, timeout=30)
+                result = subprocess.CompletedProcess(
+                    command, returncode, stdout="\n".join(lines), stderr="\n".join(lines[-5:])
+                )
+            else:
+                result = subprocess.run(command, capture_output=True, text=True, timeout=30)
 
             if result.returncode == 0:
-                import json
-                info = json.loads(result.stdout)
-                return {
-                    "title": info.get("title"),
-                    "duration": info.get("duration"),
-                    "uploader": info.get("uploader"),
-                    "id": info.get("id"),
-                }
+                return self._parse_printed_info(result.stdout)
             else:
                 logger.error(f"Failed to get video info: {result.stderr}")
                 return None
@@ -91,6 +189,303 @@ class YouTubeDownloadTool(BaseTool):
             logger.error(f"Error getting video info: {e}")
             return None
 
+    def _parse_printed_info(self, stdout: str) -> Optional[dict]:
+        """
+        Parse the JSON line printed by yt-dlp's --print template
+
+        Args:
+            stdout: yt-dlp standard output
+
+        Returns:
+            Dictionary with video info or None if no JSON line was printed
+        """
+        # The JSON line is the last one; anything before it is unrelated output
+        for line in reversed(stdout.splitlines()):
+            line = line.strip()
+            if not line.startswith("{"):
+                continue
+            try:
+                info = json.loads(line)
+            except json.JSONDecodeError:
+                continue
+            return {
+                "title": info.get("title"),
+                "duration": info.get("duration"),
+                "uploader": info.get("uploader"),
+                "id": info.get("id"),
+                "filepath": info.get("filepath"),
+                "format": info.get("format_id") or info.get("ext"),
+            }
+        return None
+
+    def _resolve_output_path(self, info: dict) -> Optional[Path]:
+        """
+        Get the downloaded file from the path yt-dlp reported
+
+        The download directory is never scanned: the cost is one stat call no
+        matter how many files it holds, and concurrent jobs can't pick up each
+        other's files.
+
+        Args:
+            info: Parsed --print output of the download pass
+
+        Returns:
+            Path to the downloaded file or None if it wasn't reported or is missing
+        """
+        filepath = info.get("filepath")
+        if not filepath:
+            return None
+
+        path = Path(filepath)
+        if not path.is_absolute():
+            path = Path(self.output_dir) / path
+        return path if path.is_file() else None
+
+    def find_existing(self, url: str) -> Optional[YouTubeDownloadOutput]:
+        """
+        Look up a video in the download index without any network call
+
+        Args:
+            url: YouTube URL in any form (watch, youtu.be, shorts)
+
+        Returns:
+            Successful output for the existing file, or None if it must be downloaded
+        """
+        if self.index is None:
+            return None
+        video_id = extract_video_id(url)
+        if not video_id:
+            return None
+
+        entry = self.index.get(video_id)
+        if entry is None:
+            return None
+
+        logger.info(f"Already downloaded {video_id}: {entry.file_path}")
+        self.index.touch(video_id)
+        return YouTubeDownloadOutput(
+            success=True,
+            message=f"Already downloaded: {entry.title or video_id}",
+            title=entry.title,
+            file_path=entry.file_path,
+            file_size=entry.file_size,
+            video_id=video_id,
+            already_downloaded=True,
+        )
+
+    def _build_download_command(self, url: str) -> list[str]:
+        """
+        Build the yt-dlp command for a download
+
+        Metadata and the final path are printed by the same process that
+        downloads, so there is no separate probe; progress is printed as one
+        JSON line per update. With a quota, the estimated size is printed
+        once the format is chosen, before anything is downloaded. The output
+        name is deterministic, so after an interrupted run yt-dlp continues
+        the `.part` file it left behind in the output directory (the scratch
+        directory, if there is one).
+
+        Args:
+            url: YouTube URL to download
+
+        Returns:
+            Command line
+        """
+        command = [
+            "yt-dlp",
+            "--extractor-args", "youtube:player_client=android",  # Use Android client to bypass 403
+            "--format",
+            "bestvideo[ext=mp4]+bestaudio[ext=m4a]/best[ext=mp4]/best",
+            "--merge-output-format",
+            "mp4",
+            "--output",
+            str(Path(self.output_dir) / OUTPUT_TEMPLATE),
+            "--no-simulate",
+            "--print",
+            DOWNLOAD_PRINT_TEMPLATE,
+            "--progress",
+            "--newline",
+            "--progress-template",
+            PROGRESS_TEMPLATE,
+            "--continue",
+            "--no-warnings",
+            "--no-playlist",
+            url,
+        ]
+        if self.quota is not None:
+            command[-1:-1] = ["--print", SIZE_PRINT_TEMPLATE]
+        return command
+
+    def _admit_line(self, line: str, admission_key: Optional[str]) -> bool:
+        """
+        Admit the download once yt-dlp printed its estimated size
+
+        Args:
+            line: A non-progress line of yt-dlp output
+            admission_key: Key the download is admitted under (None without a quota)
+
+        Returns:
+            True if the line was the size line
+
+        Raises:
+            InsufficientSpaceError: The download doesn't fit
+        """
+        if admission_key is None or self.quota is None:
+            return False
+        size = parse_size_line(line)
+        if size is None:
+            return False
+        self.quota.admit(admission_key, size)
+        return True
+
+    def _handle_line(
+        self,
+        line: str,
+        output: deque[str],
+        on_progress: Optional[Callable[[ProgressEvent], None]],
+        admission_key: Optional[str],
+    ) -> None:
+        """Route one line of yt-dlp output to the progress callback, admission or the buffer"""
+        event = parse_progress_line(line)
+        if event is None:
+            if not self._admit_line(line, admission_key):
+                output.append(line)
+        elif on_progress is not None:
+            try:
+                on_progress(event)
+            except Exception as e:
+                logger.warning(f"Progress callback failed: {e}")
+
+    def _stream_process(
+        self,
+        command: list[str],
+        on_progress: Optional[Callable[[ProgressEvent], None]] = None,
+        admission_key: Optional[str] = None,
+    ) -> tuple[int, deque[str]]:
+        """
+        Run yt-dlp and handle its output line by line as it arrives
+
+        Progress lines become ProgressEvents; everything else goes into a
+        bounded ring buffer, so a chatty process can't grow memory.
+
+        Args:
+            command: yt-dlp command line
+            on_progress: Called with every progress event
+            admission_key: Key to admit the download under once its size is known
+
+        Returns:
+            Tuple of (exit code, last output lines)
+
+        Raises:
+            subprocess.TimeoutExpired: The process ran longer than DOWNLOAD_TIMEOUT
+            InsufficientSpaceError: The download was rejected (the process is killed)
+        """
+        if self.worker_pool is not None:
+            return self._stream_pooled(command, on_progress, admission_key)
+
+        output: deque[str] = deque(maxlen=OUTPUT_BUFFER_LINES)
+        process = subprocess.Popen(
+            command,
+            stdout=subprocess.PIPE,
+            stderr=subprocess.STDOUT,
+            text=True,
+            errors="replace",
+            bufsize=1,
+            start_new_session=True,
+        )
+        self._track(process)
+
+        # A stalled process prints nothing, so the timeout can't be checked
+        # between lines; a timer kills it instead
+        timed_out = threading.Event()
+
+        def kill() -> None:
+            timed_out.set()
+            kill_process_tree(process)
+
+        watchdog = threading.Timer(DOWNLOAD_TIMEOUT, kill)
+        watchdog.daemon = True
+        watchdog.start()
+        try:
+            for line in process.stdout:
+                self._handle_line(line.rstrip("\n"), output, on_progress, admission_key)
+            returncode = process.wait()
+        finally:
+            watchdog.cancel()
+            if process.poll() is None:
+                kill_process_tree(process)
+                process.wait()
+            process.stdout.close()
+            self._untrack(process)
+
+        if timed_out.is_set():
+            raise subprocess.TimeoutExpired(command, DOWNLOAD_TIMEOUT)
+        return returncode, output
+
+    def _stream_pooled(
+        self,
+        command: list[str],
+        on_progress: Optional[Callable[[ProgressEvent], None]] = None,
+        admission_key: Optional[str] = None,
+        timeout: float = DOWNLOAD_TIMEOUT,
+        cancel: Optional[threading.Event] = None,
+    ) -> tuple[int, deque[str]]:
+        """
+        _stream_process for a job run in a pre-warmed worker
+
+        Args:
+            command: yt-dlp command line
+            on_progress: Called with every progress event
+            admission_key: Key to admit the download under once its size is known
+            timeout: Seconds before the job is killed
+            cancel: Set to kill the job early
+
+        Returns:
+            Tuple of (exit code, last output lines)
+
+        Raises:
+            subprocess.TimeoutExpired: The job ran longer than `timeout`
+            InsufficientSpaceError: The download was rejected (the job is killed)
+        """
+        output: deque[str] = deque(maxlen=OUTPUT_BUFFER_LINES)
+        returncode = self.worker_pool.run(
+            command[1:],
+            lambda line: self._handle_line(line, output, on_progress, admission_key),
+            timeout,
+            cancel,
+        )
+        return returncode, output
+
+    def _track(self, process: Any) -> None:
+        with self._processes_lock:
+            self._processes.add(process)
+
+    def _untrack(self, process: Any) -> None:
+        with self._processes_lock:
+            self._processes.discard(process)
+
+    def interrupt_downloads(self) -> int:
+        """
+        Kill every running download, keeping its `.part` file for a later resume
+
+        Returns:
+            Number of downloads interrupted
+        """
+        with self._processes_lock:
+            processes = list(self._processes)
+        for process in processes:
+            kill_process_tree(process)
+        interrupted = len(processes)
+        if self.worker_pool is not None:
+            interrupted += self.worker_pool.interrupt()
+        return interrupted
+
+    @staticmethod
+    def _error_message(output: deque[str]) -> str:
+        """Pick the error lines (or the last lines) out of the output buffer"""
+        errors = [line for line in output if line.startswith("ERROR")]
+        return "\n".join(errors or list(output)[-5:]) or "Unknown error"
+
     def _run(self, url: str) -> str:
         """
         Download a YouTube video (synchronous)
@@ -101,115 +496,352 @@ class YouTubeDownloadTool(BaseTool):
         Returns:
             JSON string with download result
         """
+        return self.download(url)
+
+    def download(
+        self,
+        url: str,
+        on_progress: Optional[Callable[[ProgressEvent], None]] = None,
+    ) -> str:
+        """
+        Download a YouTube video, reporting progress while it runs
+
+        Args:
+            url: YouTube URL to download
+            on_progress: Called with every progress event from yt-dlp
+
+        Returns:
+            JSON string with download result
+        """
+        existing = self.find_existing(url)
+        if existing is not None:
+            return existing.model_dump_json()
+
         logger.info(f"Starting download: {url}")
+        admission_key = self._admission_key(url)
 
         try:
-            # Get video info first
-            info = self._get_video_info(url)
-            if not info:
-                return YouTubeDownloadOutput(
-                    success=False,
-                    message="Failed to retrieve video information"
-                ).model_dump_json()
+            if admission_key is not None:
+                self.quota.admit(admission_key)
+            returncode, output = self._stream_process(
+                self._build_download_command(url), on_progress, admission_key
+            )
+            return self._build_result(url, returncode, output)
 
-            title = info["title"]
-            logger.info(f"Video title: {title}")
+        except subprocess.TimeoutExpired:
+            return self._timeout_result()
+
+        except InsufficientSpaceError as e:
+            return self._rejected_result(e)
+
+        except Exception as e:
+            return self._unexpected_error_result(e)
+
+        finally:
+            if admission_key is not None:
+                self.quota.release(admission_key)
+
+    async def adownload(
+        self,
+        url: str,
+        on_progress: Optional[Callable[[ProgressEvent], Any]] = None,
+        timeout: float = DOWNLOAD_TIMEOUT,
+    ) -> str:
+        """
+        Download a YouTube video without blocking the event loop
+
+        Cancelling the task kills yt-dlp and its children.
+
+        Args:
+            url: YouTube URL to download
+            on_progress: Called with every progress event; may be a coroutine function
+            timeout: Seconds before the download is killed
 
-            # Prepare yt-dlp command
-            download_path = Path(self.download_dir)
-            command = [
-                "yt-dlp",
-                "--extractor-args", "youtube:player_client=android",  # Use Android client to bypass 403
-                "--format",
-                "bestvideo[ext=mp4]+bestaudio[ext=m4a]/best[ext=mp4]/best",
-                "--merge-output-format",
-                "mp4",
-                "--output",
-                str(download_path / "%(title)s.%(ext)s"),
-                "--no-warnings",
-                "--no-playlist",
-                url,
-            ]
-
-            # Run download
-            result = subprocess.run(
-                command, 
-                capture_output=True, 
-                text=True, 
-                timeout=600  # 10 minute timeout
+        Returns:
+            JSON string with download result
+        """
+        existing = self.find_existing(url)
+        if existing is not None:
+            return existing.model_dump_json()
+
+        logger.info(f"Starting download: {url}")
+        admission_key = self._admission_key(url)
+
+        try:
+            if admission_key is not None:
+                self.quota.admit(admission_key)
+            returncode, output = await self._astream_process(
+                self._build_download_command(url), on_progress, timeout, admission_key
             )
+            # Moving the file out of the scratch directory may be a copy
+            return await asyncio.to_thread(self._build_result, url, returncode, output)
 
-            if result.returncode == 0:
-                # Find the downloaded file
-                downloaded_files = list(download_path.glob(f"*{title[:50]}*.mp4"))
-                
-                if not downloaded_files:
-                    # Try a more general search
-                    downloaded_files = sorted(
-                        download_path.glob("*.mp4"),
-                        key=lambda p: p.stat().st_mtime,
-                        reverse=True
-                    )[:1]
-
-                if downloaded_files:
-                    file_path = str(downloaded_files[0])
-                    file_size = Path(file_path).stat().st_size / (1024 * 1024)  # MB
-                    logger.info(f"✅ Download successful: {file_path} ({file_size:.2f} MB)")
+        except asyncio.TimeoutError:
+            return self._timeout_result(timeout)
 
-                    return YouTubeDownloadOutput(
-                        success=True,
-                        message=f"Successfully downloaded: {title}",
-                        title=title,
-                        file_path=file_path
-                    ).model_dump_json()
-                else:
-                    logger.warning("Download reported success but file not found")
+        except InsufficientSpaceError as e:
+            return self._rejected_result(e)
+
+        except Exception as e:
+            return self._unexpected_error_result(e)
+
+        finally:
+            if admission_key is not None:
+                self.quota.release(admission_key)
+
+    def _admission_key(self, url: str) -> Optional[str]:
+        """Key a download is admitted under (None without a quota)"""
+        if self.quota is None:
+            return None
+        return extract_video_id(url) or url
+
+    async def _astream_process(
+        self,
+        command: list[str],
+        on_progress: Optional[Callable[[ProgressEvent], Any]] = None,
+        timeout: float = DOWNLOAD_TIMEOUT,
+        admission_key: Optional[str] = None,
+    ) -> tuple[int, deque[str]]:
+        """
+        Async counterpart of _stream_process
+
+        Args:
+            command: yt-dlp command line
+            on_progress: Called with every progress event; may be a coroutine function
+            timeout: Seconds before the process tree is killed
+            admission_key: Key to admit the download under once its size is known
+
+        Returns:
+            Tuple of (exit code, last output lines)
+
+        Raises:
+            asyncio.TimeoutError: The process ran longer than `timeout`
+            InsufficientSpaceError: The download was rejected (the process is killed)
+        """
+        if self.worker_pool is not None:
+            return await self._astream_pooled(command, on_progress, timeout, admission_key)
+
+        output: deque[str] = deque(maxlen=OUTPUT_BUFFER_LINES)
+        process = await asyncio.create_subprocess_exec(
+            *command,
+            stdout=asyncio.subprocess.PIPE,
+            stderr=asyncio.subprocess.STDOUT,
+            start_new_session=True,
+            limit=ASYNC_LINE_LIMIT,
+        )
+        self._track(process)
+
+        async def pump() -> int:
+            async for raw in process.stdout:
+                line = raw.decode("utf-8", errors="replace").rstrip("\r\n")
+                event = parse_progress_line(line)
+                if event is None:
+                    if not self._admit_line(line, admission_key):
+                        output.append(line)
+                elif on_progress is not None:
+                    try:
+                        result = on_progress(event)
+                        if inspect.isawaitable(result):
+                            await result
+                    except Exception as e:
+                        logger.warning(f"Progress callback failed: {e}")
+            return await process.wait()
+
+        try:
+            returncode = await asyncio.wait_for(pump(), timeout)
+        finally:
+            # Timeout or cancellation: don't leave yt-dlp or ffmpeg running
+            if process.returncode is None:
+                kill_process_tree(process)
+                await process.wait()
+            self._untrack(process)
+        return returncode, output
+
+    async def _astream_pooled(
+        self,
+        command: list[str],
+        on_progress: Optional[Callable[[ProgressEvent], Any]],
+        timeout: float,
+        admission_key: Optional[str],
+    ) -> tuple[int, deque[str]]:
+        """
+        _astream_process for a job run in a pre-warmed worker
+
+        The job is waited for on a thread; progress events are handed back
+        to the event loop, and cancelling the task kills the job.
+        """
+        loop = asyncio.get_running_loop()
+        cancel = threading.Event()
+
+        async def deliver(event: ProgressEvent) -> None:
+            try:
+                result = on_progress(event)
+                if inspect.isawaitable(result):
+                    await result
+            except Exception as e:
+                logger.warning(f"Progress callback failed: {e}")
+
+        def forward(event: ProgressEvent) -> None:
+            asyncio.run_coroutine_threadsafe(deliver(event), loop)
+
+        try:
+            return await asyncio.to_thread(
+                self._stream_pooled,
+                command,
+                forward if on_progress is not None else None,
+                admission_key,
+                timeout,
+                cancel,
+            )
+        except subprocess.TimeoutExpired:
+            raise asyncio.TimeoutError() from None
+        finally:
+            cancel.set()
+
+    def _build_result(self, url: str, returncode: int, output: deque[str]) -> str:
+        """
+        Turn a finished yt-dlp run into the tool output
+
+        Args:
+            url: YouTube URL that was downloaded
+            returncode: yt-dlp exit code
+            output: Last non-progress output lines
+
+        Returns:
+            JSON string with download result
+        """
+        info = self._parse_printed_info("\n".join(output)) or {}
+        title = info.get("title")
+        if title:
+            logger.info(f"Video title: {title}")
+
+        if returncode == 0:
+            output_path = self._resolve_output_path(info)
+
+            if output_path and self._publisher is not None:
+                try:
+                    output_path = self._publisher.publish(output_path)
+                except OSError as e:
+                    logger.error(f"Failed to move {output_path} to {self.download_dir}: {e}")
                     return YouTubeDownloadOutput(
                         success=False,
-                        message="Downloaded file not found",
-                        title=title
+                        message=f"Downloaded, but moving it to the download folder failed: {e}",
+                        title=title,
                     ).model_dump_json()
+
+            if output_path:
+                file_path = str(output_path)
+                file_size = output_path.stat().st_size
+                logger.info(
+                    f"✅ Download successful: {file_path} ({file_size / (1024 * 1024):.2f} MB)"
+                )
+
+                video_id = info.get("id") or extract_video_id(url)
+                if self.index is not None and video_id:
+                    self.index.add(
+                        video_id,
+                        file_path,
+                        file_size,
+                        format=info.get("format"),
+                        title=title,
+                    )
+
+                return YouTubeDownloadOutput(
+                    success=True,
+                    message=f"Successfully downloaded: {title}",
+                    title=title,
+                    file_path=file_path,
+                    file_size=file_size,
+                    video_id=info.get("id"),
+                    duration=info.get("duration"),
+                    uploader=info.get("uploader"),
+                ).model_dump_json()
             else:
-                error_msg = result.stderr or "Unknown error"
-                logger.error(f"Download failed: {error_msg}")
+                logger.warning(
+                    f"Download reported success but file not found: {info.get('filepath')}"
+                )
                 return YouTubeDownloadOutput(
                     success=False,
-                    message=f"Download failed: {error_msg}",
+                    message="Downloaded file not found",
                     title=title
                 ).model_dump_json()
-
-        except subprocess.TimeoutExpired:
-            error_msg = "Download timeout (exceeded 10 minutes)"
-            logger.error(error_msg)
+        else:
+            error_msg = self._error_message(output)
+            logger.error(f"Download failed: {error_msg}")
             return YouTubeDownloadOutput(
                 success=False,
-                message=error_msg
+                message=f"Download failed: {error_msg}",
+                title=title
             ).model_dump_json()
 
-        except Exception as e:
-            error_msg = f"Unexpected error: {str(e)}"
-            logger.error(error_msg, exc_info=True)
-            return YouTubeDownloadOutput(
-                success=False,
-                message=error_msg
-            ).model_dump_json()
+    def _timeout_result(self, timeout: float = DOWNLOAD_TIMEOUT) -> str:
+        """Tool output for a download that was killed at its timeout"""
+        error_msg = f"Download timeout (exceeded {timeout / 60:g} minutes)"
+        logger.error(error_msg)
+        return YouTubeDownloadOutput(
+            success=False,
+            message=error_msg
+        ).model_dump_json()
+
+    def _rejected_result(self, error: InsufficientSpaceError) -> str:
+        """Tool output for a download refused by the disk quota"""
+        error_msg = f"Not enough disk space: {error}"
+        logger.warning(error_msg)
+        return YouTubeDownloadOutput(
+            success=False,
+            message=error_msg,
+            rejected=True,
+        ).model_dump_json()
+
+    def _unexpected_error_result(self, error: Exception) -> str:
+        """Tool output for an exception raised around yt-dlp"""
+        error_msg = f"Unexpected error: {str(error)}"
+        logger.error(error_msg, exc_info=True)
+        return YouTubeDownloadOutput(
+            success=False,
+            message=error_msg
+        ).model_dump_json()
 
     async def _arun(self, url: str) -> str:
-        """Async version (not implemented, falls back to sync)"""
-        return self._run(url)
+        """
+        Download a YouTube video (asynchronous)
+
+        Args:
+            url: YouTube URL to download
+
+        Returns:
+            JSON string with download result
+        """
+        return await self.adownload(url)
 
 
-def get_youtube_tools(download_dir: str) -> list[BaseTool]:
+def get_youtube_tools(
+    download_dir: str,
+    index: Optional[DownloadIndex] = None,
+    scratch_dir: Optional[str] = None,
+    quota: Optional[DiskQuota] = None,
+    worker_pool: Optional[YtDlpWorkerPool] = None,
+) -> list[BaseTool]:
     """
     Get list of YouTube-related tools
     
     Args:
         download_dir: Directory for downloads
+        index: Optional download index shared by the tools
+        scratch_dir: Optional local directory downloads are staged in
+        quota: Optional disk quota downloads must be admitted by
+        worker_pool: Optional pool of pre-warmed yt-dlp workers
         
     Returns:
         List of LangChain tools
     """
     return [
-        YouTubeDownloadTool(download_dir=download_dir),
+        YouTubeDownloadTool(
+            download_dir=download_dir,
+            index=index,
+            scratch_dir=scratch_dir,
+            quota=quota,
+            worker_pool=worker_pool,
+        ),
     ]
 
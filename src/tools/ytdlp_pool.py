@@ -0,0 +1,355 @@
+"""Pool of long-lived, pre-warmed yt-dlp worker processes"""
+
+import importlib.util
+import logging
+import os
+import signal
+import subprocess
+import sys
+import threading
+import time
+from collections import deque
+from multiprocessing.connection import Client
+from pathlib import Path
+from typing import Any, Callable, Optional
+
+from .ytdlp_worker import AUTHKEY_ENV
+
+logger = logging.getLogger(__name__)
+
+WORKER_SCRIPT = Path(__file__).with_name("ytdlp_worker.py")
+
+# Seconds a new worker may take to import yt-dlp and announce itself
+WORKER_START_TIMEOUT = 60
+
+# Seconds between checks of a job's deadline and cancellation
+POLL_INTERVAL = 0.2
+
+# Seconds a retired worker gets to exit before it is killed
+WORKER_EXIT_TIMEOUT = 2
+
+
+def kill_process_tree(process) -> None:
+    """
+    Kill yt-dlp together with the processes it started (ffmpeg)
+
+    Downloads run in their own session, so the process ID is also the ID of
+    a process group that holds every child.
+
+    Args:
+        process: subprocess.Popen or asyncio.subprocess.Process
+    """
+    if hasattr(os, "killpg"):
+        try:
+            os.killpg(process.pid, signal.SIGKILL)
+            return
+        except (ProcessLookupError, PermissionError):
+            pass
+    try:
+        process.kill()
+    except ProcessLookupError:
+        pass
+
+
+class _Worker:
+    """A worker process and its connection"""
+
+    def __init__(self, process: subprocess.Popen, conn: Any):
+        self.process = process
+        self.conn = conn
+        self.jobs = 0
+
+
+class YtDlpWorkerPool:
+    """
+    Runs yt-dlp command lines in long-lived worker processes
+
+    Starting yt-dlp costs an interpreter start plus the extractor imports on
+    every call. The workers pay that once: each imports yt-dlp up front and
+    then runs one job at a time, sent over an authenticated local
+    connection. Every job gets fresh yt-dlp options and runs in its own
+    session with its children, so a job that times out or is interrupted is
+    killed together with its worker and ffmpeg, and a fresh worker is
+    started in its place. Workers are also retired after `max_jobs` jobs or
+    once their peak memory passes `max_memory_mb`.
+    """
+
+    def __init__(
+        self,
+        size: int = 2,
+        max_jobs: int = 50,
+        max_memory_mb: float = 500,
+        python: str = sys.executable,
+    ):
+        """
+        Initialize the pool (no worker starts until start() or the first job)
+
+        Args:
+            size: Maximum number of workers
+            max_jobs: Jobs a worker runs before it is replaced
+            max_memory_mb: Peak resident memory after which a worker is replaced
+            python: Interpreter the workers run on
+
+        Raises:
+            RuntimeError: If the yt-dlp Python module is not installed
+        """
+        if importlib.util.find_spec("yt_dlp") is None:
+            raise RuntimeError(
+                "The yt-dlp Python module is not installed. Install it with: pip install yt-dlp"
+            )
+        self.size = max(1, size)
+        self.max_jobs = max_jobs
+        self.max_memory_bytes = int(max_memory_mb * 1024 * 1024)
+        self.python = python
+
+        self._authkey = os.urandom(32)
+        self._cond = threading.Condition()
+        self._idle: deque[_Worker] = deque()
+        self._busy: set[_Worker] = set()
+        self._starting = 0
+        self._closed = False
+
+        self.jobs = 0
+        self.spawned = 0
+        self.recycled = 0
+        self.timeouts = 0
+        self.lost = 0
+        self._spawn_seconds = 0.0
+
+    def start(self) -> None:
+        """Start all workers in the background"""
+        for _ in range(self.size):
+            self._warm_up_one()
+
+    def _warm_up_one(self) -> None:
+        """Start one more idle worker in the background if the pool has room"""
+        with self._cond:
+            if self._closed or len(self._idle) + len(self._busy) + self._starting >= self.size:
+                return
+            self._starting += 1
+
+        def run() -> None:
+            try:
+                worker = self._spawn()
+            except Exception as e:
+                logger.error(f"Failed to start yt-dlp worker: {e}")
+                worker = None
+            with self._cond:
+                self._starting -= 1
+                if worker is not None:
+                    if self._closed:
+                        self._retire(worker)
+                    else:
+                        self._idle.append(worker)
+                self._cond.notify()
+
+        threading.Thread(target=run, name="ytdlp-worker-start", daemon=True).start()
+
+    def _spawn(self) -> _Worker:
+        """Start a worker and connect to it once it has imported yt-dlp"""
+        start = time.monotonic()
+        env = {**os.environ, AUTHKEY_ENV: self._authkey.hex()}
+        process = subprocess.Popen(
+            [self.python, str(WORKER_SCRIPT)],
+            stdin=subprocess.DEVNULL,
+            stdout=subprocess.PIPE,
+            text=True,
+            env=env,
+            start_new_session=True,
+        )
+        # A worker that never announces itself is killed, which ends readline
+        watchdog = threading.Timer(WORKER_START_TIMEOUT, kill_process_tree, args=(process,))
+        watchdog.daemon = True
+        watchdog.start()
+        try:
+            address = process.stdout.readline().strip()
+        finally:
+            watchdog.cancel()
+            process.stdout.close()
+        if not address:
+            kill_process_tree(process)
+            process.wait()
+            raise RuntimeError(f"yt-dlp worker exited during startup (code {process.returncode})")
+
+        conn = Client(address, authkey=self._authkey)
+        elapsed = time.monotonic() - start
+        with self._cond:
+            self.spawned += 1
+            self._spawn_seconds += elapsed
+        logger.debug(f"yt-dlp worker {process.pid} ready in {elapsed * 1000:.0f} ms")
+        return _Worker(process, conn)
+
+    def _acquire(self) -> _Worker:
+        """Take an idle worker, starting one if the pool has room, else wait"""
+        with self._cond:
+            while True:
+                if self._closed:
+                    raise RuntimeError("yt-dlp worker pool is stopped")
+                if self._idle:
+                    worker = self._idle.popleft()
+                    self._busy.add(worker)
+                    return worker
+                if len(self._busy) + self._starting < self.size:
+                    self._starting += 1
+                    break
+                self._cond.wait()
+
+        try:
+            worker = self._spawn()
+        except BaseException:
+            with self._cond:
+                self._starting -= 1
+                self._cond.notify()
+            raise
+        with self._cond:
+            self._starting -= 1
+            self._busy.add(worker)
+        return worker
+
+    def run(
+        self,
+        args: list[str],
+        on_line: Callable[[str], None],
+        timeout: float,
+        cancel: Optional[threading.Event] = None,
+    ) -> int:
+        """
+        Run one yt-dlp command line in a worker
+
+        Args:
+            args: yt-dlp arguments (without the executable)
+            on_line: Called with every output line as it arrives; if it
+                raises, the job is killed and the exception propagates
+            timeout: Seconds before the job is killed
+            cancel: Set to kill the job early
+
+        Returns:
+            yt-dlp exit code (negative if the job was killed)
+
+        Raises:
+            subprocess.TimeoutExpired: The job ran longer than `timeout`
+        """
+        worker = self._acquire()
+        deadline = time.monotonic() + timeout
+        with self._cond:
+            self.jobs += 1
+        try:
+            worker.conn.send(list(args))
+            while True:
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    with self._cond:
+                        self.timeouts += 1
+                    self._discard(worker)
+                    raise subprocess.TimeoutExpired(["yt-dlp", *args], timeout)
+                if cancel is not None and cancel.is_set():
+                    return self._discard(worker)
+                if not worker.conn.poll(min(remaining, POLL_INTERVAL)):
+                    continue
+                message = worker.conn.recv()
+                if message[0] == "line":
+                    on_line(message[1])
+                    continue
+                _, code, peak_rss = message
+                self._release(worker, peak_rss)
+                return code
+        except (EOFError, OSError):
+            # Interrupted (see interrupt()) or crashed
+            with self._cond:
+                self.lost += 1
+            return self._discard(worker)
+        except BaseException:
+            self._discard(worker)
+            raise
+
+    def _release(self, worker: _Worker, peak_rss: int) -> None:
+        """Return a worker after a job, or replace it if it is due"""
+        worker.jobs += 1
+        worn_out = worker.jobs >= self.max_jobs or peak_rss > self.max_memory_bytes
+        with self._cond:
+            self._busy.discard(worker)
+            if worn_out or self._closed:
+                if worn_out:
+                    self.recycled += 1
+                    logger.info(
+                        f"Recycling yt-dlp worker {worker.process.pid} after {worker.jobs} "
+                        f"job(s), peak memory {peak_rss / (1024 * 1024):.0f} MB"
+                    )
+                self._retire(worker)
+            else:
+                self._idle.append(worker)
+            self._cond.notify()
+        if worn_out:
+            self._warm_up_one()
+
+    def _retire(self, worker: _Worker) -> None:
+        """Ask a worker to exit in the background, killing it if it doesn't"""
+
+        def run() -> None:
+            try:
+                worker.conn.send(None)
+                worker.process.wait(WORKER_EXIT_TIMEOUT)
+            except (OSError, subprocess.TimeoutExpired):
+                kill_process_tree(worker.process)
+                worker.process.wait()
+            worker.conn.close()
+
+        threading.Thread(target=run, name="ytdlp-worker-exit", daemon=True).start()
+
+    def _discard(self, worker: _Worker) -> int:
+        """
+        Kill a worker mid-job and start a replacement
+
+        Returns:
+            The worker's exit code
+        """
+        with self._cond:
+            if worker not in self._busy:
+                return worker.process.returncode or -signal.SIGKILL
+            self._busy.discard(worker)
+            self._cond.notify()
+        kill_process_tree(worker.process)
+        returncode = worker.process.wait()
+        worker.conn.close()
+        self._warm_up_one()
+        return returncode
+
+    def interrupt(self) -> int:
+        """
+        Kill every running job (with its ffmpeg), keeping `.part` files for a resume
+
+        Returns:
+            Number of jobs interrupted
+        """
+        with self._cond:
+            busy = list(self._busy)
+        for worker in busy:
+            kill_process_tree(worker.process)
+        return len(busy)
+
+    def stop(self) -> None:
+        """Stop all workers; running jobs are killed"""
+        with self._cond:
+            self._closed = True
+            idle = list(self._idle)
+            self._idle.clear()
+            self._cond.notify_all()
+        for worker in idle:
+            self._retire(worker)
+        self.interrupt()
+
+    def stats(self) -> dict[str, Any]:
+        """Get worker and job counters"""
+        with self._cond:
+            return {
+                "workers": len(self._idle) + len(self._busy),
+                "busy": len(self._busy),
+                "jobs": self.jobs,
+                "spawned": self.spawned,
+                "recycled": self.recycled,
+                "timeouts": self.timeouts,
+                "lost": self.lost,
+                "avg_spawn_ms": round(self._spawn_seconds / self.spawned * 1000, 1)
+                if self.spawned
+                else None,
+            }
@@ -0,0 +1,116 @@
+"""
+Long-lived yt-dlp worker process, started and driven by YtDlpWorkerPool
+
+Runs as a plain script, not as part of the package, so starting it imports
+only the standard library and yt-dlp. yt-dlp is imported once, before the
+worker announces itself; each job then runs yt-dlp's command-line entry
+point with fresh options, and its output is sent back line by line.
+
+Protocol (multiprocessing.connection, authenticated with a per-pool key):
+    worker prints its listener address on stdout, then accepts one connection
+    parent -> worker: list of yt-dlp arguments, or None to exit
+    worker -> parent: ("line", text) per output line, then ("done", exit code, peak RSS bytes)
+"""
+
+import io
+import os
+import resource
+import sys
+from multiprocessing.connection import Listener
+
+# Environment variable holding the hex-encoded connection key
+AUTHKEY_ENV = "YTDLP_WORKER_AUTHKEY"
+
+
+class LineSender(io.TextIOBase):
+    """Text stream that sends every complete line to the parent"""
+
+    encoding = "utf-8"
+
+    def __init__(self, conn):
+        self._conn = conn
+        self._partial = ""
+
+    def writable(self) -> bool:
+        return True
+
+    def isatty(self) -> bool:
+        return False
+
+    def write(self, text: str) -> int:
+        *lines, self._partial = (self._partial + text).split("\n")
+        for line in lines:
+            self._conn.send(("line", line.rstrip("\r")))
+        return len(text)
+
+    def close_line(self) -> None:
+        """Send what is left of an unterminated last line"""
+        if self._partial:
+            self._conn.send(("line", self._partial.rstrip("\r")))
+            self._partial = ""
+
+
+def peak_rss() -> int:
+    """Peak resident memory of this process in bytes"""
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # Kilobytes on Linux, bytes on macOS
+    return peak if sys.platform == "darwin" else peak * 1024
+
+
+def run_job(conn, argv: list[str]) -> int:
+    """Run one yt-dlp command line with its output redirected to the parent"""
+    import yt_dlp
+
+    out = LineSender(conn)
+    sys.stdout = sys.stderr = out
+    try:
+        yt_dlp.main(argv)
+        code = 0
+    except SystemExit as e:
+        if e.code is None or isinstance(e.code, int):
+            code = e.code or 0
+        else:
+            out.write(f"{e.code}\n")
+            code = 1
+    except Exception as e:
+        out.write(f"ERROR: {e}\n")
+        code = 1
+    finally:
+        out.close_line()
+        sys.stdout, sys.stderr = sys.__stdout__, sys.__stderr__
+    return code
+
+
+def main() -> None:
+    authkey = bytes.fromhex(os.environ.pop(AUTHKEY_ENV))
+    # yt-dlp names itself after argv[0] in usage errors
+    sys.argv[0] = "yt-dlp"
+
+    # Pre-warm: the interpreter, yt-dlp and its extractors are loaded once
+    import yt_dlp  # noqa: F401
+    from yt_dlp.extractor import gen_extractor_classes
+
+    gen_extractor_classes()
+
+    with Listener(authkey=authkey) as listener:
+        print(listener.address, flush=True)
+        # Nobody reads the pipe any more; ffmpeg must not block on it
+        devnull = os.open(os.devnull, os.O_WRONLY)
+        os.dup2(devnull, sys.stdout.fileno())
+        os.close(devnull)
+        conn = listener.accept()
+
+    with conn:
+        while True:
+            try:
+                argv = conn.recv()
+            except EOFError:
+                break
+            if argv is None:
+                break
+            code = run_job(conn, argv)
+            conn.send(("done", code, peak_rss()))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,193 @@
+"""Bounded work queue with a worker pool for processing Slack messages"""
+
+import logging
+import queue
+import threading
+import time
+from collections import deque
+from dataclasses import dataclass, field
+from typing import Any, Callable, Optional
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass
+class Job:
+    """A unit of work waiting in the queue"""
+
+    args: tuple
+    enqueued_at: float = field(default_factory=time.monotonic)
+
+
+class WorkQueue:
+    """
+    Bounded FIFO queue drained by a pool of worker threads
+
+    The producer (the Socket Mode listener) only calls `submit`, which blocks
+    for at most `put_timeout` seconds when the queue is full. That is the
+    backpressure: a burst slows the listener down briefly, and if the workers
+    still can't keep up the job is rejected instead of growing memory.
+    """
+
+    # Number of recent wait times kept for statistics
+    WAIT_SAMPLE_SIZE = 500
+
+    def __init__(
+        self,
+        handler: Callable[..., Any],
+        max_size: int = 100,
+        num_workers: int = 4,
+        put_timeout: float = 2.0,
+        name: str = "worker",
+    ):
+        """
+        Initialize the work queue
+
+        Args:
+            handler: Function called by a worker with the submitted args
+            max_size: Maximum number of queued (not yet running) jobs
+            num_workers: Number of worker threads
+            put_timeout: Seconds to wait for a free slot before rejecting
+            name: Prefix for worker thread names
+        """
+        self.handler = handler
+        self.max_size = max_size
+        self.num_workers = max(1, num_workers)
+        self.put_timeout = put_timeout
+        self.name = name
+
+        self._queue: queue.Queue[Optional[Job]] = queue.Queue(maxsize=max_size)
+        self._workers: list[threading.Thread] = []
+        self._lock = threading.Lock()
+        self._wait_times: deque[float] = deque(maxlen=self.WAIT_SAMPLE_SIZE)
+        self._in_flight = 0
+        self._submitted = 0
+        self._processed = 0
+        self._failed = 0
+        self._rejected = 0
+
+    def start(self) -> None:
+        """Start the worker threads"""
+        if self._workers:
+            return
+        for i in range(self.num_workers):
+            worker = threading.Thread(
+                target=self._worker_loop, name=f"{self.name}-{i}", daemon=True
+            )
+            worker.start()
+            self._workers.append(worker)
+        logger.info(
+            f"Started {self.num_workers} {self.name} thread(s), queue size {self.max_size}"
+        )
+
+    def stop(self, timeout: float = 10.0) -> None:
+        """
+        Stop the workers after the jobs already queued have been processed
+
+        Args:
+            timeout: Maximum seconds to wait for all workers to exit
+        """
+        if not self._workers:
+            return
+        for _ in self._workers:
+            # Sentinels are queued behind pending jobs so the queue drains first
+            try:
+                self._queue.put(None, timeout=timeout)
+            except queue.Full:
+                break
+
+        deadline = time.monotonic() + timeout
+        for worker in self._workers:
+            worker.join(timeout=max(0.0, deadline - time.monotonic()))
+
+        alive = sum(1 for w in self._workers if w.is_alive())
+        if alive:
+            logger.warning(f"{alive} {self.name} thread(s) still busy at shutdown")
+        self._workers = []
+
+    def submit(self, *args: Any) -> bool:
+        """
+        Enqueue a job for the worker pool
+
+        Args:
+            *args: Arguments passed to the handler
+
+        Returns:
+            True if the job was queued, False if it was rejected (queue full)
+        """
+        job = Job(args=args)
+        try:
+            self._queue.put(job, timeout=self.put_timeout)
+        except queue.Full:
+            with self._lock:
+                self._rejected += 1
+            logger.warning(
+                f"Work queue full ({self.max_size} jobs), rejecting job after "
+                f"{self.put_timeout:.1f}s"
+            )
+            return False
+
+        with self._lock:
+            self._submitted += 1
+        logger.debug(f"Job queued, depth: {self._queue.qsize()}")
+        return True
+
+    def _worker_loop(self) -> None:
+        """Take jobs from the queue and run the handler until a sentinel arrives"""
+        while True:
+            job = self._queue.get()
+            if job is None:
+                self._queue.task_done()
+                return
+
+            wait_time = time.monotonic() - job.enqueued_at
+            with self._lock:
+                self._wait_times.append(wait_time)
+                self._in_flight += 1
+            logger.debug(f"Job started after waiting {wait_time * 1000:.0f} ms")
+
+            try:
+                self.handler(*job.args)
+                with self._lock:
+                    self._processed += 1
+            except Exception as e:
+                with self._lock:
+                    self._failed += 1
+                logger.error(f"Error in {self.name}: {e}", exc_info=True)
+            finally:
+                with self._lock:
+                    self._in_flight -= 1
+                self._queue.task_done()
+
+    @property
+    def depth(self) -> int:
+        """Number of jobs waiting to be picked up by a worker"""
+        return self._queue.qsize()
+
+    def stats(self) -> dict[str, Any]:
+        """
+        Get queue statistics
+
+        Returns:
+            Dictionary with queue depth, counters and wait time percentiles (ms)
+        """
+        with self._lock:
+            waits = sorted(self._wait_times)
+            stats = {
+                "depth": self._queue.qsize(),
+                "max_size": self.max_size,
+                "workers": self.num_workers,
+                "in_flight": self._in_flight,
+                "submitted": self._submitted,
+                "processed": self._processed,
+                "failed": self._failed,
+                "rejected": self._rejected,
+            }
+
+        if waits:
+            stats["wait_ms_avg"] = sum(waits) / len(waits) * 1000
+            stats["wait_ms_p95"] = waits[min(len(waits) - 1, int(len(waits) * 0.95))] * 1000
+            stats["wait_ms_max"] = waits[-1] * 1000
+        else:
+            stats["wait_ms_avg"] = stats["wait_ms_p95"] = stats["wait_ms_max"] = 0.0
+        return stats
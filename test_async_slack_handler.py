@@ -0,0 +1,84 @@
+"""Unit tests for the asyncio Slack handler (no Slack connection)"""
+
+import asyncio
+from types import SimpleNamespace
+
+from slack_sdk.socket_mode.request import SocketModeRequest
+
+from src.async_slack_handler import AsyncSlackHandler
+from src.slack_events import parse_message_event
+from src.slack_handler import BUSY_MESSAGE
+
+
+def make_settings(**overrides):
+    values = {
+        "slack_bot_token": "xoxb-test",
+        "monitored_channels": ["C1"],
+        "queue_max_size": 1,
+        "queue_put_timeout": 0.01,
+        "worker_count": 1,
+        "event_dedup_window": 600,
+        "event_dedup_max_size": 100,
+        "event_dedup_path": "",
+        "channel_cursor_path": "",
+        "slack_send_rate": 1.0,
+        "slack_send_burst": 3,
+    }
+    values.update(overrides)
+    return SimpleNamespace(**values)
+
+
+def event_payload(text="hi", channel="C1", user="U1", ts="1.0", **extra):
+    event = {"type": "message", "channel": channel, "user": user, "text": text, "ts": ts}
+    event.update(extra)
+    return {"event_id": f"Ev{ts}", "event": event}
+
+
+def test_parse_message_event_filters_events():
+    assert parse_message_event(event_payload(), "UBOT", ["C1"]) == ("C1", "U1", "hi", "1.0")
+    assert parse_message_event(event_payload(user="UBOT"), "UBOT", ["C1"]) is None
+    assert parse_message_event(event_payload(channel="C2"), "UBOT", ["C1"]) is None
+    assert parse_message_event(event_payload(subtype="message_changed"), "UBOT", ["C1"]) is None
+
+
+def test_messages_are_deduplicated_processed_and_overflow_is_rejected():
+    async def scenario():
+        handler = AsyncSlackHandler(make_settings())
+        handler.bot_user_id = "UBOT"
+        release = asyncio.Event()
+        handled, sent = [], []
+
+        async def callback(channel_id, user_id, text, ts):
+            handled.append(text)
+            await release.wait()
+
+        async def send_message(channel_id, text, thread_ts=None):
+            sent.append(text)
+
+        async def ack(response):
+            pass
+
+        handler.set_message_callback(callback)
+        handler.send_message = send_message
+        handler._queue = asyncio.Queue(maxsize=1)
+        handler._workers = [asyncio.create_task(handler._worker())]
+        client = SimpleNamespace(send_socket_mode_response=ack)
+
+        deliveries = [("one", "1.0"), ("one", "1.0"), ("two", "2.0"), ("three", "3.0")]
+        for n, (text, ts) in enumerate(deliveries):
+            request = SocketModeRequest(
+                type="events_api", envelope_id=f"env-{n}", payload=event_payload(text, ts=ts)
+            )
+            await handler._handle_request(client, request)
+            await asyncio.sleep(0)
+
+        release.set()
+        await handler.stop(timeout=1)
+        return handler.queue_stats(), handler.dedup.stats(), handled, sent
+
+    stats, handler_dedup_stats, handled, sent = asyncio.run(scenario())
+    assert handled == ["one", "two"]
+    assert sent == [BUSY_MESSAGE]
+    assert stats["processed"] == 2
+    assert stats["rejected"] == 1
+    assert handler_dedup_stats["duplicates"] == 1
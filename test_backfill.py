@@ -0,0 +1,135 @@
+"""Unit tests for the catch-up backfill (conversations.history is faked)"""
+
+import time
+from types import SimpleNamespace
+
+from slack_sdk.errors import SlackApiError
+
+from src.backfill import Backfiller, ChannelCursors
+from src.event_dedup import EventDeduplicator
+from src.tools.download_index import DownloadIndex
+
+VIDEO = "https://youtu.be/jNQXAC9IVRw"
+
+
+def link(n):
+    return f"https://youtu.be/video{n:06d}"
+
+
+class FakeHistoryClient:
+    """Serves messages newest first in pages of two; the first call answers 429"""
+
+    def __init__(self, messages, rate_limited=1):
+        self.messages = sorted(messages, key=lambda m: float(m["ts"]), reverse=True)
+        self.rate_limited = rate_limited
+        self.calls = []
+
+    def conversations_history(self, channel, oldest, limit, cursor=None):
+        self.calls.append((channel, oldest, cursor))
+        if self.rate_limited:
+            self.rate_limited -= 1
+            response = SimpleNamespace(status_code=429, headers={"Retry-After": "0"})
+            raise SlackApiError("ratelimited", response)
+        newer = [m for m in self.messages if float(m["ts"]) > float(oldest)]
+        start = int(cursor or 0)
+        page = newer[start:start + 2]
+        more = start + 2 < len(newer)
+        return {
+            "messages": page,
+            "has_more": more,
+            "response_metadata": {"next_cursor": str(start + 2) if more else ""},
+        }
+
+
+def message(ts, text, user="U1", **extra):
+    return {"type": "message", "ts": ts, "user": user, "text": text, **extra}
+
+
+def test_backfill_replays_missed_messages_in_order(tmp_path):
+    now = time.time()
+    cursors = ChannelCursors(str(tmp_path / "cursors.json"))
+    cursors.advance("C1", f"{now - 100:.6f}")
+
+    index = DownloadIndex(str(tmp_path / "index.sqlite3"))
+    downloaded = tmp_path / "zoo.mp4"
+    downloaded.write_bytes(b"\0")
+    index.add("jNQXAC9IVRw", str(downloaded), 1)
+
+    dedup = EventDeduplicator()
+    cursors.start("C1", f"{now - 40:.6f}")  # queued live
+    # Received before a restart but never processed
+    dedup.is_duplicate([f"message:C1:{now - 35:.6f}"])
+
+    client = FakeHistoryClient([
+        message(f"{now - 200:.6f}", link(1)),  # before the cursor
+        message(f"{now - 50:.6f}", link(2)),
+        message(f"{now - 45:.6f}", "lunch?"),  # no video
+        message(f"{now - 40:.6f}", link(3)),
+        message(f"{now - 35:.6f}", link(6)),
+        message(f"{now - 30:.6f}", f"download {VIDEO}"),  # already downloaded
+        message(f"{now - 20:.6f}", link(4), subtype="bot_message"),
+        message(f"{now - 10:.6f}", f"get {link(5)}"),
+    ])
+    submitted = []
+    backfiller = Backfiller(
+        client,
+        cursors,
+        {"C1"},
+        submit=lambda *m: submitted.append(m) or True,
+        dedup=dedup,
+        index=index,
+        page_interval=0,
+    )
+
+    assert backfiller.run() == 3
+    assert [text for _, _, text, _ in submitted] == [link(2), link(6), f"get {link(5)}"]
+    assert submitted[0][0] == "C1"
+    assert backfiller.stats()["rate_limited"] == 1
+    assert backfiller.stats()["pages"] == 4
+    # Nothing submitted has been processed yet
+    assert cursors.get("C1") == f"{now - 100:.6f}"
+
+    # Workers finish out of order; the cursor stops before the oldest unfinished one
+    cursors.finish("C1", f"{now - 10:.6f}")
+    assert cursors.get("C1") == f"{now - 100:.6f}"
+    cursors.finish("C1", f"{now - 50:.6f}")
+    assert cursors.get("C1") == f"{now - 45:.6f}"
+    cursors.finish("C1", f"{now - 35:.6f}")
+    cursors.finish("C1", f"{now - 40:.6f}")
+    assert cursors.get("C1") == f"{now - 10:.6f}"
+    cursors.save()
+
+    # The cursor is persisted; a second run finds nothing new
+    restarted = ChannelCursors(str(tmp_path / "cursors.json"))
+    assert restarted.get("C1") == f"{now - 10:.6f}"
+    submitted.clear()
+    assert backfiller.run() == 0
+
+
+def test_first_start_only_sets_the_cursor():
+    cursors = ChannelCursors()
+    client = FakeHistoryClient([message("1.0", link(1))], rate_limited=0)
+    backfiller = Backfiller(client, cursors, {"C1"}, submit=lambda *m: True, page_interval=0)
+
+    assert backfiller.run() == 0
+    assert client.calls == []
+    assert float(cursors.get("C1")) > time.time() - 5
+
+
+def test_full_queue_stops_the_backfill_without_losing_messages():
+    now = time.time()
+    cursors = ChannelCursors()
+    cursors.advance("C1", f"{now - 100:.6f}")
+    dedup = EventDeduplicator()
+    client = FakeHistoryClient([message(f"{now - 10:.6f}", link(1))], rate_limited=0)
+    accept = []
+    backfiller = Backfiller(
+        client, cursors, {"C1"}, submit=lambda *m: bool(accept), dedup=dedup, page_interval=0
+    )
+
+    assert backfiller.run() == 0
+    assert cursors.get("C1") == f"{now - 100:.6f}"
+    accept.append(True)
+    assert backfiller.run() == 1
+    # Still queued: a reconnect meanwhile doesn't submit it twice
+    assert backfiller.run() == 0
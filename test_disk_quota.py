@@ -0,0 +1,92 @@
+"""Unit tests for disk-space admission control and LRU eviction"""
+
+import json
+import sqlite3
+import time
+from collections import namedtuple
+
+import pytest
+
+from src.tools import disk_quota
+from src.tools.disk_quota import SIZE_MARKER, DiskQuota, InsufficientSpaceError, parse_size_line
+from src.tools.download_index import DownloadIndex
+
+Usage = namedtuple("Usage", "total used free")
+
+
+def add_video(index, download_dir, video_id, size, requested_at):
+    path = download_dir / f"Video [{video_id}].mp4"
+    path.write_bytes(b"\0" * size)
+    index.add(video_id, str(path), size)
+    with index._conn:
+        index._conn.execute(
+            "UPDATE downloads SET last_requested_at = ? WHERE video_id = ?",
+            (requested_at, video_id),
+        )
+    return path
+
+
+def test_parse_size_line():
+    line = SIZE_MARKER + json.dumps({"filesize": None, "filesize_approx": 5000})
+    assert parse_size_line(line) == 5000
+    line = SIZE_MARKER + json.dumps({"tbr": 800, "duration": 10})
+    assert parse_size_line(line) == 1_000_000
+    assert parse_size_line(SIZE_MARKER + "{}") == 0
+    assert parse_size_line('{"title": "x"}') is None
+
+
+def test_quota_evicts_least_recently_requested(tmp_path):
+    download_dir = tmp_path / "downloads"
+    download_dir.mkdir()
+    index = DownloadIndex(str(tmp_path / "index.sqlite3"))
+    now = time.time()
+    oldest = add_video(index, download_dir, "aaaaaaaaaaa", 400, now - 300)
+    newest = add_video(index, download_dir, "bbbbbbbbbbb", 400, now - 100)
+    middle = add_video(index, download_dir, "ccccccccccc", 400, now - 200)
+    index.touch("aaaaaaaaaaa")  # requested again just now
+
+    quota = DiskQuota(str(download_dir), index, quota_bytes=1500)
+    quota.admit("ddddddddddd", 600)
+
+    assert oldest.exists() and newest.exists()
+    assert not middle.exists()
+    assert index.get("ccccccccccc") is None
+    assert quota.stats()["evicted_bytes"] == 400
+    assert quota.stats()["reserved_bytes"] == 600
+
+    # The reservation counts until it is released
+    with pytest.raises(InsufficientSpaceError):
+        quota.admit("eeeeeeeeeee", 2000)
+    quota.release("ddddddddddd")
+    assert quota.stats()["reserved_bytes"] == 0
+    assert quota.stats()["rejected"] == 1
+
+
+def test_rejected_when_eviction_cannot_free_enough_space(tmp_path, monkeypatch):
+    download_dir = tmp_path / "downloads"
+    download_dir.mkdir()
+    index = DownloadIndex(str(tmp_path / "index.sqlite3"))
+    video = add_video(index, download_dir, "aaaaaaaaaaa", 100, time.time())
+    monkeypatch.setattr(disk_quota.shutil, "disk_usage", lambda path: Usage(10**6, 0, 1000))
+
+    quota = DiskQuota(str(download_dir), index, min_free_bytes=500)
+    quota.admit("bbbbbbbbbbb")  # unknown size: only the free-space floor
+    with pytest.raises(InsufficientSpaceError, match="not enough free disk space"):
+        quota.admit("bbbbbbbbbbb", 5000)
+    # Evicting everything still wasn't enough, but it was tried
+    assert not video.exists()
+
+
+def test_index_adds_request_column_to_old_databases(tmp_path):
+    db_path = tmp_path / "index.sqlite3"
+    with sqlite3.connect(db_path) as conn:
+        conn.execute(
+            "CREATE TABLE downloads (video_id TEXT PRIMARY KEY, file_path TEXT NOT NULL, "
+            "file_size INTEGER NOT NULL, format TEXT, title TEXT, downloaded_at REAL NOT NULL)"
+        )
+        conn.execute("INSERT INTO downloads VALUES ('aaaaaaaaaaa', '/x.mp4', 10, NULL, NULL, 1.0)")
+    conn.close()
+
+    index = DownloadIndex(str(db_path))
+    assert index.total_size() == 10
+    assert index.least_recently_requested()[0].last_requested_at is None
@@ -0,0 +1,54 @@
+"""Unit tests for the persistent download index"""
+
+import time
+
+from src.tools.download_index import DownloadIndex, extract_video_id
+
+
+def test_extract_video_id_is_canonical():
+    """Every URL form of the same video maps to one ID"""
+    urls = [
+        "https://youtu.be/jNQXAC9IVRw",
+        "https://youtu.be/jNQXAC9IVRw?si=abc",
+        "https://www.youtube.com/watch?v=jNQXAC9IVRw&t=30",
+        "https://youtube.com/watch?feature=share&v=jNQXAC9IVRw",
+        "https://www.youtube.com/shorts/jNQXAC9IVRw",
+        "http://m.youtube.com/watch?v=jNQXAC9IVRw",
+    ]
+    assert {extract_video_id(url) for url in urls} == {"jNQXAC9IVRw"}
+    assert extract_video_id("https://www.youtube.com/channel/UC123") is None
+
+
+def test_get_verifies_file_exists(tmp_path):
+    """Entries whose file was deleted are dropped on lookup"""
+    index = DownloadIndex(str(tmp_path / "index.sqlite3"))
+    video = tmp_path / "Video [jNQXAC9IVRw].mp4"
+    video.write_bytes(b"\0" * 10)
+    index.add("jNQXAC9IVRw", str(video), 10, format="18", title="Video")
+
+    start = time.perf_counter()
+    entry = index.get("jNQXAC9IVRw")
+    assert time.perf_counter() - start < 0.05
+    assert entry.file_size == 10
+    assert entry.title == "Video"
+
+    video.unlink()
+    assert index.get("jNQXAC9IVRw") is None
+    assert len(index) == 0
+
+
+def test_rebuild_from_download_dir(tmp_path):
+    """A rebuild indexes files named with a video ID and drops stale entries"""
+    download_dir = tmp_path / "downloads"
+    download_dir.mkdir()
+    (download_dir / "First [aaaaaaaaaaa].mp4").write_bytes(b"\0" * 3)
+    (download_dir / "Second [bbbbbbbbbbb].mp4").write_bytes(b"\0" * 4)
+    (download_dir / "No id in this name.mp4").touch()
+    (download_dir / "Partial [ccccccccccc].mp4.part").touch()
+
+    index = DownloadIndex(str(tmp_path / "index.sqlite3"))
+    index.add("zzzzzzzzzzz", str(download_dir / "Gone [zzzzzzzzzzz].mp4"), 1)
+
+    assert index.rebuild(str(download_dir)) == 2
+    assert index.get("bbbbbbbbbbb").file_size == 4
+    assert index.get("zzzzzzzzzzz") is None
@@ -0,0 +1,143 @@
+"""Unit tests for the download scheduler"""
+
+import threading
+import time
+
+from src.tools.download_scheduler import (
+    LANE_LONG,
+    LANE_NORMAL,
+    LANE_SHORT,
+    DownloadScheduler,
+    classify_lane,
+)
+from src.tools.single_flight import SingleFlight
+
+
+def test_classify_lane():
+    """Shorts and short videos go to the short lane, long streams to the long lane"""
+    assert classify_lane("https://www.youtube.com/shorts/abc123") == LANE_SHORT
+    assert classify_lane("https://youtu.be/abc123") == LANE_NORMAL
+    assert classify_lane("https://youtu.be/abc123", duration=120) == LANE_SHORT
+    assert classify_lane("https://youtu.be/abc123", duration=3 * 3600) == LANE_LONG
+
+
+def test_short_lane_runs_before_queued_long_jobs():
+    """With one slot busy, a later short job is started before earlier long ones"""
+    scheduler = DownloadScheduler(max_concurrent=1, per_user_limit=5)
+    release = threading.Event()
+    order = []
+
+    blocker = scheduler.submit(release.wait, user_id="u1", lane=LANE_NORMAL)
+    long_job = scheduler.submit(lambda: order.append("long"), user_id="u1", lane=LANE_LONG)
+    short_job = scheduler.submit(lambda: order.append("short"), user_id="u1", lane=LANE_SHORT)
+
+    assert scheduler.stats()["queued"] == 2
+    release.set()
+    for future in (blocker, long_job, short_job):
+        future.result(timeout=5)
+
+    assert order == ["short", "long"]
+    scheduler.shutdown()
+
+
+def test_drain_waits_for_running_jobs():
+    """drain reports the jobs that did not finish in time"""
+    scheduler = DownloadScheduler(max_concurrent=2, per_user_limit=2)
+    release = threading.Event()
+    scheduler.submit(lambda: time.sleep(0.05), user_id="u1")
+    scheduler.submit(release.wait, user_id="u1")
+
+    assert scheduler.drain(0.5) == 1
+    release.set()
+    assert scheduler.drain(5) == 0
+    scheduler.shutdown()
+
+
+def test_per_user_limit():
+    """One user can't take every slot while another user is waiting"""
+    scheduler = DownloadScheduler(max_concurrent=2, per_user_limit=1)
+    release = threading.Event()
+    started = []
+
+    def job(name):
+        started.append(name)
+        release.wait()
+        return {"success": True, "file_size": 1024 * 1024}
+
+    futures = [
+        scheduler.submit(lambda: job("a1"), user_id="a"),
+        scheduler.submit(lambda: job("a2"), user_id="a"),
+        scheduler.submit(lambda: job("b1"), user_id="b"),
+    ]
+    time.sleep(0.1)
+    assert sorted(started) == ["a1", "b1"]
+
+    release.set()
+    for future in futures:
+        future.result(timeout=5)
+
+    stats = scheduler.stats()
+    assert stats["completed"] == 3
+    assert stats["total_mb"] == 3
+    assert stats["throughput_jobs_per_min"] > 0
+    scheduler.shutdown()
+
+
+def test_would_start_only_with_a_free_slot():
+    """Lanes (and the duration probe behind them) only matter for jobs that queue"""
+    scheduler = DownloadScheduler(max_concurrent=2, per_user_limit=1)
+    release = threading.Event()
+
+    assert scheduler.would_start("a")
+    blocker = scheduler.submit(release.wait, user_id="a")
+    assert not scheduler.would_start("a")
+    assert scheduler.would_start("b")
+
+    release.set()
+    blocker.result(timeout=5)
+    scheduler.shutdown()
+
+
+def test_single_flight_coalesces_same_video():
+    """A second request for an in-flight video attaches instead of downloading again"""
+    scheduler = DownloadScheduler(max_concurrent=2)
+    single_flight = SingleFlight()
+    release = threading.Event()
+    runs = []
+
+    def download():
+        runs.append(1)
+        release.wait()
+        return {"success": True}
+
+    def start():
+        return scheduler.submit(download, user_id="u")
+
+    first, first_attached = single_flight.do("jNQXAC9IVRw", start)
+    second, second_attached = single_flight.do("jNQXAC9IVRw", start)
+
+    assert (first_attached, second_attached) == (False, True)
+    assert first is second
+
+    release.set()
+    assert first.result(timeout=5) == {"success": True}
+    assert runs == [1]
+    assert single_flight.in_flight() == 0
+
+    # Once finished, the same key starts a new job
+    third, third_attached = single_flight.do("jNQXAC9IVRw", start)
+    assert not third_attached
+    third.result(timeout=5)
+    scheduler.shutdown()
+
+
+def test_submit_after_shutdown_is_cancelled():
+    """Late submissions don't reach the stopped executor or hold a slot"""
+    scheduler = DownloadScheduler(max_concurrent=1)
+    scheduler.shutdown(wait=False)
+
+    future = scheduler.submit(lambda: 1, user_id="u1")
+    assert future.cancelled()
+    assert scheduler.stats()["running"] == 0
+    assert scheduler.stats()["queued"] == 0
+    assert scheduler.drain(1) == 0
@@ -0,0 +1,59 @@
+"""Unit tests for Slack event de-duplication"""
+
+import time
+
+from src.event_dedup import EventDeduplicator, event_keys
+
+
+def payload(event_id="Ev1", client_msg_id="m-1", ts="1.0"):
+    return {
+        "event_id": event_id,
+        "event": {"type": "message", "channel": "C1", "client_msg_id": client_msg_id, "ts": ts},
+    }
+
+
+def test_event_keys_cover_every_id():
+    assert event_keys("env-1", payload()) == [
+        "envelope:env-1",
+        "event:Ev1",
+        "client_msg:m-1",
+        "message:C1:1.0",
+    ]
+    assert event_keys(None, {"event": {}}) == []
+
+
+def test_redelivery_is_a_duplicate_if_any_key_repeats():
+    dedup = EventDeduplicator()
+
+    assert not dedup.is_duplicate(event_keys("env-1", payload()))
+    # Redelivered in a new envelope after a reconnect
+    assert dedup.is_duplicate(event_keys("env-2", payload()))
+    # Same client message with a new event ID
+    assert dedup.is_duplicate(event_keys("env-3", payload(event_id="Ev2")))
+    assert not dedup.is_duplicate(event_keys("env-4", payload("Ev3", "m-2", "2.0")))
+
+    assert dedup.stats()["checked"] == 4
+    assert dedup.stats()["duplicates"] == 2
+
+
+def test_keys_expire_and_are_bounded():
+    dedup = EventDeduplicator(window=0.05, max_size=3)
+    dedup.is_duplicate(["a"])
+    time.sleep(0.1)
+    assert not dedup.is_duplicate(["a"])
+
+    for key in "bcde":
+        dedup.is_duplicate([key])
+    assert dedup.stats()["size"] == 3
+    assert not dedup.is_duplicate(["a"])
+
+
+def test_seen_keys_survive_a_restart(tmp_path):
+    path = str(tmp_path / "dedup.json")
+    dedup = EventDeduplicator(path=path, save_interval=3600)
+    dedup.is_duplicate(event_keys("env-1", payload()))
+    dedup.save()
+
+    restarted = EventDeduplicator(path=path)
+    assert restarted.is_duplicate(event_keys("env-9", payload()))
+    assert not EventDeduplicator(path=path, window=0).is_duplicate(["event:Ev1"])
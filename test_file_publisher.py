@@ -0,0 +1,71 @@
+"""Unit tests for FilePublisher"""
+
+import errno
+import os
+
+import pytest
+
+from src.tools import file_publisher
+from src.tools.file_publisher import FilePublisher
+
+
+def make_source(tmp_path, name="clip [jNQXAC9IVRw].mp4", size=10000):
+    scratch = tmp_path / "scratch"
+    scratch.mkdir(exist_ok=True)
+    source = scratch / name
+    source.write_bytes(os.urandom(size))
+    return source
+
+
+def test_publish_renames_on_the_same_volume(tmp_path):
+    source = make_source(tmp_path)
+    data = source.read_bytes()
+    target_dir = tmp_path / "icloud"
+    target_dir.mkdir()
+    (target_dir / source.name).write_bytes(b"old")
+
+    publisher = FilePublisher(str(target_dir))
+    published = publisher.publish(source)
+
+    assert published == target_dir / source.name
+    assert published.read_bytes() == data
+    assert not source.exists()
+    stats = publisher.stats()
+    assert stats["renamed"] == 1 and stats["copied"] == 0
+    assert stats["avg_visible_ms"] is not None
+
+
+def test_publish_copies_across_volumes(tmp_path, monkeypatch):
+    """A cross-device rename falls back to a streamed copy swapped in atomically"""
+    source = make_source(tmp_path)
+    data = source.read_bytes()
+    target_dir = tmp_path / "icloud"
+    target_dir.mkdir()
+    real_replace = os.replace
+
+    def replace(src, dst):
+        if str(src) == str(source):
+            raise OSError(errno.EXDEV, "Invalid cross-device link")
+        real_replace(src, dst)
+
+    monkeypatch.setattr(file_publisher.os, "replace", replace)
+    monkeypatch.setattr(file_publisher, "COPY_BUFFER_SIZE", 4096)
+
+    publisher = FilePublisher(str(target_dir))
+    published = publisher.publish(source)
+
+    assert published.read_bytes() == data
+    assert not source.exists()
+    assert [p.name for p in target_dir.iterdir()] == [source.name]
+    assert publisher.stats()["copied"] == 1
+
+
+def test_failed_publish_keeps_the_source(tmp_path):
+    source = make_source(tmp_path)
+    publisher = FilePublisher(str(tmp_path / "missing"))
+
+    with pytest.raises(OSError):
+        publisher.publish(source)
+
+    assert source.exists()
+    assert publisher.stats()["failed"] == 1
@@ -0,0 +1,71 @@
+"""Unit tests for the local intent classifier"""
+
+import json
+import time
+
+from src.chains.intent_classifier import (
+    ConfidentIntentClassifier,
+    IntentClassifier,
+    main,
+    tokenize,
+)
+
+URL = "https://youtu.be/jNQXAC9IVRw"
+
+POSITIVE = [
+    f"{URL} 이거 좀 받아줄래요?",
+    f"can you grab a copy of this for me {URL}",
+    f"{URL} 나중에 보려고 하는데 저장 부탁",
+    f"please keep this one for the archive {URL}",
+    f"{URL} 다운로드 해주세요",
+    f"could you save this video for later {URL}",
+]
+NEGATIVE = [
+    f"what do you all think of this talk {URL}",
+    f"{URL} 이 영상 진짜 웃기네요 ㅋㅋ",
+    f"haha this reminds me of our meeting {URL}",
+    f"{URL} 이거 어제 본 건데 재밌었어요",
+    f"saw this during lunch, thoughts? {URL}",
+    f"let's get together and watch {URL}",
+]
+
+
+def test_tokenize_handles_korean_and_urls():
+    assert tokenize(f"{URL} 저장해줘 Please") == ["__url__", "저장해줘", "please"]
+
+
+def test_trained_model_separates_intents():
+    model = IntentClassifier(num_features=2**14)
+    model.fit(POSITIVE + NEGATIVE, [True] * len(POSITIVE) + [False] * len(NEGATIVE))
+
+    assert all(model.predict_proba(text) > 0.5 for text in POSITIVE)
+    assert all(model.predict_proba(text) < 0.5 for text in NEGATIVE)
+
+    start = time.perf_counter()
+    for _ in range(100):
+        model.predict_proba(POSITIVE[0])
+    assert (time.perf_counter() - start) / 100 < 0.001
+
+
+def test_low_confidence_defers_to_llm():
+    classifier = ConfidentIntentClassifier(IntentClassifier(num_features=2**10))
+    # An untrained model predicts 0.5 for everything
+    assert classifier.classify(POSITIVE[0]) is None
+    assert classifier.stats() == {"confident": 0, "deferred": 1}
+
+
+def test_train_and_eval_command(tmp_path, capsys):
+    log_path = tmp_path / "decisions.jsonl"
+    with open(log_path, "w", encoding="utf-8") as f:
+        for text, intent in [(t, True) for t in POSITIVE] + [(t, False) for t in NEGATIVE]:
+            f.write(json.dumps({"message": text, "download_intent": intent}) + "\n")
+    model_path = str(tmp_path / "model.npz")
+
+    main(["train", "--log", str(log_path), "--model", model_path])
+    main(["eval", "--log", str(log_path), "--model", model_path])
+
+    output = capsys.readouterr().out
+    assert "Saved model" in output
+    assert "coverage" in output
+    loaded = IntentClassifier.load(model_path)
+    assert loaded.predict_proba(POSITIVE[0]) > 0.5
@@ -0,0 +1,56 @@
+"""Unit tests for the download job journal"""
+
+from src.tools.job_journal import (
+    JOB_DONE,
+    JOB_FAILED,
+    JOB_INTERRUPTED,
+    JOB_QUEUED,
+    JOB_RUNNING,
+    JobJournal,
+)
+
+URL = "https://youtu.be/jNQXAC9IVRw"
+
+
+def test_unfinished_jobs_survive_a_restart(tmp_path):
+    path = str(tmp_path / "jobs.sqlite3")
+    journal = JobJournal(path)
+    crashed = journal.add(URL, "C1", "1.0", "U1")
+    journal.update(crashed, JOB_RUNNING)
+    queued = journal.add(URL + "x", "C1", "2.0", "U2")
+    finished = journal.add(URL + "y", "C1", "3.0", "U1")
+    journal.update(finished, JOB_RUNNING)
+    journal.update(finished, JOB_DONE)
+    journal.close()
+
+    restarted = JobJournal(path)
+    jobs = restarted.unfinished()
+    assert [job.job_id for job in jobs] == [crashed, queued]
+    assert jobs[0].state == JOB_RUNNING
+    assert jobs[0].attempts == 1
+    assert (jobs[0].channel_id, jobs[0].thread_ts, jobs[0].user_id) == ("C1", "1.0", "U1")
+    assert restarted.history(finished) == [JOB_QUEUED, JOB_RUNNING, JOB_DONE]
+
+
+def test_interrupted_and_failed_jobs(tmp_path):
+    journal = JobJournal(str(tmp_path / "jobs.sqlite3"))
+    interrupted = journal.add(URL, "C1", "1.0", "U1")
+    journal.update(interrupted, JOB_INTERRUPTED, "shutdown")
+    failed = journal.add(URL, "C1", "2.0", "U1")
+    journal.update(failed, JOB_FAILED, "Video unavailable")
+
+    assert [job.job_id for job in journal.unfinished()] == [interrupted]
+    assert journal.get(failed).error == "Video unavailable"
+
+
+def test_prune_removes_old_finished_jobs(tmp_path):
+    journal = JobJournal(str(tmp_path / "jobs.sqlite3"))
+    done = journal.add(URL, "C1", "1.0", "U1")
+    journal.update(done, JOB_DONE)
+    pending = journal.add(URL, "C1", "2.0", "U1")
+
+    assert journal.prune(max_age=3600) == 0
+    assert journal.prune(max_age=-1) == 1
+    assert journal.get(done) is None
+    assert journal.history(done) == []
+    assert journal.get(pending) is not None
@@ -0,0 +1,143 @@
+"""Unit tests for the shared Ollama client helpers"""
+
+from types import SimpleNamespace
+
+import httpx
+import pytest
+from langchain_core.language_models.fake_chat_models import FakeListChatModel
+
+from src.llm import (
+    LLMLatencyTracker,
+    OllamaBackend,
+    OllamaRouter,
+    create_chat_ollama,
+    create_ollama_llm,
+    parse_keep_alive,
+    warm_up_model,
+)
+
+
+class FakeOllama(FakeListChatModel):
+    """Scripted chat model standing in for one Ollama server"""
+
+    base_url: str = "http://localhost:11434"
+    down: bool = False
+
+    def _generate(self, *args, **kwargs):
+        if self.down:
+            raise httpx.ConnectError("connection refused")
+        return super()._generate(*args, **kwargs)
+
+    def _stream(self, *args, **kwargs):
+        if self.down:
+            raise httpx.ConnectError("connection refused")
+        yield from super()._stream(*args, **kwargs)
+
+
+def test_parse_keep_alive():
+    assert parse_keep_alive("-1") == -1
+    assert parse_keep_alive("300") == 300
+    assert parse_keep_alive("30m") == "30m"
+
+
+def test_latency_tracker_records_first_token_and_total():
+    tracker = LLMLatencyTracker(budget_seconds=10)
+    llm = FakeListChatModel(responses=["hello", "world"], callbacks=[tracker])
+
+    list(llm.stream("hi"))
+    llm.invoke("hi")
+
+    stats = tracker.stats()
+    assert stats["calls"] == 2
+    assert stats["over_budget"] == 0
+    assert stats["first_token"]["p50_ms"] is not None
+    assert stats["total"]["max_ms"] >= stats["first_token"]["max_ms"]
+
+
+def test_shared_client_settings():
+    llm = create_chat_ollama("gemma3:4b", "http://localhost:11434", keep_alive=-1, num_predict=64)
+    assert llm.keep_alive == -1
+    assert llm.num_predict == 64
+    assert llm.client_kwargs["limits"].max_keepalive_connections == 10
+    assert "timeout" not in llm.client_kwargs
+
+    # Abandoned calls must end: the HTTP timeout follows the call deadline
+    llm = create_chat_ollama("gemma3:4b", "http://localhost:11434", call_deadline=4.0)
+    timeout = llm.client_kwargs["timeout"]
+    assert 4.0 < timeout.read <= 6.0
+    assert timeout.connect <= timeout.read
+
+
+def test_warm_up_loads_model_with_keep_alive():
+    calls = []
+    fake_client = SimpleNamespace(generate=lambda **kwargs: calls.append(kwargs))
+    llm = SimpleNamespace(
+        model="gemma3:4b", base_url="http://localhost:11434", keep_alive="30m", _client=fake_client
+    )
+
+    assert warm_up_model(llm) is not None
+    assert calls == [{"model": "gemma3:4b", "prompt": "", "keep_alive": "30m", "options": None}]
+
+
+def make_router(*urls):
+    backends = [OllamaBackend(FakeOllama(base_url=url, responses=[url] * 10)) for url in urls]
+    return OllamaRouter(backends=backends)
+
+
+def test_router_prefers_the_least_loaded_backend():
+    router = make_router("http://a", "http://b")
+    a, b = router.backends
+    a.latency, b.latency = 0.5, 0.2
+    assert router.invoke("hi").content == "http://b"
+
+    b.in_flight = 3  # 4 x 0.2 s queued on b vs 1 x 0.5 s on a
+    assert router.invoke("hi").content == "http://a"
+    assert router.stats()["http://a"]["requests"] == 1
+
+
+def test_router_fails_over_to_a_healthy_backend():
+    router = make_router("http://a", "http://b")
+    a, b = router.backends
+    a.llm.down = True
+    b.latency = 1.0  # a would be picked first
+
+    assert router.invoke("hi").content == "http://b"
+    assert not a.healthy
+    assert "".join(chunk.content for chunk in router.stream("hi")) == "http://b"
+    assert router.stats()["http://a"]["failures"] == 1  # unhealthy a is tried last
+
+    b.llm.down = True
+    with pytest.raises(httpx.ConnectError):
+        router.invoke("hi")
+
+
+def test_single_host_gets_a_plain_client():
+    assert not isinstance(create_ollama_llm("gemma3:4b", "http://localhost:11434"), OllamaRouter)
+
+    router = create_ollama_llm("gemma3:4b", "http://a:11434, http://b:11434")
+    router.stop_health_checks()
+    assert [backend.url for backend in router.backends] == ["http://a:11434", "http://b:11434"]
+
+
+def test_latency_tracker_counts_tokens_and_early_stops():
+    tracker = LLMLatencyTracker()
+    llm = FakeListChatModel(responses=["abcdef"], callbacks=[tracker])
+
+    stream = llm.stream("hi")
+    next(stream)
+    next(stream)
+    stream.close()
+
+    stats = tracker.stats()
+    assert stats["errors"] == 0
+    assert stats["stopped_early"] == 1
+    assert stats["tokens"]["completion_total"] == 2
+
+
+def test_latency_tracker_reads_ollama_usage():
+    generation = SimpleNamespace(
+        generation_info={"prompt_eval_count": 420, "eval_count": 12, "prompt_eval_duration": 5e7},
+        message=SimpleNamespace(usage_metadata=None),
+    )
+    usage = LLMLatencyTracker._usage(SimpleNamespace(generations=[[generation]]))
+    assert usage == {"prompt_tokens": 420, "completion_tokens": 12, "prefill": 0.05}
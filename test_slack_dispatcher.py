@@ -0,0 +1,138 @@
+"""Unit tests for the outbound Slack dispatcher (the Web API is faked)"""
+
+import asyncio
+import time
+from types import SimpleNamespace
+
+from slack_sdk.errors import SlackApiError
+
+from src.slack_dispatcher import AsyncSlackDispatcher, SlackDispatcher
+
+
+class FakeWebClient:
+    """Records calls; the first `rate_limited` calls answer 429"""
+
+    def __init__(self, rate_limited=0):
+        self.calls = []
+        self.rate_limited = rate_limited
+
+    def _call(self, method, **kwargs):
+        self.calls.append((method, time.monotonic(), kwargs))
+        if self.rate_limited:
+            self.rate_limited -= 1
+            response = SimpleNamespace(status_code=429, headers={"Retry-After": "0.1"})
+            raise SlackApiError("ratelimited", response)
+        return {"ok": True, "ts": f"ts-{len(self.calls)}"}
+
+    def chat_postMessage(self, **kwargs):
+        return self._call("post", **kwargs)
+
+    def chat_update(self, **kwargs):
+        return self._call("update", **kwargs)
+
+
+class FakeAsyncWebClient(FakeWebClient):
+    """FakeWebClient with coroutine methods, like AsyncWebClient"""
+
+    async def chat_postMessage(self, **kwargs):
+        return self._call("post", **kwargs)
+
+    async def chat_update(self, **kwargs):
+        return self._call("update", **kwargs)
+
+
+def test_queued_posts_to_a_thread_are_merged():
+    client = FakeWebClient()
+    dispatcher = SlackDispatcher(client)
+    handles = [dispatcher.post("C1", f"line {n}", thread_ts="1.0") for n in range(3)]
+    dispatcher.post("C1", "other thread", thread_ts="2.0")
+
+    dispatcher.start()
+    dispatcher.stop(timeout=5)
+
+    posts = [kwargs for method, _, kwargs in client.calls if method == "post"]
+    assert posts[0] == {"channel": "C1", "text": "line 0\nline 1\nline 2", "thread_ts": "1.0"}
+    assert posts[1]["text"] == "other thread"
+    assert all(handle.result(timeout=1)["ts"] == "ts-1" for handle in handles)
+    assert dispatcher.stats()["merged_posts"] == 2
+
+
+def test_edits_collapse_to_the_latest_text():
+    client = FakeWebClient()
+    dispatcher = SlackDispatcher(client)
+    status = dispatcher.post("C1", "⏳ 0%", thread_ts="1.0")
+    done = dispatcher.post("C1", "queued", thread_ts="1.0")
+    dispatcher.update("C1", status, "⏳ 10%")  # applied to the queued post
+
+    dispatcher.start()
+    status.result(timeout=1)
+    for percent in (20, 30, 40):
+        dispatcher.update("C1", status, f"⏳ {percent}%")
+    dispatcher.update("C1", done, "✅ done")
+    dispatcher.stop(timeout=5)
+
+    assert [(method, kwargs["text"]) for method, _, kwargs in client.calls] == [
+        ("post", "⏳ 10%\nqueued"),
+        ("update", "⏳ 40%\n✅ done"),
+    ]
+    assert client.calls[1][2]["ts"] == "ts-1"
+
+
+def test_rate_limited_calls_wait_for_retry_after():
+    client = FakeWebClient(rate_limited=1)
+    dispatcher = SlackDispatcher(client)
+    dispatcher.start()
+    handle = dispatcher.post("C1", "hello")
+
+    assert handle.result(timeout=5)["ok"]
+    dispatcher.stop(timeout=5)
+    (_, first, _), (_, second, _) = client.calls
+    assert second - first >= 0.1
+    stats = dispatcher.stats()
+    assert stats["rate_limited"] == 1
+    assert stats["sent"] == 1
+    assert stats["failed"] == 0
+
+
+def test_each_channel_has_its_own_token_bucket():
+    client = FakeWebClient()
+    dispatcher = SlackDispatcher(client, rate=10, burst=1)
+    dispatcher.post("C1", "first", thread_ts="1.0")
+    dispatcher.post("C1", "second", thread_ts="2.0")
+    dispatcher.post("C2", "other channel")
+    dispatcher.start()
+    dispatcher.stop(timeout=5)
+
+    times = {}
+    for _, at, kwargs in client.calls:
+        times.setdefault(kwargs["channel"], []).append(at)
+    assert times["C1"][1] - times["C1"][0] >= 0.08
+    assert times["C2"][0] - times["C1"][0] < 0.05
+
+
+def test_async_dispatcher_merges_and_waits_for_retry_after():
+    """The async runtime gets the same merging, coalescing and 429 handling"""
+    client = FakeAsyncWebClient(rate_limited=1)
+    dispatcher = AsyncSlackDispatcher(client)
+
+    async def scenario():
+        status = dispatcher.post("C1", "⏳ 0%", thread_ts="1.0")
+        dispatcher.post("C1", "queued", thread_ts="1.0")
+        dispatcher.start()
+        while status._post.ts is None:
+            await asyncio.sleep(0.01)
+        for percent in (20, 30):
+            dispatcher.update("C1", status, f"⏳ {percent}%")
+        await dispatcher.stop(timeout=5)
+
+    asyncio.run(scenario())
+    assert [(method, kwargs["text"]) for method, _, kwargs in client.calls] == [
+        ("post", "⏳ 0%\nqueued"),
+        ("post", "⏳ 0%\nqueued"),
+        ("update", "⏳ 30%\nqueued"),
+    ]
+    assert client.calls[1][1] - client.calls[0][1] >= 0.1
+    stats = dispatcher.stats()
+    assert stats["merged_posts"] == 1
+    assert stats["coalesced_edits"] == 1
+    assert stats["rate_limited"] == 1
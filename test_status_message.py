@@ -0,0 +1,24 @@
+"""Unit tests for the throttled Slack status message"""
+
+from src.agents.status_message import ThrottledStatus
+
+
+def test_updates_are_throttled_but_forced_ones_go_through():
+    sent = []
+    status = ThrottledStatus(sent.append, interval=60)
+
+    assert status.update("10%")
+    assert not status.update("20%")
+    assert not status.update("30%")
+    assert status.update("done", force=True)
+    assert not status.update("done", force=True)
+
+    assert sent == ["10%", "done"]
+    assert (status.sent, status.dropped) == (2, 2)
+
+
+def test_failed_update_does_not_raise():
+    def broken(text):
+        raise RuntimeError("message_not_found")
+
+    assert ThrottledStatus(broken, interval=0).update("10%")
@@ -0,0 +1,339 @@
+"""Unit tests for URL extraction (the LLM is replaced by a scripted fake)"""
+
+import asyncio
+import time
+
+import pytest
+from langchain_core.language_models.fake_chat_models import FakeListChatModel
+
+from src.chains.circuit_breaker import (
+    STATE_CLOSED,
+    STATE_OPEN,
+    CircuitBreaker,
+    CircuitOpenError,
+)
+from src.chains.url_extraction import (
+    MODE_LLM,
+    TIER_DEGRADED,
+    TIER_LLM,
+    TIER_NO_URL,
+    TIER_RULE,
+    URLExtractionChain,
+)
+
+URL = "https://www.youtube.com/watch?v=jNQXAC9IVRw"
+LLM_ANSWER = f'{{"urls": ["{URL}"], "download_intent": false, "reasoning": "sharing"}}'
+
+
+def make_chain(mode="tiered", responses=None):
+    """Build a chain whose LLM answers from a fixed list"""
+    llm = FakeListChatModel(responses=responses or [LLM_ANSWER] * 10)
+    return URLExtractionChain(llm, mode=mode), llm
+
+
+def test_link_free_messages_skip_the_llm():
+    chain, llm = make_chain()
+    result = chain.extract("let's get together for lunch")
+
+    assert result == {"urls": [], "download_intent": False, "tier": TIER_NO_URL}
+    assert llm.i == 0
+
+
+def test_clear_cases_are_decided_by_rules():
+    chain, llm = make_chain()
+
+    bare = chain.extract(URL)
+    assert bare["tier"] == TIER_RULE
+    assert bare["urls"] == [URL]
+    assert bare["download_intent"]
+
+    keyword = chain.extract(f"{URL} 이거 저장해줘 부탁해요 감사합니다")
+    assert keyword["tier"] == TIER_RULE
+    assert keyword["download_intent"]
+
+    assert llm.i == 0
+    assert chain.tier_stats() == {TIER_RULE: 2}
+
+
+def test_ambiguous_messages_go_to_the_llm():
+    chain, llm = make_chain()
+
+    result = chain.extract(f"what do you all think of this talk {URL}")
+    assert result["tier"] == TIER_LLM
+    assert not result["download_intent"]
+
+    negated = chain.extract(f"please don't download {URL}")
+    assert negated["tier"] == TIER_LLM
+    assert llm.i == 2
+
+
+def test_llm_mode_always_calls_the_llm():
+    chain, llm = make_chain(mode=MODE_LLM)
+    chain.extract(URL)
+    assert llm.i == 1
+
+
+def test_cache_answers_repeated_messages(tmp_path):
+    """A repeated ambiguous message is answered from the cache, also after a restart"""
+    from src.chains.extraction_cache import ExtractionCache
+
+    path = str(tmp_path / "cache.json")
+    message = f"what do you all think of this talk {URL}"
+
+    cache = ExtractionCache(max_size=10, ttl=60, path=path)
+    chain, llm = make_chain()
+    chain.cache = cache
+
+    assert chain.extract(message)["tier"] == TIER_LLM
+    cached = chain.extract(f"  what do you all think of   this talk {URL} ")
+    assert cached["tier"] == "cache"
+    assert cached["urls"] == [URL]
+    assert llm.i == 1
+    assert cache.stats()["hits"] == 1
+    cache.save()
+
+    restarted = ExtractionCache(max_size=10, ttl=60, path=path)
+    assert restarted.get(message)["urls"] == [URL]
+
+
+def test_cache_evicts_least_recently_used_and_expired():
+    from src.chains.extraction_cache import ExtractionCache
+
+    cache = ExtractionCache(max_size=2, ttl=60)
+    cache.put("a", {"urls": []})
+    cache.put("b", {"urls": []})
+    cache.get("a")
+    cache.put("c", {"urls": []})
+    assert cache.get("b") is None
+    assert cache.get("a") is not None
+
+    expired = ExtractionCache(max_size=2, ttl=0.001)
+    expired.put("a", {"urls": []})
+    time.sleep(0.01)
+    assert expired.get("a") is None
+
+
+def test_micro_batcher_groups_concurrent_requests():
+    """Requests submitted within the window are processed in one batch"""
+    import threading
+
+    from src.chains.batching import MicroBatcher
+
+    batches = []
+
+    def process_batch(items):
+        batches.append(list(items))
+        time.sleep(0.02)
+        return [item * 2 for item in items]
+
+    batcher = MicroBatcher(process_batch, window=0.2, max_batch_size=4)
+    results = {}
+
+    def call(n):
+        results[n] = batcher.submit(n, timeout=5)
+
+    threads = [threading.Thread(target=call, args=(n,)) for n in range(4)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    assert results == {0: 0, 1: 2, 2: 4, 3: 6}
+    assert len(batches) == 1
+    assert batcher.stats()["avg_batch_size"] == 4
+
+    # A lone request is processed on its own and sets the unbatched baseline
+    assert batcher.submit(5, timeout=5) == 10
+    assert batcher.stats()["throughput_gain"] > 1
+    batcher.shutdown()
+
+
+def test_micro_batcher_wait_is_bounded():
+    """A hung batch doesn't hold the caller past max_wait"""
+    import threading
+    from concurrent.futures import TimeoutError as FutureTimeoutError
+
+    import pytest
+
+    from src.chains.batching import MicroBatcher
+
+    release = threading.Event()
+    batcher = MicroBatcher(
+        lambda items: release.wait(5) and items, window=0.01, max_wait=0.1
+    )
+    with pytest.raises(FutureTimeoutError):
+        batcher.submit(1)
+    release.set()
+    batcher.shutdown()
+
+
+def test_chain_with_batching_enabled():
+    llm = FakeListChatModel(responses=[LLM_ANSWER] * 10)
+    chain = URLExtractionChain(llm, batch_window=0.01)
+
+    result = chain.extract(f"what do you all think of this talk {URL}")
+    assert result["tier"] == TIER_LLM
+    assert result["urls"] == [URL]
+    chain.batcher.shutdown()
+
+
+def test_classifier_mode_and_decision_log(tmp_path):
+    """Confident classifier answers skip the LLM; LLM answers are logged for training"""
+    import json
+
+    class StubClassifier:
+        def __init__(self, decision):
+            self.decision = decision
+
+        def classify(self, text):
+            return self.decision
+
+    log_path = tmp_path / "decisions.jsonl"
+    llm = FakeListChatModel(responses=[LLM_ANSWER] * 10)
+    message = f"what do you all think of this talk {URL}"
+
+    confident = URLExtractionChain(llm, mode="classifier", classifier=StubClassifier(True))
+    result = confident.extract(message)
+    assert result["tier"] == "classifier"
+    assert result["download_intent"]
+    assert llm.i == 0
+
+    unsure = URLExtractionChain(
+        llm,
+        mode="classifier",
+        classifier=StubClassifier(None),
+        decision_log_path=str(log_path),
+    )
+    assert unsure.extract(message)["tier"] == TIER_LLM
+    record = json.loads(log_path.read_text(encoding="utf-8"))
+    assert record["message"] == message
+    assert record["download_intent"] is False
+
+
+def test_streaming_parser_stops_before_reasoning():
+    from src.chains.streaming_parser import StreamingIntentParser
+
+    answer = f'{{"urls": ["{URL}"], "download_intent": true, "reasoning": "long text"}}'
+    parser = StreamingIntentParser()
+    consumed = 0
+    for char in answer:
+        consumed += 1
+        if parser.feed(char):
+            break
+
+    assert parser.urls == [URL]
+    assert parser.download_intent is True
+    assert consumed < answer.index("reasoning")
+
+
+def test_streaming_extraction_closes_stream_early():
+    """The chain reads only as many chunks as it needs, and respects the budget"""
+    from langchain_core.runnables import RunnableGenerator
+
+    answer = f'{{"urls": ["{URL}"], "download_intent": true, "reasoning": "{"x" * 500}"}}'
+    read = []
+
+    def fake_stream(_inputs):
+        for char in answer:
+            read.append(char)
+            yield char
+
+    chain, _ = make_chain()
+    chain.streaming = True
+    chain.chain = RunnableGenerator(fake_stream)
+
+    urls, intent = chain._query_llm(f"hmm {URL}")
+    assert urls == [URL]
+    assert intent is True
+    assert len(read) < 100
+
+    read.clear()
+    chain.max_output_tokens = 10
+    assert chain._query_llm(f"hmm {URL}") == ([], False)
+    assert len(read) == 10
+
+
+def test_circuit_breaker_opens_on_slow_calls_and_probes_again():
+    breaker = CircuitBreaker(deadline=0.05, latency_budget=0.02, min_calls=2, cooldown=0.1)
+    results = iter(["slow", "slow", "fast"])
+
+    def call():
+        if next(results) == "slow":
+            time.sleep(0.1)
+        return "ok"
+
+    for _ in range(2):
+        with pytest.raises(TimeoutError):
+            breaker.call(call)
+    assert breaker.state == STATE_OPEN
+    with pytest.raises(CircuitOpenError):
+        breaker.call(call)
+
+    time.sleep(0.15)
+    assert breaker.call(call) == "ok"
+    assert breaker.state == STATE_CLOSED
+    stats = breaker.stats()
+    assert stats["timeouts"] == 2
+    assert stats["rejected"] == 1
+    assert stats["transitions"] == {"closed->open": 1, "open->half_open": 1, "half_open->closed": 1}
+
+
+def test_open_breaker_skips_the_llm():
+    llm = FakeListChatModel(responses=[LLM_ANSWER] * 10)
+    breaker = CircuitBreaker(cooldown=60)
+    chain = URLExtractionChain(llm, mode=MODE_LLM, breaker=breaker)
+    breaker._set_state(STATE_OPEN, "test")
+
+    result = chain.extract(f"please download {URL}")
+    assert result == {"urls": [URL], "download_intent": True, "tier": TIER_DEGRADED}
+    assert llm.i == 0
+
+
+def test_long_messages_are_trimmed_around_urls():
+    chain, _ = make_chain(mode=MODE_LLM)
+    chain.max_message_chars = 400
+    filler = "blah " * 200
+    message = f"pls download this {filler}{URL} 이거요 {filler}"
+
+    trimmed = chain._trim_message(message)
+    assert len(trimmed) <= 400
+    assert trimmed.startswith("pls download this")
+    assert URL in trimmed
+    assert chain._trim_message("short " + URL) == "short " + URL
+
+    # Many links squeeze the context, but every URL stays whole
+    urls = [f"https://www.youtube.com/watch?v=video{i:06d}" for i in range(12)]
+    many = "save these " + "".join(f"{filler}{url} " for url in urls)
+    trimmed = chain._trim_message(many)
+    assert all(url in trimmed for url in urls)
+
+
+def test_llm_results_gain_the_urls_it_missed():
+    second = "https://youtu.be/dQw4w9WgXcQ"
+    chain, _ = make_chain(mode=MODE_LLM)
+    result = chain.extract(f"what do you all think of {URL} and {second}")
+
+    assert result["urls"] == [URL, second]
+    assert result["tier"] == TIER_LLM
+    # The same video in another URL form isn't added twice
+    assert chain._llm_result(f"{URL} youtu.be/jNQXAC9IVRw", [URL], False)["urls"] == [URL]
+
+
+def test_async_extraction_matches_sync():
+    chain, llm = make_chain()
+
+    result = asyncio.run(chain.aextract(f"what do you all think of this talk {URL}"))
+    assert result["tier"] == TIER_LLM
+    assert result["urls"] == [URL]
+    assert not result["download_intent"]
+    assert asyncio.run(chain.aextract(URL))["tier"] == TIER_RULE
+    assert llm.i == 1
+
+
+def test_circuit_breaker_acall_times_out():
+    breaker = CircuitBreaker(deadline=0.05, latency_budget=0.02, min_calls=1, cooldown=60)
+
+    with pytest.raises(TimeoutError):
+        asyncio.run(breaker.acall(lambda: asyncio.sleep(1)))
+    assert breaker.state == STATE_OPEN
+    assert breaker.stats()["timeouts"] == 1
@@ -0,0 +1,64 @@
+"""Unit tests for the bounded message work queue"""
+
+import threading
+import time
+
+from src.work_queue import WorkQueue
+
+
+def test_jobs_run_concurrently():
+    """A burst of slow jobs is spread over the worker pool"""
+    started = threading.Barrier(3, timeout=2)
+
+    def handler(n):
+        # All three workers must be inside the handler at the same time
+        started.wait()
+
+    work_queue = WorkQueue(handler, max_size=10, num_workers=3)
+    work_queue.start()
+    for n in range(3):
+        assert work_queue.submit(n)
+    work_queue.stop(timeout=5)
+
+    stats = work_queue.stats()
+    assert stats["processed"] == 3
+    assert stats["failed"] == 0
+
+
+def test_full_queue_rejects_after_timeout():
+    """Submitting to a full queue applies backpressure, then rejects"""
+    release = threading.Event()
+    work_queue = WorkQueue(lambda: release.wait(), max_size=1, num_workers=1, put_timeout=0.05)
+    work_queue.start()
+
+    assert work_queue.submit()  # picked up by the only worker
+    time.sleep(0.05)
+    assert work_queue.submit()  # waits in the queue
+    assert not work_queue.submit()  # queue full
+
+    release.set()
+    work_queue.stop(timeout=5)
+
+    stats = work_queue.stats()
+    assert stats["rejected"] == 1
+    assert stats["processed"] == 2
+    assert stats["wait_ms_max"] > 0
+
+
+def test_handler_errors_do_not_kill_workers():
+    """An exception in one job doesn't stop the worker from taking the next"""
+    results = []
+
+    def handler(n):
+        if n == 0:
+            raise ValueError("boom")
+        results.append(n)
+
+    work_queue = WorkQueue(handler, max_size=10, num_workers=1)
+    work_queue.start()
+    work_queue.submit(0)
+    work_queue.submit(1)
+    work_queue.stop(timeout=5)
+
+    assert results == [1]
+    assert work_queue.stats()["failed"] == 1
@@ -0,0 +1,317 @@
+"""Unit tests for YouTubeDownloadTool (yt-dlp is replaced by a fake process)"""
+
+import asyncio
+import io
+import json
+import os
+import subprocess
+import sys
+import textwrap
+import threading
+import time
+
+import pytest
+
+from src.tools import youtube_tool
+from src.tools.progress import PROGRESS_MARKER, parse_progress_line
+from src.tools.youtube_tool import YouTubeDownloadTool
+
+
+def fake_run_factory(calls, stdout="", returncode=0, create=None):
+    """Build a subprocess.run replacement that records the commands it gets"""
+
+    def fake_run(command, **kwargs):
+        calls.append(command)
+        if create is not None:
+            create.write_bytes(b"\0" * 2048)
+        return subprocess.CompletedProcess(command, returncode, stdout=stdout, stderr="")
+
+    return fake_run
+
+
+def fake_popen_factory(calls, stdout="", returncode=0, create=None):
+    """Build a subprocess.Popen replacement that streams canned output"""
+
+    class FakePopen:
+        def __init__(self, command, **kwargs):
+            calls.append(command)
+            if create is not None:
+                create.write_bytes(b"\0" * 2048)
+            self.stdout = io.StringIO(stdout)
+            self.returncode = returncode
+
+        def wait(self, timeout=None):
+            return self.returncode
+
+        def poll(self):
+            return self.returncode
+
+        def kill(self):
+            pass
+
+    return FakePopen
+
+
+def test_download_is_a_single_ytdlp_call(tmp_path, monkeypatch):
+    """Metadata and the final path come from the download process itself"""
+    target = tmp_path / "Me at the zoo.mp4"
+    printed = json.dumps(
+        {
+            "id": "jNQXAC9IVRw",
+            "title": "Me at the zoo",
+            "duration": 19,
+            "uploader": "jawed",
+            "filepath": str(target),
+        }
+    )
+    calls = []
+    monkeypatch.setattr(
+        youtube_tool.subprocess, "Popen", fake_popen_factory(calls, printed + "\n", create=target)
+    )
+
+    tool = YouTubeDownloadTool(download_dir=str(tmp_path))
+    result = json.loads(tool._run("https://youtu.be/jNQXAC9IVRw"))
+
+    assert len(calls) == 1
+    assert "--dump-json" not in calls[0]
+    assert result["success"]
+    assert result["file_path"] == str(target)
+    assert result["file_size"] == 2048
+    assert result["video_id"] == "jNQXAC9IVRw"
+    assert result["duration"] == 19
+    assert result["uploader"] == "jawed"
+
+
+def test_get_video_info_skips_download(tmp_path, monkeypatch):
+    """The metadata-only probe never downloads"""
+    printed = json.dumps({"id": "abc", "title": "T", "duration": 5, "uploader": "u"})
+    calls = []
+    monkeypatch.setattr(youtube_tool.subprocess, "run", fake_run_factory(calls, printed))
+
+    tool = YouTubeDownloadTool(download_dir=str(tmp_path))
+    info = tool.get_video_info("https://youtu.be/abc")
+
+    assert "--skip-download" in calls[0]
+    assert info["id"] == "abc"
+    assert info["title"] == "T"
+
+
+def test_unreported_path_is_not_guessed(tmp_path, monkeypatch):
+    """Without a reported path the tool fails instead of picking another job's file"""
+    (tmp_path / "Someone else's video.mp4").touch()
+    printed = json.dumps({"id": "abc", "title": "T"})
+    monkeypatch.setattr(youtube_tool.subprocess, "Popen", fake_popen_factory([], printed))
+
+    tool = YouTubeDownloadTool(download_dir=str(tmp_path))
+    result = json.loads(tool._run("https://youtu.be/abc"))
+
+    assert not result["success"]
+    assert result["file_path"] is None
+
+
+def test_indexed_video_skips_ytdlp(tmp_path, monkeypatch):
+    """A video that is already in the index is answered without starting yt-dlp"""
+    from src.tools.download_index import DownloadIndex
+
+    video = tmp_path / "Me at the zoo [jNQXAC9IVRw].mp4"
+    video.write_bytes(b"\0" * 5)
+    index = DownloadIndex(str(tmp_path / "index.sqlite3"))
+    index.add("jNQXAC9IVRw", str(video), 5, title="Me at the zoo")
+
+    calls = []
+    monkeypatch.setattr(youtube_tool.subprocess, "Popen", fake_popen_factory(calls))
+
+    tool = YouTubeDownloadTool(download_dir=str(tmp_path), index=index)
+    result = json.loads(tool._run("https://www.youtube.com/shorts/jNQXAC9IVRw"))
+
+    assert calls == []
+    assert result["success"]
+    assert result["already_downloaded"]
+    assert result["file_path"] == str(video)
+
+
+def test_progress_is_streamed_and_output_is_bounded(tmp_path, monkeypatch):
+    """Progress lines become events; other output is kept in a bounded buffer"""
+    target = tmp_path / "T [abc].mp4"
+    progress = [
+        PROGRESS_MARKER
+        + json.dumps({"status": "downloading", "downloaded_bytes": done, "total_bytes": 1000,
+                      "speed": 250.0, "eta": (1000 - done) / 250})
+        for done in (250, 500, 1000)
+    ]
+    noise = [f"[debug] line {i}" for i in range(youtube_tool.OUTPUT_BUFFER_LINES * 2)]
+    printed = json.dumps({"id": "abc", "title": "T", "filepath": str(target)})
+    stdout = "\n".join(noise + progress + ["ERROR: something", printed]) + "\n"
+    monkeypatch.setattr(
+        youtube_tool.subprocess, "Popen", fake_popen_factory([], stdout, create=target)
+    )
+
+    events = []
+    tool = YouTubeDownloadTool(download_dir=str(tmp_path))
+    returncode, output = tool._stream_process(["yt-dlp"], events.append)
+
+    assert returncode == 0
+    assert [event.percent for event in events] == [25.0, 50.0, 100.0]
+    assert len(output) == youtube_tool.OUTPUT_BUFFER_LINES
+    assert not any(line.startswith(PROGRESS_MARKER) for line in output)
+    assert tool._error_message(output) == "ERROR: something"
+    assert events[0].describe() == "25.0% of 1000 B at 250 B/s, ETA 0:03"
+
+
+def test_parse_progress_line_ignores_other_output():
+    assert parse_progress_line("[download] Destination: x.mp4") is None
+    event = parse_progress_line(
+        PROGRESS_MARKER + '{"status": "finished", "total_bytes_estimate": 2097152}'
+    )
+    assert event.percent == 100.0
+    assert event.describe() == "100.0% of 2.0 MiB"
+
+
+def python_command(code):
+    """A command line that runs a Python snippet in place of yt-dlp"""
+    return [sys.executable, "-c", textwrap.dedent(code)]
+
+
+def test_async_download_streams_progress(tmp_path):
+    """The async path reads progress without blocking the loop"""
+    target = tmp_path / "T [abc].mp4"
+    target.write_bytes(b"\0" * 10)
+    code = f"""
+        import json
+        for done in (500, 1000):
+            print({PROGRESS_MARKER!r} + json.dumps({{"status": "downloading",
+                  "downloaded_bytes": done, "total_bytes": 1000}}), flush=True)
+        print(json.dumps({{"id": "abc", "title": "T", "filepath": {str(target)!r}}}))
+    """
+    tool = YouTubeDownloadTool(download_dir=str(tmp_path))
+    tool._build_download_command = lambda url: python_command(code)
+
+    events = []
+
+    async def on_progress(event):
+        events.append(event.percent)
+
+    result = json.loads(asyncio.run(tool.adownload("https://youtu.be/abc", on_progress)))
+
+    assert result["success"]
+    assert result["file_size"] == 10
+    assert events == [50.0, 100.0]
+
+
+def test_async_timeout_and_cancel_kill_the_process_tree(tmp_path):
+    """Timeouts and cancellation leave no yt-dlp (or ffmpeg) child behind"""
+    pid_file = tmp_path / "child.pid"
+    code = f"""
+        import subprocess, sys, time
+        child = subprocess.Popen([sys.executable, "-c", "import time; time.sleep(60)"])
+        open({str(pid_file)!r}, "w").write(str(child.pid))
+        print("started", flush=True)
+        time.sleep(60)
+    """
+    tool = YouTubeDownloadTool(download_dir=str(tmp_path))
+    tool._build_download_command = lambda url: python_command(code)
+
+    def child_alive():
+        pid = int(pid_file.read_text())
+        try:
+            os.kill(pid, 0)
+        except ProcessLookupError:
+            return False
+        # On Linux a killed orphan can stay a zombie until init reaps it
+        proc_stat = f"/proc/{pid}/stat"
+        if os.path.exists(proc_stat):
+            with open(proc_stat) as f:
+                return f.read().split()[2] != "Z"
+        return True
+
+    result = json.loads(asyncio.run(tool.adownload("https://youtu.be/abc", timeout=1)))
+    assert not result["success"]
+    assert "timeout" in result["message"]
+    time.sleep(0.2)
+    assert not child_alive()
+
+    async def cancel_midway():
+        task = asyncio.create_task(tool.adownload("https://youtu.be/abc"))
+        while not pid_file.exists():
+            await asyncio.sleep(0.05)
+        task.cancel()
+        with pytest.raises(asyncio.CancelledError):
+            await task
+
+    pid_file.unlink()
+    asyncio.run(cancel_midway())
+    time.sleep(0.2)
+    assert not child_alive()
+
+
+def test_interrupt_downloads_kills_running_processes(tmp_path):
+    """Shutdown can interrupt a running download; yt-dlp is told to resume .part files"""
+    tool = YouTubeDownloadTool(download_dir=str(tmp_path))
+    assert "--continue" in tool._build_download_command("https://youtu.be/abc")
+
+    code = """
+        import time
+        print("started", flush=True)
+        time.sleep(60)
+    """
+    tool._build_download_command = lambda url: python_command(code)
+    results = []
+    worker = threading.Thread(
+        target=lambda: results.append(json.loads(tool.download("https://youtu.be/abc")))
+    )
+    worker.start()
+    while not tool._processes:
+        time.sleep(0.02)
+
+    assert tool.interrupt_downloads() == 1
+    worker.join(timeout=5)
+    assert not results[0]["success"]
+    assert not tool._processes
+
+
+def test_download_is_staged_in_scratch_dir(tmp_path, monkeypatch):
+    """yt-dlp works in the scratch directory; only the finished file is moved"""
+    download_dir = tmp_path / "icloud"
+    scratch_dir = tmp_path / "scratch"
+    download_dir.mkdir()
+    staged = scratch_dir / "Me at the zoo [jNQXAC9IVRw].mp4"
+    printed = json.dumps({"id": "jNQXAC9IVRw", "title": "Me at the zoo", "filepath": str(staged)})
+    calls = []
+    monkeypatch.setattr(
+        youtube_tool.subprocess, "Popen", fake_popen_factory(calls, printed + "\n", create=staged)
+    )
+
+    tool = YouTubeDownloadTool(download_dir=str(download_dir), scratch_dir=str(scratch_dir))
+    result = json.loads(tool._run("https://youtu.be/jNQXAC9IVRw"))
+
+    output_template = calls[0][calls[0].index("--output") + 1]
+    assert output_template.startswith(str(scratch_dir))
+    assert result["success"]
+    assert result["file_path"] == str(download_dir / staged.name)
+    assert (download_dir / staged.name).stat().st_size == 2048
+    assert not staged.exists()
+    assert tool.publish_stats()["renamed"] == 1
+
+
+def test_download_rejected_by_disk_quota(tmp_path, monkeypatch):
+    """A video larger than the quota is refused as soon as its size is printed"""
+    from src.tools.disk_quota import SIZE_MARKER, DiskQuota
+    from src.tools.download_index import DownloadIndex
+
+    index = DownloadIndex(str(tmp_path / "index.sqlite3"))
+    quota = DiskQuota(str(tmp_path), index, quota_bytes=1000)
+    size_line = SIZE_MARKER + json.dumps({"filesize_approx": 5000})
+    calls = []
+    monkeypatch.setattr(
+        youtube_tool.subprocess, "Popen", fake_popen_factory(calls, size_line + "\n")
+    )
+
+    tool = YouTubeDownloadTool(download_dir=str(tmp_path), index=index, quota=quota)
+    result = json.loads(tool._run("https://youtu.be/jNQXAC9IVRw"))
+
+    assert "--print" in calls[0] and youtube_tool.SIZE_PRINT_TEMPLATE in calls[0]
+    assert not result["success"]
+    assert result["rejected"]
+    assert "quota" in result["message"]
+    assert quota.stats()["rejected"] == 1
+    assert quota.stats()["reserved_bytes"] == 0
@@ -0,0 +1,55 @@
+"""Tests for the pre-warmed yt-dlp worker pool (needs the yt-dlp Python module, no network)"""
+
+import subprocess
+
+import pytest
+
+from src.tools.youtube_tool import YouTubeDownloadTool
+from src.tools.ytdlp_pool import YtDlpWorkerPool
+
+pytest.importorskip("yt_dlp")
+
+
+@pytest.fixture
+def pool():
+    pool = YtDlpWorkerPool(size=1, max_jobs=2)
+    yield pool
+    pool.stop()
+
+
+def test_jobs_reuse_a_worker_until_it_is_recycled(pool):
+    import yt_dlp
+
+    for _ in range(3):
+        lines = []
+        assert pool.run(["--version"], lines.append, timeout=60) == 0
+        assert lines == [yt_dlp.version.__version__]
+
+    stats = pool.stats()
+    assert stats["jobs"] == 3
+    assert stats["recycled"] == 1
+    assert stats["spawned"] == 2
+
+
+def test_usage_errors_and_timeouts_are_isolated(pool):
+    lines = []
+    assert pool.run(["--no-such-option"], lines.append, timeout=60) == 2
+    assert "yt-dlp: error: no such option: --no-such-option" in lines
+
+    with pytest.raises(subprocess.TimeoutExpired):
+        pool.run(["--version"], lambda line: None, timeout=0)
+    assert pool.stats()["timeouts"] == 1
+
+    # The killed worker is replaced
+    lines = []
+    assert pool.run(["--version"], lines.append, timeout=60) == 0
+
+
+def test_tool_streams_jobs_through_the_pool(tmp_path, pool):
+    tool = YouTubeDownloadTool(download_dir=str(tmp_path), worker_pool=pool)
+
+    returncode, output = tool._stream_process(["yt-dlp", "--version"])
+
+    assert returncode == 0
+    assert len(output) == 1
+    assert pool.stats()["jobs"] == 1